@@ -0,0 +1,98 @@
+"""
+Benchmark for the forecast archive.
+
+Archives the sample hourly forecast for a number of locations, once per simulated forecast
+generation (each shifted by --interval hours, as if it had been fetched again), in a
+temporary directory. Then reports:
+
+  * the time to append a forecast (including the automatic compaction);
+  * the time to rebuild the index from the manifest;
+  * the time to find every forecast for one location valid at an hour, with and without
+    reading the forecast values, and to find the latest forecast of every location.
+
+Usage:
+    python benchmarks/archive_benchmark.py [--locations N] [--generations G] [--interval H]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "weather_app"))
+
+from forecast_archive import ForecastArchive  # noqa: E402
+from forecast_time import format_timestamp  # noqa: E402
+from hourly_forecast_manager_class import HourlyForecastManager  # noqa: E402
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "weather_app",
+                          "hourly_forecast_data.csv")
+
+
+def shifted_series(series, hours):
+    """Copy a series with every hour moved forward by the given number of hours."""
+    shifted = type(series)()
+    shifted.extend(series)
+    shifted.epochs = array('q', [epoch + hours * 3600 for epoch in series.epochs])
+    shifted.timestamps = [format_timestamp(epoch, offset) for epoch, offset in zip(shifted.epochs, shifted.utc_offsets)]
+    return shifted
+
+
+def best_microseconds(function, repeat=200):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--locations", type=int, default=50, help="number of locations (default 50)")
+    parser.add_argument("--generations", type=int, default=120, help="forecasts archived per location (default 120)")
+    parser.add_argument("--interval", type=int, default=6, help="hours between generations (default 6)")
+    args = parser.parse_args()
+
+    manager = HourlyForecastManager(SAMPLE_CSV, "")
+    manager.load_forecasts()
+    sample = manager.get_forecasts()
+    first_hour = sample.epochs[0]
+
+    with tempfile.TemporaryDirectory() as root:
+        archive = ForecastArchive(root, max_age_seconds=None)
+        start = time.perf_counter()
+        rows = 0
+        for generation in range(args.generations):
+            series = shifted_series(sample, generation * args.interval)
+            generated_at = format_timestamp(first_hour + generation * args.interval * 3600 - 1800, 0)
+            for location in range(args.locations):
+                archive.append_hourly(f"BENCH/{location},0", series, generated_at)
+                rows += len(series)
+        elapsed = time.perf_counter() - start
+        forecasts = args.locations * args.generations
+        print(f"appended {forecasts} forecasts ({rows} rows) in {elapsed:.1f} s, "
+              f"{elapsed / forecasts * 1000:.2f} ms per forecast")
+        archive.compact()
+        archive.close()
+
+        start = time.perf_counter()
+        archive = ForecastArchive(root, max_age_seconds=None)
+        archive.gridpoints()
+        print(f"index rebuilt from the manifest in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        # An hour in the middle of the archived period, covered by as many forecasts as possible
+        when = first_hour + args.generations * args.interval * 3600 // 2 + 1200
+        matches = len(archive.entries_valid_at("BENCH/0,0", when))
+        print(f"entries_valid_at ({matches} forecasts): "
+              f"{best_microseconds(lambda: archive.entries_valid_at('BENCH/0,0', when)):.1f} us")
+        print(f"forecasts_valid_at ({matches} forecasts): "
+              f"{best_microseconds(lambda: archive.forecasts_valid_at('BENCH/0,0', when)):.1f} us")
+        print(f"latest_per_location ({args.locations} locations): "
+              f"{best_microseconds(archive.latest_per_location):.1f} us")
+        archive.close()
+
+
+if __name__ == "__main__":
+    main()
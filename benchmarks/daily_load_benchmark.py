@@ -0,0 +1,80 @@
+"""
+Load-time benchmark for daily forecast archives.
+
+Writes a daily forecast CSV with 10,000 periods (the sample file repeated) and compares
+loading it with csv.DictReader + DailyForecast.from_dict against DailyForecastManager,
+which resolves the column mapping once and converts rows by position.
+
+Usage:
+    python benchmarks/daily_load_benchmark.py [--periods N] [--repeat R]
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "weather_app"))
+
+from daily_forecast_class import DailyForecast  # noqa: E402
+from daily_forecast_manager_class import DailyForecastManager  # noqa: E402
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "weather_app",
+                          "daily_forecast_data.csv")
+
+
+def write_archive(path, periods):
+    """Write a CSV with the given number of periods by repeating the sample rows."""
+    with open(SAMPLE_CSV, newline='', encoding='utf-8') as sample:
+        reader = csv.reader(sample)
+        header = next(reader)
+        rows = list(reader)
+    with open(path, 'w', newline='', encoding='utf-8') as archive:
+        writer = csv.writer(archive)
+        writer.writerow(header)
+        for index in range(periods):
+            writer.writerow(rows[index % len(rows)])
+
+
+def load_with_dict_reader(path):
+    with open(path, newline='', encoding='utf-8') as file:
+        return [DailyForecast.from_dict(row) for row in csv.DictReader(file)]
+
+
+def load_with_manager(path):
+    manager = DailyForecastManager(path, "")
+    manager.load_forecasts()
+    return manager.get_forecasts()
+
+
+def best_time(load, path, repeat):
+    """Return (best wall-clock seconds over repeat runs, number of forecasts loaded)."""
+    best = float("inf")
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = len(load(path))
+        best = min(best, time.perf_counter() - start)
+    return best, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--periods", type=int, default=10000, help="number of periods (default 10000)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per loader; the best is reported")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "daily_archive.csv")
+        write_archive(path, args.periods)
+
+        print(f"{'loader':<40}{'periods':>10}{'best ms':>10}{'us/period':>12}")
+        for name, load in (("DictReader + DailyForecast.from_dict", load_with_dict_reader),
+                           ("DailyForecastManager (column mapping)", load_with_manager)):
+            seconds, count = best_time(load, path, args.repeat)
+            print(f"{name:<40}{count:>10}{seconds * 1000:>10.1f}{seconds / count * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
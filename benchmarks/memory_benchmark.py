@@ -0,0 +1,128 @@
+"""
+Memory benchmark for hourly forecast records.
+
+Builds a 156-hour series for 1,000 locations (156,000 records) from the sample
+hourly CSV and reports the bytes held per record for:
+
+  * the original __dict__-based HourlyForecast with eagerly formatted display strings,
+  * the __slots__-based HourlyForecast before and after its display fields are read,
+  * the columnar HourlyForecastSeries, whose text columns are dictionary-encoded.
+
+Usage:
+    python benchmarks/memory_benchmark.py [--locations N]
+"""
+import argparse
+import csv
+import gc
+import io
+import os
+import sys
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "weather_app"))
+
+from hourly_forecast_class import HourlyForecast, parse_hourly_values  # noqa: E402
+from hourly_forecast_series import HourlyForecastSeries  # noqa: E402
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "weather_app",
+                          "hourly_forecast_data.csv")
+
+
+class LegacyHourlyForecast:
+    """The HourlyForecast layout before __slots__: a __dict__ plus eagerly formatted strings."""
+
+    def __init__(self, timestamp, temperature_f, temperature_c, dewpoint_f, dewpoint_c,
+                 probability_of_precipitation, relative_humidity, wind_speed, wind_direction,
+                 icon_url, short_forecast, weather_icon):
+        self.timestamp = timestamp
+        self.temperature_f = temperature_f
+        self.temperature_c = temperature_c
+        self.dewpoint_f = dewpoint_f
+        self.dewpoint_c = dewpoint_c
+        self.probability_of_precipitation = probability_of_precipitation
+        self.relative_humidity = relative_humidity
+        self.wind_speed = wind_speed
+        self.wind_direction = wind_direction
+        self.icon_url = icon_url
+        self.short_forecast = short_forecast
+        self.weather_icon = weather_icon
+        dt = datetime.fromisoformat(timestamp)
+        self.forecast_hour = dt.strftime("%H:%M")
+        self.formatted_date = dt.strftime("%Y-%m-%d")
+        self.chance_of_rain = f"{probability_of_precipitation}%"
+        self.temperature_fahrenheit = f"{temperature_f:.0f} F"
+        self.dewpoint_fahrenheit = f"{dewpoint_f:.0f} F"
+        self.relative_humidity = f"{relative_humidity}%"
+        self.wind = f"{wind_speed} {wind_direction}".strip()
+
+
+def read_display_fields(forecast):
+    """Touch every display field, as the hourly tab does when it renders a row."""
+    return (forecast.forecast_hour, forecast.formatted_date, forecast.chance_of_rain,
+            forecast.temperature_fahrenheit, forecast.dewpoint_fahrenheit, forecast.relative_humidity,
+            forecast.wind)
+
+
+def location_rows(csv_text):
+    """Parse the sample CSV again so every location gets its own string objects, like a real fetch."""
+    return csv.DictReader(io.StringIO(csv_text))
+
+
+def build_objects(record_class, csv_text, locations, touch=False):
+    series = []
+    for _ in range(locations):
+        records = [record_class(*parse_hourly_values(row, 'start_time')) for row in location_rows(csv_text)]
+        if touch:
+            for record in records:
+                read_display_fields(record)
+        series.append(records)
+    return series
+
+
+def build_columnar(csv_text, locations):
+    series = []
+    for _ in range(locations):
+        hourly = HourlyForecastSeries()
+        for row in location_rows(csv_text):
+            hourly.append_dict(row, 'start_time')
+        series.append(hourly)
+    return series
+
+
+def measure(build):
+    """Return (bytes retained by the result of build(), number of records)."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    records = sum(len(series) for series in result)
+    del result
+    return retained, records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--locations", type=int, default=1000, help="number of locations (default 1000)")
+    args = parser.parse_args()
+
+    with open(SAMPLE_CSV, newline='', encoding='utf-8') as file:
+        csv_text = file.read()
+
+    cases = [
+        ("dict + eager strings (before)", lambda: build_objects(LegacyHourlyForecast, csv_text, args.locations)),
+        ("__slots__, display fields unread", lambda: build_objects(HourlyForecast, csv_text, args.locations)),
+        ("__slots__, display fields read", lambda: build_objects(HourlyForecast, csv_text, args.locations, True)),
+        ("columnar HourlyForecastSeries", lambda: build_columnar(csv_text, args.locations)),
+    ]
+
+    print(f"{'layout':<36}{'records':>10}{'total MiB':>12}{'bytes/record':>14}")
+    for name, build in cases:
+        retained, records = measure(build)
+        print(f"{name:<36}{records:>10}{retained / 2 ** 20:>12.1f}{retained / records:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Cold start benchmark for the desktop application.
+
+Runs each measurement in a fresh interpreter and reports:
+  * the import time of the ui module, from python -X importtime, broken down by top-level
+    package so that modules pulled in at startup by mistake stand out;
+  * the time from starting the interpreter to the first paint of the main window, and to
+    the first paint that shows a forecast restored from the local store.
+
+The restored forecast is only measured when a last location and its stored forecast exist
+in the cache directory (run the application and look up a location once to create them).
+Set QT_QPA_PLATFORM=offscreen to run without a display.
+
+Usage:
+    python benchmarks/startup_benchmark.py [--repeat R] [--top N]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+WEATHER_APP_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "weather_app"))
+
+# Matches one line of -X importtime output: "import time: self | cumulative | name"
+IMPORT_TIME_PATTERN = re.compile(r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)")
+
+# Child process: builds the window as main.py does and prints time.time() at each paint milestone
+FIRST_PAINT_SCRIPT = """
+import sys, time
+from PyQt5.QtCore import QObject, QEvent, QTimer
+from PyQt5.QtWidgets import QApplication
+from ui import WeatherMainWindow
+
+class PaintWatcher(QObject):
+    def __init__(self, window):
+        super().__init__()
+        self.window = window
+        self.painted = False
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and not self.painted:
+            self.painted = True
+            print("first_paint", time.time(), flush=True)
+            QTimer.singleShot(0, self.restore)
+        return False
+
+    def restore(self):
+        self.window.restore_last_location()
+        if self.window.active_locations:
+            # Paint synchronously so the time includes laying out the restored forecast
+            self.window.repaint()
+            print("forecast_paint", time.time(), flush=True)
+        # Stop before any background refresh reaches the network
+        app.exit(0)
+
+app = QApplication(sys.argv)
+window = WeatherMainWindow()
+watcher = PaintWatcher(window)
+window.installEventFilter(watcher)
+window.show()
+sys.exit(app.exec_())
+"""
+
+
+def import_breakdown(module="ui"):
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    Returns:
+        tuple: (total microseconds, {top-level package: self microseconds})
+    """
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               cwd=WEATHER_APP_DIR, capture_output=True, text=True, check=True)
+    total = 0
+    by_package = defaultdict(int)
+    for line in completed.stderr.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = int(match.group(1)), int(match.group(2)), match.group(3), match.group(4)
+        by_package[name.split(".")[0]] += self_us
+        if name == module and len(indent) <= 1:
+            total = cumulative_us
+    return total, dict(by_package)
+
+
+def first_paint_times():
+    """
+    Start the window in a fresh interpreter.
+
+    Returns:
+        dict: Seconds from process start to 'first_paint' and, if a forecast was restored, 'forecast_paint'.
+    """
+    start = time.time()
+    completed = subprocess.run([sys.executable, "-c", FIRST_PAINT_SCRIPT], cwd=WEATHER_APP_DIR,
+                               capture_output=True, text=True, check=True, timeout=60)
+    times = {}
+    for line in completed.stdout.splitlines():
+        parts = line.split()
+        if len(parts) == 2 and parts[0] in ("first_paint", "forecast_paint"):
+            times[parts[0]] = float(parts[1]) - start
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters started per measurement")
+    parser.add_argument("--top", type=int, default=12, help="packages listed in the import breakdown")
+    args = parser.parse_args()
+
+    # Warm the bytecode cache so the first run does not include compiling the sources
+    import_breakdown()
+
+    runs = [import_breakdown() for _ in range(args.repeat)]
+    best_total, best_packages = min(runs, key=lambda run: run[0])
+    print(f"import ui: {best_total / 1000:.1f} ms (best of {args.repeat})")
+    for package, self_us in sorted(best_packages.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {package:<32} {self_us / 1000:8.1f} ms")
+
+    paints = [first_paint_times() for _ in range(args.repeat)]
+    for milestone, label in (("first_paint", "first paint of the window"),
+                             ("forecast_paint", "first paint of the restored forecast")):
+        values = [paint[milestone] for paint in paints if milestone in paint]
+        if values:
+            print(f"{label}: {min(values) * 1000:.1f} ms from process start (best of {len(values)})")
+        else:
+            print(f"{label}: not measured (no last location with a stored forecast)")
+
+
+if __name__ == "__main__":
+    main()
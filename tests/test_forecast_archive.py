@@ -0,0 +1,271 @@
+import os
+import time
+from datetime import datetime, timezone
+import pytest
+import forecast_archive
+from daily_forecast_class import DailyForecast
+from forecast_archive import ForecastArchive, DAILY_PERIOD_SECONDS
+from forecast_store import DAILY, HOURLY
+from hourly_forecast_series import HourlyForecastSeries
+
+"""
+Tests for appending to, querying, compacting and pruning the forecast archive.
+"""
+
+GRIDPOINT = "OKX/33,35"
+OTHER_GRIDPOINT = "LWX/96,70"
+# 2025-04-28T00:00:00+00:00
+BASE = 1745798400
+HOUR = 3600
+
+
+def iso(epoch):
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+
+
+def make_series(start, hours=24, temperature=60.0):
+    """An hourly series of consecutive UTC hours whose temperature is temperature + hour index."""
+    series = HourlyForecastSeries()
+    for hour in range(hours):
+        series.append_values(iso(start + hour * HOUR), temperature + hour, 50.0, 10.0, 60.0, "5 mph", "S",
+                             "https://example.test/icon", "Sunny", "day/few")
+    return series
+
+
+def append_generations(archive, count, gridpoint_key=GRIDPOINT, interval=6 * HOUR, hours=24):
+    """Archive count forecasts generated interval apart, each starting at its generation time."""
+    entries = []
+    for generation in range(count):
+        generated = BASE + generation * interval
+        entries.append(archive.append_hourly(gridpoint_key, make_series(generated, hours, 60.0 + 100 * generation),
+                                             iso(generated)))
+    return entries
+
+
+def keys(entries):
+    return [entry.key for entry in entries]
+
+
+def segment_files(archive):
+    root = os.path.join(archive.root, "segments")
+    return sorted(os.path.join(directory, name) for directory, _, names in os.walk(root) for name in names)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = ForecastArchive(str(tmp_path / "archive"), max_age_seconds=None, compact_after=1000)
+    yield archive
+    archive.close()
+
+
+def test_append_and_load(archive):
+    series = make_series(BASE)
+    entry = archive.append_hourly(GRIDPOINT, series, iso(BASE))
+    assert entry.rows == 24
+    assert (entry.valid_from, entry.valid_to) == (BASE, BASE + 24 * HOUR)
+    loaded = archive.load(entry)
+    assert loaded.timestamps == series.timestamps
+    assert list(loaded.temperature_f) == list(series.temperature_f)
+    assert list(archive.column(entry, "temperature_f")) == list(series.temperature_f)
+    assert archive.column(entry, "short_forecasts") == ["Sunny"] * 24
+
+
+def test_append_same_generation_returns_existing_entry(archive):
+    first = archive.append_hourly(GRIDPOINT, make_series(BASE), iso(BASE))
+    again = archive.append_hourly(GRIDPOINT, make_series(BASE, temperature=0.0), iso(BASE))
+    assert again.key == first.key
+    assert len(archive.entries(GRIDPOINT)) == 1
+    assert len(segment_files(archive)) == 1
+
+
+def test_append_empty_forecast_is_ignored(archive):
+    assert archive.append_hourly(GRIDPOINT, HourlyForecastSeries(), iso(BASE)) is None
+    assert archive.append_daily(GRIDPOINT, [], iso(BASE)) is None
+    assert archive.gridpoints() == []
+
+
+def test_entries_latest_and_gridpoints(archive):
+    entries = append_generations(archive, 3)
+    other = archive.append_hourly(OTHER_GRIDPOINT, make_series(BASE), iso(BASE))
+    assert keys(archive.entries(GRIDPOINT)) == keys(entries[::-1])
+    assert archive.entries(GRIDPOINT, DAILY) == []
+    assert archive.latest(GRIDPOINT).key == entries[-1].key
+    assert archive.latest("nowhere") is None
+    assert archive.gridpoints() == sorted([GRIDPOINT, OTHER_GRIDPOINT])
+    latest = archive.latest_per_location()
+    assert {gridpoint_key: entry.key for gridpoint_key, entry in latest.items()} == \
+        {GRIDPOINT: entries[-1].key, OTHER_GRIDPOINT: other.key}
+
+
+def test_manifest_is_reread_by_a_new_archive(archive):
+    entries = append_generations(archive, 3)
+    reopened = ForecastArchive(archive.root, max_age_seconds=None, compact_after=1000)
+    try:
+        assert keys(reopened.entries(GRIDPOINT)) == keys(entries[::-1])
+        assert list(reopened.load(reopened.latest(GRIDPOINT)).temperature_f) == \
+            list(archive.load(entries[-1]).temperature_f)
+    finally:
+        reopened.close()
+
+
+def test_entries_valid_at(archive):
+    # Generations at BASE, BASE + 6h and BASE + 12h, each valid for 24 hours from its generation
+    first, second, third = append_generations(archive, 3)
+    assert keys(archive.entries_valid_at(GRIDPOINT, BASE)) == keys([first])
+    assert keys(archive.entries_valid_at(GRIDPOINT, BASE + 6 * HOUR)) == keys([first, second])
+    assert keys(archive.entries_valid_at(GRIDPOINT, BASE + 20 * HOUR)) == keys([first, second, third])
+    # valid_to is exclusive
+    assert keys(archive.entries_valid_at(GRIDPOINT, BASE + 24 * HOUR)) == keys([second, third])
+    assert keys(archive.entries_valid_at(GRIDPOINT, BASE + 36 * HOUR - 1)) == keys([third])
+    assert archive.entries_valid_at(GRIDPOINT, BASE + 36 * HOUR) == []
+    assert archive.entries_valid_at(GRIDPOINT, BASE - 1) == []
+    assert keys(archive.entries_valid_at(GRIDPOINT, iso(BASE + 6 * HOUR))) == keys([first, second])
+    assert archive.entries_valid_at("nowhere", BASE) == []
+    with pytest.raises(ValueError):
+        archive.entries_valid_at(GRIDPOINT, "not a time")
+
+
+def test_entries_valid_at_matches_a_scan(archive):
+    # Forecasts of different lengths, so a short one never hides a longer one that started earlier
+    for generation, hours in enumerate((48, 6, 12, 1, 30, 6)):
+        archive.append_hourly(GRIDPOINT, make_series(BASE + generation * 3 * HOUR, hours),
+                              iso(BASE + generation * HOUR))
+    entries = archive.entries(GRIDPOINT)
+    for when in range(BASE - HOUR, BASE + 50 * HOUR, 1800):
+        expected = sorted((entry for entry in entries if entry.valid_from <= when < entry.valid_to),
+                          key=lambda entry: entry.generated_epoch)
+        assert keys(archive.entries_valid_at(GRIDPOINT, when)) == keys(expected)
+
+
+def test_forecasts_valid_at_reads_the_hour(archive):
+    append_generations(archive, 2)
+    results = archive.forecasts_valid_at(GRIDPOINT, BASE + 8 * HOUR + 1800)
+    # Hour 8 of the first generation and hour 2 of the second
+    assert [forecast.temperature_f for _, forecast in results] == [68.0, 162.0]
+    assert [forecast.timestamp for _, forecast in results] == [iso(BASE + 8 * HOUR)] * 2
+
+
+def test_daily_entries_valid_at(archive):
+    forecasts = [DailyForecast(f"Period {number}", "70 F", "21 C", "", "", "", str(number),
+                               iso(BASE + number * 12 * HOUR)) for number in range(4)]
+    entry = archive.append_daily(GRIDPOINT, forecasts, iso(BASE))
+    assert (entry.valid_from, entry.valid_to) == (BASE, BASE + 36 * HOUR + DAILY_PERIOD_SECONDS)
+    assert keys(archive.entries_valid_at(GRIDPOINT, BASE + 40 * HOUR, DAILY)) == [entry.key]
+    assert archive.entries_valid_at(GRIDPOINT, BASE + 40 * HOUR) == []
+    [(_, forecast)] = archive.forecasts_valid_at(GRIDPOINT, BASE + 13 * HOUR, DAILY)
+    assert forecast.period_name == "Period 1"
+    with pytest.raises(ValueError):
+        archive.append_daily(GRIDPOINT, [DailyForecast("Tonight", "", "", "", "", "")], iso(BASE + HOUR))
+
+
+def test_compact_merges_segments(archive):
+    entries = append_generations(archive, 5)
+    before = {entry.generated_at: list(archive.load(entry).temperature_f) for entry in entries}
+    valid = keys(archive.entries_valid_at(GRIDPOINT, BASE + 20 * HOUR))
+    assert len(segment_files(archive)) == 5
+
+    assert archive.compact() == 1
+    assert len(segment_files(archive)) == 1
+    assert {entry.generated_at: list(archive.load(entry).temperature_f) for entry in archive.entries(GRIDPOINT)} \
+        == before
+    assert keys(archive.entries_valid_at(GRIDPOINT, BASE + 20 * HOUR)) == valid
+    # Nothing left to merge
+    assert archive.compact() == 0
+
+    reopened = ForecastArchive(archive.root, max_age_seconds=None, compact_after=1000)
+    try:
+        assert {entry.generated_at: list(reopened.load(entry).temperature_f)
+                for entry in reopened.entries(GRIDPOINT)} == before
+    finally:
+        reopened.close()
+
+
+def test_compact_splits_at_max_segment_rows(tmp_path):
+    archive = ForecastArchive(str(tmp_path), max_age_seconds=None, compact_after=1000, max_segment_rows=48)
+    try:
+        append_generations(archive, 5)
+        assert archive.compact() == 3
+        assert len(segment_files(archive)) == 3
+        assert all(len(archive.load(entry)) == 24 for entry in archive.entries(GRIDPOINT))
+    finally:
+        archive.close()
+
+
+def test_append_compacts_after_compact_after_segments(tmp_path):
+    archive = ForecastArchive(str(tmp_path), max_age_seconds=None, compact_after=4)
+    try:
+        append_generations(archive, 3)
+        assert len(segment_files(archive)) == 3
+        append_generations(archive, 4)
+        assert len(segment_files(archive)) == 1
+        assert len(archive.entries(GRIDPOINT)) == 4
+    finally:
+        archive.close()
+
+
+def test_retention_by_count_keeps_the_newest(tmp_path):
+    archive = ForecastArchive(str(tmp_path), max_age_seconds=None, max_forecasts_per_gridpoint=2,
+                              compact_after=1000)
+    try:
+        entries = append_generations(archive, 5)
+        assert archive.apply_retention() == 3
+        assert keys(archive.entries(GRIDPOINT)) == keys(entries[:2:-1])
+        # Segments without forecasts are deleted
+        assert len(segment_files(archive)) == 2
+        reopened = ForecastArchive(archive.root, compact_after=1000)
+        try:
+            assert keys(reopened.entries(GRIDPOINT)) == keys(entries[:2:-1])
+        finally:
+            reopened.close()
+    finally:
+        archive.close()
+
+
+def test_retention_by_age_always_keeps_the_newest(tmp_path):
+    archive = ForecastArchive(str(tmp_path), max_age_seconds=24 * HOUR, compact_after=1000)
+    try:
+        entries = append_generations(archive, 4)
+        newest = entries[-1].generated_epoch
+        # Only the first generation is more than a day older than now
+        assert archive.apply_retention(now=newest + 6 * HOUR + 1) == 1
+        assert keys(archive.entries(GRIDPOINT)) == keys(entries[:0:-1])
+        # Long after the last fetch the newest forecast is still kept
+        assert archive.apply_retention(now=newest + 365 * 24 * HOUR) == 2
+        assert keys(archive.entries(GRIDPOINT)) == [entries[-1].key]
+        assert archive.apply_retention(now=newest + 365 * 24 * HOUR) == 0
+    finally:
+        archive.close()
+
+
+def test_compact_drops_rows_removed_by_retention(tmp_path):
+    archive = ForecastArchive(str(tmp_path), max_age_seconds=None, compact_after=1000)
+    try:
+        append_generations(archive, 4)
+        archive.compact()
+        archive.max_forecasts_per_gridpoint = 1
+        assert archive.apply_retention() == 3
+        # The merged segment still holds the removed rows until the next compaction
+        assert archive.compact() == 1
+        [entry] = archive.entries(GRIDPOINT)
+        assert entry.first_row == 0
+        assert len(archive.load(entry)) == 24
+        assert len(segment_files(archive)) == 1
+    finally:
+        archive.close()
+
+
+def test_compact_removes_only_old_orphan_segments(archive):
+    append_generations(archive, 1)
+    directory = os.path.dirname(segment_files(archive)[0])
+    old = os.path.join(directory, "hourly--crashed--00000000.snap")
+    young = os.path.join(directory, "hourly--in-progress--00000001.snap")
+    for path in (old, young):
+        with open(path, "wb") as file:
+            file.write(b"partial")
+    past = time.time() - forecast_archive.ORPHAN_SEGMENT_AGE_SECONDS - 60
+    os.utime(old, (past, past))
+
+    archive.compact()
+    assert not os.path.exists(old)
+    assert os.path.exists(young)
+    assert len(archive.entries(GRIDPOINT)) == 1
@@ -0,0 +1,62 @@
+from forecast_diff import diff_keyed, unique_keys
+
+"""
+Tests for the keyed comparison of displayed and refreshed forecast periods.
+"""
+
+
+def test_identical_periods():
+    diff = diff_keyed(["a", "b", "c"], [1, 2, 3], ["a", "b", "c"], [1, 2, 3])
+    assert diff.same_layout
+    assert (diff.changed, diff.added, diff.removed) == ([], [], [])
+    assert not diff
+
+
+def test_same_keys_with_changed_values():
+    diff = diff_keyed(["a", "b", "c"], [1, 2, 3], ["a", "b", "c"], [1, 20, 30])
+    assert diff.same_layout
+    assert diff.changed == [1, 2]
+    assert diff.stale == [1, 2]
+    assert diff
+
+
+def test_first_period_rolls_off_and_one_is_added():
+    # The API renumbers periods, but keys are start times, so the remaining periods still match
+    diff = diff_keyed(["10:00", "11:00", "12:00"], ["x", "y", "z"], ["11:00", "12:00", "13:00"], ["y", "z2", "w"])
+    assert not diff.same_layout
+    assert diff.changed == [1]
+    assert diff.added == [2]
+    assert diff.removed == ["10:00"]
+    assert diff.stale == [1, 2]
+    assert str(diff) == "1 changed, 1 added, 1 removed"
+    assert diff
+
+
+def test_reordered_keys_are_a_layout_change():
+    diff = diff_keyed(["a", "b"], [1, 2], ["b", "a"], [2, 1])
+    assert not diff.same_layout
+    assert (diff.changed, diff.added, diff.removed) == ([], [], [])
+    assert diff
+
+
+def test_empty_sides():
+    assert not diff_keyed([], [], [], [])
+    appeared = diff_keyed([], [], ["a", "b"], [1, 2])
+    assert appeared.added == [0, 1]
+    cleared = diff_keyed(["a", "b"], [1, 2], [], [])
+    assert cleared.removed == ["a", "b"]
+    assert cleared.stale == []
+
+
+def test_accepts_any_sequences():
+    diff = diff_keyed(("a", "b"), iter([1, 2]), ["a", "b"], (1, 3))
+    assert diff.same_layout
+    assert diff.changed == [1]
+
+
+def test_unique_keys_makes_repeated_keys_distinct():
+    keys = unique_keys(["a", "b", "a", "a"])
+    assert keys == ["a", "b", ("a", 1), ("a", 2)]
+    diff = diff_keyed(unique_keys(["a", "a"]), [1, 2], unique_keys(["a", "a", "a"]), [1, 5, 3])
+    assert diff.changed == [1]
+    assert diff.added == [2]
@@ -0,0 +1,158 @@
+import struct
+import pytest
+from daily_forecast_class import DailyForecast
+from forecast_snapshot import Snapshot, write_daily_snapshot, write_hourly_snapshot, DAILY, HOURLY
+from hourly_forecast_series import HourlyForecastSeries
+
+"""
+Tests for writing forecast snapshots and reading them back.
+"""
+
+GENERATED = "2025-04-28T19:47:31+00:00"
+
+
+def make_series(hours=6):
+    """An hourly series crossing a change of UTC offset, with repeated and distinct strings."""
+    series = HourlyForecastSeries()
+    for hour in range(hours):
+        offset = "-05:00" if hour < hours // 2 else "-04:00"
+        series.append_values(f"2025-04-28T{10 + hour:02d}:00:00{offset}", 70.0 + hour, 50.5 - hour, 10.0 * hour,
+                             40.0 + hour, f"{5 + hour % 2} mph", "SW", "https://example.test/icon",
+                             "Sunny" if hour % 3 else "Partly Cloudy", "day/few")
+    return series
+
+
+def make_daily(periods=3):
+    return [DailyForecast(f"Period {number}", f"{80 - number} F", f"{(80 - number - 32) * 5 / 9:.0f} C",
+                          f"{number * 10}%", "https://example.test/icon", f"Sunny, high near {80 - number}. ☀",
+                          str(number),
+                          f"2025-04-{28 + number // 2:02d}T{6 if number % 2 else 18:02d}:00:00-05:00")
+            for number in range(1, periods + 1)]
+
+
+def test_hourly_round_trip(tmp_path):
+    path = str(tmp_path / "hourly.snap")
+    series = make_series()
+    write_hourly_snapshot(path, series, GENERATED)
+    with Snapshot(path) as snapshot:
+        assert snapshot.kind == HOURLY
+        assert len(snapshot) == len(series)
+        assert snapshot.generated_time == GENERATED
+        loaded = snapshot.to_hourly_series()
+        assert loaded.timestamps == series.timestamps
+        assert list(loaded.epochs) == list(series.epochs)
+        assert list(loaded.utc_offsets) == list(series.utc_offsets)
+        assert list(loaded.temperature_f) == list(series.temperature_f)
+        assert list(loaded.dewpoint_f) == list(series.dewpoint_f)
+        assert list(loaded.short_forecasts) == list(series.short_forecasts)
+        assert list(loaded.wind_speeds) == list(series.wind_speeds)
+        # Every distinct string is stored once
+        assert len(snapshot.string_table) == len(set(snapshot.string_table))
+
+
+def test_hourly_row_range_and_single_row(tmp_path):
+    path = str(tmp_path / "hourly.snap")
+    series = make_series()
+    write_hourly_snapshot(path, series, GENERATED)
+    with Snapshot(path) as snapshot:
+        part = snapshot.to_hourly_series(2, 5)
+        assert part.timestamps == series.timestamps[2:5]
+        assert list(snapshot.column_values("temperature_f", 2, 5)) == list(series.temperature_f[2:5])
+        assert snapshot.strings("short_forecasts", 0, 2) == list(series.short_forecasts)[0:2]
+        forecast = snapshot.hourly_forecast(4)
+        expected = series.row(4)
+        for name in ("timestamp", "temperature_f", "dewpoint_c", "wind_speed", "short_forecast", "weather_icon"):
+            assert getattr(forecast, name) == getattr(expected, name)
+        with pytest.raises(IndexError):
+            snapshot.hourly_forecast(len(series))
+
+
+def test_daily_round_trip(tmp_path):
+    path = str(tmp_path / "daily.snap")
+    forecasts = make_daily()
+    write_daily_snapshot(path, forecasts, GENERATED)
+    with Snapshot(path) as snapshot:
+        assert snapshot.kind == DAILY
+        loaded = snapshot.to_daily_forecasts()
+        assert [[getattr(forecast, name) for name in DailyForecast.__slots__] for forecast in loaded] == \
+            [[getattr(forecast, name) for name in DailyForecast.__slots__] for forecast in forecasts]
+        assert [forecast.period_name for forecast in snapshot.to_daily_forecasts(1, 3)] == ["Period 2", "Period 3"]
+
+
+def test_empty_series_round_trip(tmp_path):
+    path = str(tmp_path / "empty.snap")
+    write_hourly_snapshot(path, HourlyForecastSeries(), "")
+    with Snapshot(path) as snapshot:
+        assert len(snapshot) == 0
+        assert len(snapshot.to_hourly_series()) == 0
+
+
+def test_kind_mismatch_is_rejected(tmp_path):
+    path = str(tmp_path / "daily.snap")
+    write_daily_snapshot(path, make_daily(), GENERATED)
+    with Snapshot(path) as snapshot:
+        with pytest.raises(ValueError):
+            snapshot.to_hourly_series()
+        with pytest.raises(ValueError):
+            snapshot.hourly_forecast(0)
+
+
+def test_strings_rejects_numeric_column(tmp_path):
+    path = str(tmp_path / "hourly.snap")
+    write_hourly_snapshot(path, make_series(), GENERATED)
+    with Snapshot(path) as snapshot:
+        with pytest.raises(KeyError):
+            snapshot.strings("temperature_f")
+
+
+def test_empty_file_is_rejected(tmp_path):
+    path = tmp_path / "empty.snap"
+    path.write_bytes(b"")
+    with pytest.raises(ValueError):
+        Snapshot(str(path))
+
+
+def test_wrong_magic_is_rejected(tmp_path):
+    path = tmp_path / "hourly.snap"
+    write_hourly_snapshot(str(path), make_series(), GENERATED)
+    data = bytearray(path.read_bytes())
+    data[:4] = b"NOPE"
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="not a valid forecast snapshot"):
+        Snapshot(str(path))
+
+
+def test_truncated_file_is_rejected(tmp_path):
+    path = tmp_path / "hourly.snap"
+    write_hourly_snapshot(str(path), make_series(), GENERATED)
+    data = path.read_bytes()
+    for size in (10, len(data) // 2, len(data) - 1):
+        path.write_bytes(data[:size])
+        with pytest.raises(ValueError):
+            Snapshot(str(path))
+
+
+def test_string_id_out_of_range_is_rejected(tmp_path):
+    path = tmp_path / "hourly.snap"
+    write_hourly_snapshot(str(path), make_series(), GENERATED)
+    data = bytearray(path.read_bytes())
+    # Point the generated time at a string that does not exist
+    struct.pack_into("<I", data, 20, 0xFFFFFFFF)
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        Snapshot(str(path))
+
+
+def test_corrupted_bytes_never_raise_anything_but_value_error(tmp_path):
+    path = tmp_path / "hourly.snap"
+    write_hourly_snapshot(str(path), make_series(), GENERATED)
+    original = path.read_bytes()
+    for position in range(0, len(original), 7):
+        data = bytearray(original)
+        data[position] ^= 0xFF
+        path.write_bytes(bytes(data))
+        try:
+            with Snapshot(str(path)) as snapshot:
+                snapshot.to_hourly_series()
+        except ValueError:
+            pass
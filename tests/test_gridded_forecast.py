@@ -0,0 +1,129 @@
+import math
+import pytest
+from gridded_forecast import GriddedForecast, parse_iso_duration, parse_valid_time
+from hourly_forecast_series import HourlyForecastSeries
+
+"""
+Tests for expanding the gridded forecast into hourly layers and aligning them to other hours.
+"""
+
+# 2025-04-28T16:00:00+00:00
+START = 1745856000
+HOUR = 3600
+
+
+def response():
+    """A /gridpoints response with numeric layers of different interval lengths and a text layer."""
+    return {"properties": {
+        "updateTime": "2025-04-28T15:47:31+00:00",
+        "temperature": {"uom": "wmoUnit:degC", "values": [
+            {"validTime": "2025-04-28T16:00:00+00:00/PT1H", "value": 20.0},
+            {"validTime": "2025-04-28T17:00:00+00:00/PT2H", "value": 21.5},
+            {"validTime": "2025-04-28T19:00:00+00:00/PT1H", "value": None},
+            {"validTime": "2025-04-28T20:00:00+00:00/PT1H", "value": 19},
+        ]},
+        "skyCover": {"uom": "wmoUnit:percent", "values": [
+            {"validTime": "2025-04-28T18:00:00+00:00/PT3H", "value": 40},
+        ]},
+        "quantitativePrecipitation": {"uom": "wmoUnit:mm", "values": [
+            {"validTime": "2025-04-28T16:00:00+00:00/PT6H", "value": 6.0},
+        ]},
+        "weather": {"values": [{"validTime": "2025-04-28T16:00:00+00:00/PT6H", "value": [{"coverage": None}]}]},
+        "elevation": {"unitCode": "wmoUnit:m", "value": 10},
+    }}
+
+
+def as_list(column):
+    return [None if math.isnan(value) else value for value in column]
+
+
+def test_parse_iso_duration():
+    assert parse_iso_duration("PT1H") == 3600
+    assert parse_iso_duration("P1DT12H") == 36 * 3600
+    assert parse_iso_duration("P1W") == 7 * 86400
+    assert parse_iso_duration("PT30M") == 1800
+    for duration in ("P", "PT", "P1DT", "P1Y", "1H"):
+        with pytest.raises(ValueError):
+            parse_iso_duration(duration)
+
+
+def test_parse_valid_time_rounds_to_whole_hours():
+    assert parse_valid_time("2025-04-28T16:00:00+00:00/PT3H") == (START, 3)
+    assert parse_valid_time("2025-04-28T12:00:00-04:00/PT1H") == (START, 1)
+    assert parse_valid_time("2025-04-28T16:30:00+00:00/PT1H") == (START, 2)
+    assert parse_valid_time("2025-04-28T16:00:00+00:00") == (START, 1)
+    with pytest.raises(ValueError):
+        parse_valid_time("2025-04-28T16:00:00/PT1H")
+
+
+def test_from_response_expands_numeric_layers():
+    gridded = GriddedForecast.from_response(response())
+    assert gridded.start == START
+    assert len(gridded) == 6
+    assert sorted(gridded.layers) == ["quantitativePrecipitation", "skyCover", "temperature"]
+    assert "weather" not in gridded and "elevation" not in gridded
+    assert gridded["temperature"].typecode == "d"
+    assert as_list(gridded["temperature"]) == [20.0, 21.5, 21.5, None, 19.0, None]
+    assert as_list(gridded["skyCover"]) == [None, None, 40.0, 40.0, 40.0, None]
+    # Accumulated totals are spread evenly over their interval
+    assert as_list(gridded["quantitativePrecipitation"]) == [1.0] * 6
+    assert gridded.units["temperature"] == "wmoUnit:degC"
+    assert gridded.update_time == "2025-04-28T15:47:31+00:00"
+    assert list(gridded.hour_times()) == [START + hour * HOUR for hour in range(6)]
+
+
+def test_from_response_without_properties_wrapper():
+    gridded = GriddedForecast.from_response(response()["properties"], ["skyCover", "weather", "missing"])
+    assert list(gridded.layers) == ["skyCover"]
+    assert gridded.start == START + 2 * HOUR
+    assert len(gridded) == 3
+
+
+def test_from_response_clips_to_the_requested_axis():
+    gridded = GriddedForecast.from_response(response(), ["temperature"], start=START + HOUR + 1800, hours=3)
+    assert gridded.start == START + HOUR
+    assert as_list(gridded["temperature"]) == [21.5, 21.5, None]
+
+
+def test_from_response_without_layers():
+    gridded = GriddedForecast.from_response({"properties": {}})
+    assert len(gridded) == 0
+    assert gridded.layers == {}
+
+
+def test_from_response_rejects_malformed_valid_time():
+    data = {"temperature": {"uom": "wmoUnit:degC", "values": [{"validTime": "yesterday/PT1H", "value": 1}]}}
+    with pytest.raises(ValueError):
+        GriddedForecast.from_response(data)
+
+
+def test_aligned_to_consecutive_hours_in_another_offset():
+    gridded = GriddedForecast.from_response(response())
+    timestamps = ["2025-04-28T13:00:00-04:00", "2025-04-28T14:00:00-04:00", "2025-04-28T15:00:00-04:00"]
+    aligned = gridded.aligned_to(timestamps, ["temperature", "skyCover", "missing"])
+    assert sorted(aligned) == ["skyCover", "temperature"]
+    assert as_list(aligned["temperature"]) == [21.5, 21.5, None]
+    assert as_list(aligned["skyCover"]) == [None, 40.0, 40.0]
+
+
+def test_aligned_to_hours_outside_or_out_of_order():
+    gridded = GriddedForecast.from_response(response())
+    timestamps = ["2025-04-28T15:00:00+00:00", "2025-04-28T16:00:00+00:00", "2025-04-28T20:00:00+00:00",
+                  "2025-04-28T17:00:00+00:00", "2025-04-28T23:00:00+00:00"]
+    aligned = gridded.aligned_to(timestamps)
+    assert as_list(aligned["temperature"]) == [None, 20.0, 19.0, 21.5, None]
+    assert all(len(column) == len(timestamps) for column in aligned.values())
+
+
+def test_aligned_to_no_hours():
+    gridded = GriddedForecast.from_response(response())
+    assert all(len(column) == 0 for column in gridded.aligned_to([]).values())
+
+
+def test_attach_gridded_to_a_series():
+    series = HourlyForecastSeries()
+    for timestamp in ("2025-04-28T12:00:00-04:00", "2025-04-28T13:00:00-04:00"):
+        series.append_values(timestamp, 70.0, 50.0, 0.0, 40.0, "5 mph", "S", "", "Sunny", "")
+    series.attach_gridded(GriddedForecast.from_response(response()), ["temperature"])
+    assert as_list(series.grid_layers["temperature"]) == [20.0, 21.5]
+    assert series.grid_units == {"temperature": "wmoUnit:degC"}
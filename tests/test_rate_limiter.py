@@ -0,0 +1,87 @@
+import threading
+import time
+import pytest
+from rate_limiter import RateLimiter, HostRateLimiter
+
+"""
+Tests for the blocking token bucket rate limiters.
+"""
+
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        RateLimiter(0)
+    with pytest.raises(ValueError):
+        RateLimiter(-1)
+
+
+def test_burst_is_available_immediately():
+    limiter = RateLimiter(rate=1, burst=3)
+    started = time.monotonic()
+    assert [limiter.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert time.monotonic() - started < 0.5
+
+
+def test_burst_is_at_least_one():
+    limiter = RateLimiter(rate=100, burst=0)
+    assert limiter.burst == 1
+    assert limiter.acquire() == 0.0
+
+
+def test_callers_beyond_the_burst_wait_for_tokens():
+    limiter = RateLimiter(rate=20, burst=2)
+    started = time.monotonic()
+    waits = [limiter.acquire() for _ in range(6)]
+    elapsed = time.monotonic() - started
+    # Two from the burst, then four more at 20 per second
+    assert waits[:2] == [0.0, 0.0]
+    assert all(wait > 0 for wait in waits[2:])
+    assert 0.15 <= elapsed < 1.0
+
+
+def test_idle_time_refills_up_to_the_burst():
+    limiter = RateLimiter(rate=50, burst=2)
+    limiter.acquire()
+    limiter.acquire()
+    time.sleep(0.2)
+    # Ten tokens' worth of idle time only refills the burst of two
+    assert [limiter.acquire() for _ in range(2)] == [0.0, 0.0]
+    assert limiter.acquire() > 0
+
+
+def test_threads_share_the_rate():
+    limiter = RateLimiter(rate=50, burst=1)
+    times = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(5):
+            limiter.acquire()
+            with lock:
+                times.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Twenty acquisitions at 50 per second, with one token at the start, take at least 19 intervals
+    assert len(times) == 20
+    assert max(times) - started >= 19 / 50 * 0.9
+
+
+def test_host_limiter_keeps_one_limiter_per_host():
+    limiters = HostRateLimiter(rate=5, burst=2, overrides={"api.weather.gov": (10, 4)})
+    nws = limiters.limiter_for("https://api.weather.gov/points/40.7,-74.0")
+    assert limiters.limiter_for("https://API.weather.gov/gridpoints/OKX/33,35/forecast") is nws
+    assert (nws.rate, nws.burst) == (10, 4)
+    other = limiters.limiter_for("https://nominatim.openstreetmap.org/search?q=x")
+    assert other is not nws
+    assert (other.rate, other.burst) == (5, 2)
+
+
+def test_host_limiters_do_not_share_tokens():
+    limiters = HostRateLimiter(rate=1, burst=1)
+    assert limiters.acquire("https://a.example/one") == 0.0
+    assert limiters.acquire("https://b.example/one") == 0.0
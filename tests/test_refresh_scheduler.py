@@ -0,0 +1,70 @@
+import pytest
+from refresh_scheduler import refresh_delay, freshness_lifetime
+
+"""
+Tests for deriving the next refresh of a forecast from its response headers and updateTime.
+"""
+
+# 2025-04-28T21:00:00+00:00
+NOW = 1745874000.0
+DATE = "Mon, 28 Apr 2025 21:00:00 GMT"
+
+
+def test_max_age_sets_the_delay():
+    assert refresh_delay({"Cache-Control": "public, max-age=1200"}, now=NOW) == 1200
+
+
+def test_age_is_subtracted_from_max_age():
+    assert refresh_delay({"cache-control": "max-age=1200", "Age": "300"}, now=NOW) == 900
+
+
+def test_expires_is_measured_from_the_date_header():
+    headers = {"Date": DATE, "Expires": "Mon, 28 Apr 2025 21:40:00 GMT"}
+    # A local clock ten minutes ahead does not shorten the lifetime
+    assert refresh_delay(headers, now=NOW + 600) == 2400
+
+
+def test_cache_control_takes_precedence_over_expires():
+    headers = {"Cache-Control": "max-age=600", "Date": DATE, "Expires": "Mon, 28 Apr 2025 23:00:00 GMT"}
+    assert refresh_delay(headers, now=NOW) == 600
+
+
+def test_no_cache_is_clamped_to_min_interval():
+    assert freshness_lifetime({"Cache-Control": "no-cache"}, NOW) == 0
+    assert refresh_delay({"Cache-Control": "no-cache"}, now=NOW) == 300
+    assert refresh_delay({"Cache-Control": "no-store"}, now=NOW, min_interval=60) == 60
+
+
+def test_long_lifetime_is_clamped_to_max_interval():
+    assert refresh_delay({"Cache-Control": "max-age=86400"}, now=NOW) == 2 * 60 * 60
+    assert refresh_delay({"Cache-Control": "max-age=86400"}, now=NOW, max_interval=3000) == 3000
+
+
+def test_default_interval_without_hints():
+    assert refresh_delay({}, now=NOW) == 15 * 60
+    assert refresh_delay(None, now=NOW, default_interval=600) == 600
+    assert refresh_delay({"Expires": "not a date"}, now=NOW) == 15 * 60
+
+
+def test_next_expected_update_pushes_the_refresh_back():
+    # Issued 20 minutes ago, so the next issuance is expected in 40 minutes
+    update_time = "2025-04-28T20:40:00+00:00"
+    assert refresh_delay({"Cache-Control": "max-age=300"}, update_time, now=NOW) == pytest.approx(2400)
+    assert refresh_delay({}, update_time, now=NOW) == pytest.approx(2400)
+
+
+def test_longer_header_lifetime_wins_over_the_expected_update():
+    update_time = "2025-04-28T20:40:00+00:00"
+    assert refresh_delay({"Cache-Control": "max-age=3600"}, update_time, now=NOW) == 3600
+
+
+def test_overdue_update_leaves_the_headers_in_charge():
+    # The expected update has passed, so only the header lifetime counts
+    update_time = "2025-04-28T19:00:00+00:00"
+    assert refresh_delay({"Cache-Control": "max-age=400"}, update_time, now=NOW) == 400
+    assert refresh_delay({}, update_time, now=NOW) == 15 * 60
+
+
+@pytest.mark.parametrize("update_time", ["", None, "garbage", "2025-04-28T20:40:00"])
+def test_unusable_update_time_is_ignored(update_time):
+    assert refresh_delay({"Cache-Control": "max-age=500"}, update_time, now=NOW) == 500
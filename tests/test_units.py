@@ -0,0 +1,49 @@
+import math
+import pytest
+from units import parse_wind_speed, wind_speed_to, wind_speeds_to
+
+"""
+Tests for the wind speed parsing in units.
+"""
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("10 mph", (10.0, 10.0, "mph")),
+    ("10 to 15 mph", (10.0, 15.0, "mph")),
+    ("5 km/h", (5.0, 5.0, "km/h")),
+    ("12 km_h-1", (12.0, 12.0, "km/h")),
+    ("3 m_s-1", (3.0, 3.0, "m/s")),
+    ("3 wmoUnit:m_s-1", (3.0, 3.0, "m/s")),
+    ("4 wmoUnit:mi_h-1", (4.0, 4.0, "mph")),
+    ("2.5 kt", (2.5, 2.5, "kt")),
+    ("  7 to 9   knots ", (7.0, 9.0, "kt")),
+])
+def test_parse_wind_speed_units(text, expected):
+    assert parse_wind_speed(text) == expected
+
+
+def test_parse_wind_speed_default_unit():
+    assert parse_wind_speed("7") == (7.0, 7.0, "mph")
+    assert parse_wind_speed("7", default_unit="km/h") == (7.0, 7.0, "km/h")
+
+
+@pytest.mark.parametrize("text", ["", None, "calm", "5 mm", "5 furlongs", "5 degF", "to 5 mph", "5 to mph"])
+def test_parse_wind_speed_rejects_unparseable_and_non_speed_units(text):
+    assert parse_wind_speed(text) is None
+
+
+def test_wind_speed_to_converts_and_picks_statistic():
+    assert wind_speed_to("10 to 20 mph", "mph", "low") == pytest.approx(10)
+    assert wind_speed_to("10 to 20 mph", "mph", "mean") == pytest.approx(15)
+    assert wind_speed_to("10 to 20 mph", "mph") == pytest.approx(20)
+    assert wind_speed_to("36 km/h", "m/s") == pytest.approx(10)
+    assert math.isnan(wind_speed_to("5 furlongs"))
+
+
+def test_wind_speeds_to_converts_a_sequence():
+    converted = wind_speeds_to(["10 mph", "10 mph", "1 m/s", "gusty"], "km/h")
+    assert converted.typecode == "d"
+    assert converted[0] == pytest.approx(16.09344)
+    assert converted[1] == converted[0]
+    assert converted[2] == pytest.approx(3.6)
+    assert math.isnan(converted[3])
@@ -0,0 +1,286 @@
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+from gridpoint_cache import GridpointCache
+from forecast_service import RetryPolicy, fetch_json, resolve_gridpoint, forecast_generated_time
+from rate_limiter import HostRateLimiter
+
+"""
+A headless engine that fetches forecasts for many locations at once.
+
+Locations are resolved to gridpoints and fetched on a bounded thread pool. Place names are
+geocoded on the same pool first, if a geocoder is given. Locations that resolve to the same
+gridpoint share one download. Results are yielded one location at a
+time as soon as they are ready, so callers can process thousands of locations without
+holding them all in memory.
+"""
+
+
+class BatchLocation:
+    """A location to fetch, identified by its coordinates and an optional label."""
+
+    def __init__(self, latitude: float, longitude: float, label: str = "") -> None:
+        self.latitude = latitude
+        self.longitude = longitude
+        self.label = label
+
+    @classmethod
+    def coerce(cls, location) -> "BatchLocation":
+        """
+        Accept a BatchLocation, anything with latitude/longitude attributes (e.g. geopy.Location),
+        or a (latitude, longitude[, label]) tuple.
+        """
+        if isinstance(location, cls):
+            return location
+        if hasattr(location, "latitude") and hasattr(location, "longitude"):
+            return cls(location.latitude, location.longitude, getattr(location, "address", "") or "")
+        latitude, longitude, *rest = location
+        return cls(float(latitude), float(longitude), str(rest[0]) if rest else "")
+
+
+class LocationResult:
+    """The outcome of fetching one location in a batch."""
+
+    def __init__(self, index: int, location: BatchLocation, gridpoint=None, daily_forecast: dict = None,
+                 hourly_forecast: dict = None, error: str = "") -> None:
+        """
+        Args:
+            index (int): Position of the location in the input sequence.
+            location (BatchLocation): The requested location.
+            gridpoint (Gridpoint): The gridpoint the location resolved to, if resolution succeeded.
+            daily_forecast (dict): Raw daily forecast JSON, if fetched.
+            hourly_forecast (dict): Raw hourly forecast JSON, if fetched.
+            error (str): Description of what failed; empty on success.
+        """
+        self.index = index
+        self.location = location
+        self.gridpoint = gridpoint
+        self.daily_forecast = daily_forecast
+        self.hourly_forecast = hourly_forecast
+        self.error = error
+
+    @property
+    def success(self) -> bool:
+        return not self.error
+
+    @property
+    def daily_generated_time(self) -> str:
+        return forecast_generated_time(self.daily_forecast) if self.daily_forecast else ""
+
+    @property
+    def hourly_generated_time(self) -> str:
+        return forecast_generated_time(self.hourly_forecast) if self.hourly_forecast else ""
+
+
+class _GridpointForecast:
+    """Downloaded products for one gridpoint, shared by every location that resolves to it."""
+
+    def __init__(self, daily_forecast: dict, hourly_forecast: dict, error: str) -> None:
+        self.daily_forecast = daily_forecast
+        self.hourly_forecast = hourly_forecast
+        self.error = error
+
+
+class BatchForecastEngine:
+    """Fetches forecasts for many locations with bounded concurrency, rate limiting and retries."""
+
+    def __init__(self, max_concurrency: int = 8, requests_per_second: float = 5.0, burst: int = 10,
+                 retry_policy: RetryPolicy = None, include_daily: bool = True, include_hourly: bool = True,
+                 timeout: float = 20, gridpoint_cache: GridpointCache = None, client=None,
+                 shared_result_cache_size: int = 256) -> None:
+        """
+        Args:
+            max_concurrency (int): Maximum number of requests in flight across all locations.
+            requests_per_second (float): Sustained request rate allowed per host.
+            burst (int): Requests per host that may be sent back to back.
+            retry_policy (RetryPolicy): Backoff used on 429/5xx and network errors.
+            include_daily (bool): Fetch the daily forecast.
+            include_hourly (bool): Fetch the hourly forecast.
+            timeout (float): Timeout in seconds for each request.
+            gridpoint_cache (GridpointCache): Cache for /points lookups; by default the on-disk cache
+                                              is used and saved once the batch ends.
+            client (ForecastHttpClient): HTTP client (defaults to the shared one).
+            shared_result_cache_size (int): How many finished gridpoints are remembered so later
+                                            duplicates in the input reuse them.
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limiter = HostRateLimiter(requests_per_second, burst)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.include_daily = include_daily
+        self.include_hourly = include_hourly
+        self.timeout = timeout
+        self.gridpoint_cache = gridpoint_cache if gridpoint_cache is not None else GridpointCache(autosave=False)
+        self.client = client
+        self.shared_result_cache_size = shared_result_cache_size
+        self._cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        """Stop submitting new work; requests already in flight are allowed to finish."""
+        self._cancelled.set()
+
+    def fetch_all(self, locations, geocoder=None) -> list:
+        """Fetch every location and return the results in input order."""
+        return sorted(self.iter_results(locations, geocoder), key=lambda result: result.index)
+
+    def iter_results(self, locations, geocoder=None):
+        """
+        Fetch forecasts for an iterable of locations, yielding a LocationResult for each one
+        as soon as it is complete (not in input order).
+
+        Only a bounded number of locations is pulled from the iterable at a time, so it may be
+        a lazy generator over a very large file.
+
+        Args:
+            locations (iterable): Anything BatchLocation.coerce accepts, or place names (str).
+            geocoder (callable): Turns a place name into an object with latitude and longitude
+                                 (e.g. GeolocatorService.get_location), or None if it is not found.
+                                 Place names are geocoded on the engine's pool, at most half as many
+                                 at a time as max_concurrency, so a rate-limited geocoder never
+                                 holds every worker.
+        """
+        self._cancelled.clear()
+        location_iter = enumerate(locations)
+        max_pending = self.max_concurrency * 4
+        max_geocoding = max(1, self.max_concurrency // 2)
+
+        pending = {}  # future -> ("geocode", (index, name)), ("resolve", index cell) or ("fetch", gridpoint key)
+        to_geocode = deque()  # (index, name) not yet submitted to the geocoder
+        geocoding = 0  # geocodes in flight
+        resolving = {}  # index cell -> [(index, location)] waiting for the /points lookup
+        waiting = {}  # gridpoint key -> [(index, location, gridpoint)] waiting for its download
+        finished = OrderedDict()  # gridpoint key -> _GridpointForecast, most recent last
+        exhausted = False
+
+        def start_resolve(index, location):
+            cell = self.gridpoint_cache.cell_for(location.latitude, location.longitude)
+            if cell in resolving:
+                # The same coordinate is already being looked up
+                resolving[cell].append((index, location))
+                return
+            resolving[cell] = [(index, location)]
+            pending[executor.submit(self._resolve, location)] = ("resolve", cell)
+
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        try:
+            while True:
+                # Keep a bounded number of locations in flight
+                while not exhausted and not self._cancelled.is_set() and len(pending) + len(to_geocode) < max_pending:
+                    try:
+                        index, raw_location = next(location_iter)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    if isinstance(raw_location, str):
+                        if geocoder is None:
+                            yield LocationResult(index, None, error=f"Cannot geocode place name: {raw_location}")
+                        else:
+                            to_geocode.append((index, raw_location))
+                        continue
+                    try:
+                        location = BatchLocation.coerce(raw_location)
+                    except (TypeError, ValueError) as e:
+                        yield LocationResult(index, None, error=f"Invalid location: {str(e)}")
+                        continue
+                    start_resolve(index, location)
+
+                while to_geocode and geocoding < max_geocoding and not self._cancelled.is_set():
+                    index, name = to_geocode.popleft()
+                    pending[executor.submit(geocoder, name)] = ("geocode", (index, name))
+                    geocoding += 1
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind, payload = pending.pop(future)
+                    if kind == "geocode":
+                        geocoding -= 1
+                        index, name = payload
+                        try:
+                            found = future.result()
+                        except Exception as e:
+                            yield LocationResult(index, None, error=f"Geocoding failed: {str(e)}")
+                            continue
+                        if found is None:
+                            yield LocationResult(index, None, error=f"Location not found: {name}")
+                            continue
+                        start_resolve(index, BatchLocation(found.latitude, found.longitude, name))
+                    elif kind == "resolve":
+                        resolved_locations = resolving.pop(payload)
+                        try:
+                            gridpoint = future.result()
+                        except requests.exceptions.RequestException as e:
+                            for index, location in resolved_locations:
+                                yield LocationResult(index, location, error=f"Gridpoint lookup failed: {str(e)}")
+                            continue
+                        except (KeyError, TypeError, ValueError) as e:
+                            for index, location in resolved_locations:
+                                yield LocationResult(index, location, error=f"Invalid points response: {str(e)}")
+                            continue
+                        except OSError as e:
+                            for index, location in resolved_locations:
+                                yield LocationResult(index, location, error=f"Gridpoint cache save failed: {str(e)}")
+                            continue
+
+                        shared = finished.get(gridpoint.key)
+                        if shared is not None:
+                            finished.move_to_end(gridpoint.key)
+                            for index, location in resolved_locations:
+                                yield self._make_result(index, location, gridpoint, shared)
+                            continue
+
+                        if gridpoint.key not in waiting:
+                            waiting[gridpoint.key] = []
+                            fetch_future = executor.submit(self._fetch_products, gridpoint)
+                            pending[fetch_future] = ("fetch", gridpoint.key)
+                        # Every location on this gridpoint shares one download
+                        waiting[gridpoint.key].extend(
+                            (index, location, gridpoint) for index, location in resolved_locations
+                        )
+                    else:
+                        try:
+                            shared = future.result()
+                        except Exception as e:
+                            # Not kept in finished, so a later location on this gridpoint tries again
+                            for index, location, gridpoint in waiting.pop(payload, []):
+                                yield LocationResult(index, location, gridpoint,
+                                                     error=f"Forecast fetch failed: {str(e)}")
+                            continue
+                        finished[payload] = shared
+                        while len(finished) > self.shared_result_cache_size:
+                            finished.popitem(last=False)
+                        for index, location, gridpoint in waiting.pop(payload, []):
+                            yield self._make_result(index, location, gridpoint, shared)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            try:
+                self.gridpoint_cache.save()
+            except OSError:
+                pass
+
+    def _resolve(self, location: BatchLocation):
+        return resolve_gridpoint(location.latitude, location.longitude, self.timeout, self.client,
+                                 self.gridpoint_cache, self.rate_limiter, self.retry_policy)
+
+    def _fetch_products(self, gridpoint) -> _GridpointForecast:
+        """Download the requested products for one gridpoint, capturing errors per product."""
+        products = {"daily": None, "hourly": None}
+        errors = []
+        for name, url, enabled in (("daily", gridpoint.forecast_url, self.include_daily),
+                                   ("hourly", gridpoint.forecast_hourly_url, self.include_hourly)):
+            if not enabled:
+                continue
+            try:
+                products[name] = fetch_json(url, self.timeout, self.client, self.rate_limiter,
+                                            self.retry_policy).data
+            except requests.exceptions.RequestException as e:
+                errors.append(f"{name.capitalize()} forecast fetch failed: {str(e)}")
+        return _GridpointForecast(products["daily"], products["hourly"], "; ".join(errors))
+
+    def _make_result(self, index: int, location: BatchLocation, gridpoint,
+                     shared: _GridpointForecast) -> LocationResult:
+        return LocationResult(index, location, gridpoint, shared.daily_forecast, shared.hourly_forecast,
+                              shared.error)
@@ -0,0 +1,129 @@
+import threading
+from array import array
+
+"""
+Dictionary encoding for forecast fields that repeat a handful of values.
+
+Fields such as the short forecast, wind direction and icon URL take only a few distinct
+values across a series. A CategoricalColumn stores one 32-bit code per row instead of a
+reference to a separate string per row, and the code tables are shared process-wide by
+field name, so thousands of series hold each distinct string exactly once and rows from
+different series can be compared by code.
+"""
+
+
+# Class mapping the distinct values of one field to small integer codes
+class CodeTable:
+    def __init__(self, name=""):
+        """
+        Args:
+            name (str): Field the table encodes, for diagnostics.
+        """
+        self.name = name
+        self.values = []  # code -> value
+        self.codes = {}  # value -> code
+        self._lock = threading.Lock()
+
+    def code(self, value):
+        """Return the code of a value, adding it to the table if it is new."""
+        code = self.codes.get(value)
+        if code is None:
+            with self._lock:
+                code = self.codes.get(value)
+                if code is None:
+                    code = len(self.values)
+                    self.values.append(value)
+                    self.codes[value] = code
+        return code
+
+    def intern(self, value):
+        """Return the table's own copy of a value, so equal values share one object."""
+        return self.values[self.code(value)]
+
+    def __len__(self):
+        return len(self.values)
+
+
+_shared_tables = {}
+_shared_tables_lock = threading.Lock()
+
+
+def shared_table(name):
+    """Return the process-wide code table for a field, creating it on first use."""
+    table = _shared_tables.get(name)
+    if table is None:
+        with _shared_tables_lock:
+            table = _shared_tables.setdefault(name, CodeTable(name))
+    return table
+
+
+# Class for a column of dictionary-encoded values
+class CategoricalColumn:
+    """
+    A sequence of values stored as codes into a CodeTable. It supports len(), indexing,
+    slicing and iteration like the list it replaces; the raw codes are in .codes.
+    """
+
+    __slots__ = ('table', 'codes')
+
+    def __init__(self, table, values=()):
+        """
+        Args:
+            table (CodeTable): Table the codes refer to, normally a shared_table.
+            values (iterable): Initial values.
+        """
+        self.table = table
+        self.codes = array('I', [table.code(value) for value in values])
+
+    def append(self, value):
+        code = self.table.codes.get(value)  # Known values skip the call into the table
+        if code is None:
+            code = self.table.code(value)
+        self.codes.append(code)
+
+    def extend(self, values):
+        """Append values; a column with the same table is appended code by code."""
+        if isinstance(values, CategoricalColumn) and values.table is self.table:
+            self.codes.extend(values.codes)
+        else:
+            code = self.table.code
+            self.codes.extend(array('I', [code(value) for value in values]))
+
+    def extend_indexed(self, indexes, values):
+        """
+        Append values[index] for every index, encoding each distinct index once. Values that
+        no index refers to are not added to the table.
+
+        Args:
+            indexes (sequence): Positions into values, one per row (e.g. a snapshot's string ids).
+            values (list): The values the indexes refer to.
+        """
+        translation = [0] * len(values)
+        for index in set(indexes):
+            translation[index] = self.table.code(values[index])
+        self.codes.extend(array('I', map(translation.__getitem__, indexes)))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        values = self.table.values
+        if isinstance(index, slice):
+            return [values[code] for code in self.codes[index]]
+        return values[self.codes[index]]
+
+    def __iter__(self):
+        values = self.table.values
+        for code in self.codes:
+            yield values[code]
+
+    def __eq__(self, other):
+        if isinstance(other, CategoricalColumn) and other.table is self.table:
+            return self.codes == other.codes
+        try:
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return f"CategoricalColumn({self.table.name!r}, {list(self)!r})"
@@ -1,14 +1,33 @@
-# Conversion function for Fahrenheit to Celsius
-def fahrenheit_to_celsius(f: float) -> float:
-    return (f - 32) / 1.8
+from functools import lru_cache
+from operator import itemgetter
+from categorical import shared_table
+from units import fahrenheit_to_celsius, celsius_to_fahrenheit
 
-# Conversion function for Celsius to Fahrenheit
-def celsius_to_fahrenheit(c: float) -> float:
-    return c * 1.8 + 32
+# Accepted column names for each DailyForecast field, in order of preference. The first name is
+# what ForecastWorker writes; the others are the column names used by older files.
+DAILY_COLUMN_ALIASES = {
+    'period_name': ('name', 'period_name'),
+    'temperature': ('temperature',),
+    'temperature_unit': ('temperature_unit',),
+    'probability_of_precipitation': ('precipitation_probability_value', 'probability_of_precipitation'),
+    'icon_url': ('weather_icon_url', 'icon'),
+    'detailed_forecast': ('detailed_forecast',),
+    'forecast_period': ('forecast_period', 'number'),
+    'start_time': ('start_time',),
+}
+
+# Period names and icon URLs repeat across locations and refreshes; each distinct value is kept once
+_period_names = shared_table('period_names')
+_icon_urls = shared_table('icon_urls')
 
 # DailyForecast class to represent a single period of daily weather data
 class DailyForecast:
-    def __init__(self, period_name, temperature_fahrenheit, temperature_celsius, chance_of_rain, icon_url, detailed_forecast):
+    # Fixed attribute layout instead of a per-instance __dict__
+    __slots__ = ('period_name', 'temperature_fahrenheit', 'temperature_celsius', 'chance_of_rain', 'icon_url',
+                 'detailed_forecast', 'forecast_period', 'start_time')
+
+    def __init__(self, period_name, temperature_fahrenheit, temperature_celsius, chance_of_rain, icon_url, detailed_forecast,
+                 forecast_period='', start_time=''):
         """
         Initialize a DailyForecast object with the specified attributes.
         
@@ -19,6 +38,8 @@ class DailyForecast:
             chance_of_rain (str): Probability of precipitation (e.g., "90%").
             icon_url (str): URL to the weather icon.
             detailed_forecast (str): Detailed weather description.
+            forecast_period (str): Period number from the API (e.g., "1"), if known.
+            start_time (str): ISO format start time of the period, if known.
         """
         self.period_name = period_name
         self.temperature_fahrenheit = temperature_fahrenheit
@@ -26,6 +47,8 @@ class DailyForecast:
         self.chance_of_rain = chance_of_rain
         self.icon_url = icon_url
         self.detailed_forecast = detailed_forecast
+        self.forecast_period = forecast_period
+        self.start_time = start_time
 
     @classmethod
     def from_dict(cls, data_dict):
@@ -33,45 +56,103 @@ class DailyForecast:
         Create a DailyForecast object from a dictionary, handling data cleaning and conversion.
         
         Args:
-            data_dict (dict): Dictionary containing CSV row data with keys:
-                'period_name', 'temperature', 'temperature_unit', 'probability_of_precipitation',
-                'icon', 'detailed_forecast'.
+            data_dict (dict): Dictionary containing CSV row data. Column names are resolved through
+                DAILY_COLUMN_ALIASES, so both the worker's keys ('name', 'precipitation_probability_value',
+                'weather_icon_url') and the older keys ('period_name', 'probability_of_precipitation',
+                'icon') are accepted, along with 'temperature', 'temperature_unit', 'detailed_forecast',
+                'forecast_period' and 'start_time'.
         
         Returns:
             DailyForecast: A new instance with cleaned and converted data.
         """
         # Extract and clean data from the dictionary
-        period_name = data_dict.get('period_name', '').strip()
-        temperature_str = data_dict.get('temperature', '').strip()
-        temperature_unit = data_dict.get('temperature_unit', '').strip().upper()
-        probability_of_precipitation = data_dict.get('probability_of_precipitation', '').strip()
-        icon_url = data_dict.get('icon', '').strip()
-        detailed_forecast = data_dict.get('detailed_forecast', '').strip()
-
-        # Handle missing or invalid temperature data
-        if not temperature_str or not temperature_unit:
-            temperature_fahrenheit = "N/A"
-            temperature_celsius = "N/A"
-        else:
-            try:
-                temperature = float(temperature_str)
-                if temperature_unit == 'F':
-                    temperature_fahrenheit = f"{int(temperature)} F"
-                    celsius = (temperature - 32) * 5 / 9
-                    temperature_celsius = f"{round(celsius)} C"
-                elif temperature_unit == 'C':
-                    temperature_celsius = f"{int(temperature)} C"
-                    fahrenheit = (temperature * 9 / 5) + 32
-                    temperature_fahrenheit = f"{round(fahrenheit)} F"
-                else:
-                    temperature_fahrenheit = "N/A"
-                    temperature_celsius = "N/A"
-            except ValueError:
-                temperature_fahrenheit = "N/A"
-                temperature_celsius = "N/A"
-
-        # Format chance of rain
-        chance_of_rain = f"{probability_of_precipitation}%" if probability_of_precipitation else "N/A"
+        values = {}
+        for field, aliases in DAILY_COLUMN_ALIASES.items():
+            value = next((data_dict[alias] for alias in aliases if data_dict.get(alias) is not None), '')
+            values[field] = value.strip()
+
+        temperature_fahrenheit, temperature_celsius = format_temperatures(values['temperature'],
+                                                                          values['temperature_unit'])
 
         # Return a new DailyForecast instance
-        return cls(period_name, temperature_fahrenheit, temperature_celsius, chance_of_rain, icon_url, detailed_forecast)
\ No newline at end of file
+        return cls(_period_names.intern(values['period_name']), temperature_fahrenheit, temperature_celsius,
+                   format_chance_of_rain(values['probability_of_precipitation']),
+                   _icon_urls.intern(values['icon_url']), values['detailed_forecast'], values['forecast_period'],
+                   values['start_time'])
+
+
+# Function to format a temperature in both units; daily forecasts repeat a few dozen distinct values
+@lru_cache(maxsize=512)
+def format_temperatures(temperature_str, temperature_unit):
+    """
+    Format a temperature for display in Fahrenheit and Celsius.
+
+    Args:
+        temperature_str (str): Temperature value (e.g., "60").
+        temperature_unit (str): 'F' or 'C' (case-insensitive).
+
+    Returns:
+        tuple: (temperature_fahrenheit, temperature_celsius), e.g. ("60 F", "16 C"), or ("N/A", "N/A")
+               if the data is missing or invalid.
+    """
+    temperature_unit = temperature_unit.strip().upper()
+    # Handle missing or invalid temperature data
+    if not temperature_str or not temperature_unit:
+        return "N/A", "N/A"
+    try:
+        temperature = float(temperature_str)
+    except ValueError:
+        return "N/A", "N/A"
+    if temperature_unit == 'F':
+        return f"{int(temperature)} F", f"{round(fahrenheit_to_celsius(temperature))} C"
+    if temperature_unit == 'C':
+        return f"{round(celsius_to_fahrenheit(temperature))} F", f"{int(temperature)} C"
+    return "N/A", "N/A"
+
+
+# Function to format the chance of rain for display
+@lru_cache(maxsize=128)
+def format_chance_of_rain(probability_of_precipitation):
+    """Returns e.g. "90%", or "N/A" if the probability is missing."""
+    return f"{probability_of_precipitation}%" if probability_of_precipitation else "N/A"
+
+
+# Class to build DailyForecast objects from positional CSV rows
+class DailyRowParser:
+    """
+    Resolves the header-to-field mapping of a daily CSV file once, then converts rows
+    (lists of strings) by position without per-row dictionary lookups.
+    """
+
+    def __init__(self, header):
+        """
+        Args:
+            header (list): Column names from the first line of the CSV file. Any column may be
+                           missing; its field is then left empty, as with from_dict.
+        """
+        positions = {name.strip(): index for index, name in enumerate(header)}
+        self.indexes = {}
+        for field, aliases in DAILY_COLUMN_ALIASES.items():
+            self.indexes[field] = next((positions[alias] for alias in aliases if alias in positions), None)
+
+        # Missing columns point one past the header, where short rows are padded with ''
+        columns = [len(header) if index is None else index for index in self.indexes.values()]
+        self.last_column = max(columns)
+        self._pick = itemgetter(*columns)
+
+    def parse(self, row):
+        """
+        Convert one row into a DailyForecast. Cells are stripped of surrounding whitespace,
+        as in from_dict.
+
+        Returns:
+            DailyForecast: A new instance with converted data.
+        """
+        if len(row) <= self.last_column:
+            row = row + [''] * (self.last_column + 1 - len(row))
+        (period_name, temperature, temperature_unit, probability_of_precipitation, icon_url,
+         detailed_forecast, forecast_period, start_time) = [value.strip() for value in self._pick(row)]
+        temperature_fahrenheit, temperature_celsius = format_temperatures(temperature, temperature_unit)
+        return DailyForecast(_period_names.intern(period_name), temperature_fahrenheit, temperature_celsius,
+                             format_chance_of_rain(probability_of_precipitation), _icon_urls.intern(icon_url),
+                             detailed_forecast, forecast_period, start_time)
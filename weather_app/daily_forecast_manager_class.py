@@ -1,6 +1,7 @@
 import csv
 from datetime import datetime
-from daily_forecast_class import DailyForecast
+from daily_forecast_class import DailyForecast, DailyRowParser
+from forecast_snapshot import Snapshot
 
 # DailyForecastManager class to load and manage daily forecast data from a CSV file
 class DailyForecastManager:
@@ -24,11 +25,13 @@ class DailyForecastManager:
             bool: True if loading succeeds, False otherwise.
         """
         try:
-            with open(self.csv_filename, 'r') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    forecast = DailyForecast.from_dict(row)
-                    self.forecasts.append(forecast)
+            with open(self.csv_filename, 'r', encoding='utf-8', newline='') as file:
+                reader = csv.reader(file)
+                header = next(reader, None)
+                if header is not None:
+                    # Resolve the column mapping once, then convert rows by position
+                    parse = DailyRowParser(header).parse
+                    self.forecasts.extend(parse(row) for row in reader if row)
             return True
         except FileNotFoundError:
             print(f"File {self.csv_filename} not found.")
@@ -37,6 +40,33 @@ class DailyForecastManager:
             print(f"Error loading forecasts: {e}")
             return False
 
+    def load_snapshot(self, path):
+        """
+        Load forecasts from a binary snapshot written by forecast_snapshot.write_daily_snapshot.
+
+        Returns:
+            bool: True if loading succeeds, False otherwise.
+        """
+        try:
+            with Snapshot(path) as snapshot:
+                self.forecasts.extend(snapshot.to_daily_forecasts())
+            return True
+        except (OSError, ValueError) as e:
+            print(f"Error loading forecast snapshot {path}: {e}")
+            return False
+
+    def load_rows(self, rows):
+        """
+        Load forecasts from CSV-style row dictionaries that are already in memory
+        (e.g., rows parsed straight from the API response by the forecast worker).
+
+        Args:
+            rows (iterable): Row dictionaries with the same keys as the CSV columns.
+        """
+        for row in rows:
+            forecast = DailyForecast.from_dict(row)
+            self.forecasts.append(forecast)
+
     def get_forecasts(self):
         """
         Retrieve the list of loaded DailyForecast objects.
@@ -0,0 +1,697 @@
+import bisect
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import quote
+from local_storage import get_cache_dir, atomic_write_bytes
+from forecast_store import DAILY, HOURLY
+from forecast_snapshot import Snapshot, write_daily_snapshot, write_hourly_snapshot, DAILY_COLUMNS, HOURLY_COLUMNS
+from forecast_time import parse_timestamp, SECONDS_PER_HOUR
+from hourly_forecast_series import HourlyForecastSeries
+
+"""
+An append-only archive of every forecast fetched, for comparing what was forecast for the
+same hour at different generatedAt times.
+
+Each archived forecast is a run of rows in a segment file, which is a forecast snapshot (see
+forecast_snapshot). A new forecast is written to a segment of its own; compaction later
+merges the small segments of a gridpoint into larger ones, so a location's history is read
+from a few memory-mapped files. The manifest, one JSON line per archived forecast, records
+where every forecast's rows are and the span of time they are valid for:
+
+    archive/manifest.jsonl
+    archive/segments/OKX%2F33%2C35/hourly--2025-04-28T21%3A00%3A00%2B00%3A00--1f0c9a2e.snap
+
+The manifest is a log: appending a forecast writes its segment and then appends its line,
+compaction appends a line for every forecast it moves (a later line for a forecast replaces
+the earlier one), and retention appends a 'removed' line. Once most lines are out of date the
+manifest is rewritten atomically. Lines appended by another process are picked up on the
+next call, but only one process should compact or apply retention at a time. A segment
+written just before a crash has no manifest line; compaction deletes such files once they
+are older than ORPHAN_SEGMENT_AGE_SECONDS.
+
+The manifest is read into an in-memory index on first use. For every gridpoint and kind
+the forecasts are kept sorted by the start of their validity, and since no forecast covers
+more than max_span seconds, the forecasts valid at a time are found with two binary searches
+rather than a scan. The newest forecast of every gridpoint is kept up to date as well.
+"""
+
+MANIFEST_NAME = "manifest.jsonl"
+
+# Unreferenced segment files younger than this may belong to an append still in progress
+ORPHAN_SEGMENT_AGE_SECONDS = 3600
+
+# Validity assumed for the last period of a daily forecast, whose end time is not stored
+DAILY_PERIOD_SECONDS = 12 * SECONDS_PER_HOUR
+
+
+class ArchiveEntry:
+    """One archived forecast: rows first_row:first_row + rows of a segment file."""
+
+    __slots__ = ('gridpoint_key', 'kind', 'generated_at', 'generated_epoch', 'segment', 'first_row', 'rows',
+                 'valid_from', 'valid_to')
+
+    def __init__(self, gridpoint_key: str, kind: str, generated_at: str, segment: str, first_row: int, rows: int,
+                 valid_from: int, valid_to: int) -> None:
+        """
+        Args:
+            gridpoint_key (str): Gridpoint identifier, e.g. 'OKX/33,35'.
+            kind (str): 'daily' or 'hourly'.
+            generated_at (str): The forecast's generatedAt timestamp.
+            segment (str): Path of the segment file, relative to the archive's segment directory.
+            first_row (int): Index of the forecast's first row in the segment.
+            rows (int): Number of rows (hours or periods).
+            valid_from (int): POSIX time the first row starts.
+            valid_to (int): POSIX time the last row ends.
+        """
+        self.gridpoint_key = gridpoint_key
+        self.kind = kind
+        self.generated_at = generated_at
+        self.generated_epoch = _epoch_or_zero(generated_at)
+        self.segment = segment
+        self.first_row = first_row
+        self.rows = rows
+        self.valid_from = valid_from
+        self.valid_to = valid_to
+
+    @property
+    def key(self) -> tuple:
+        """(gridpoint_key, kind, generated_at), which identifies the forecast in the archive."""
+        return self.gridpoint_key, self.kind, self.generated_at
+
+    def moved_to(self, segment: str, first_row: int) -> "ArchiveEntry":
+        """Return a copy of the entry pointing at another segment, as after compaction."""
+        return ArchiveEntry(self.gridpoint_key, self.kind, self.generated_at, segment, first_row, self.rows,
+                            self.valid_from, self.valid_to)
+
+    def to_json(self) -> dict:
+        return {"gridpoint": self.gridpoint_key, "kind": self.kind, "generated_at": self.generated_at,
+                "segment": self.segment, "first_row": self.first_row, "rows": self.rows,
+                "valid_from": self.valid_from, "valid_to": self.valid_to}
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ArchiveEntry":
+        """
+        Raises:
+            KeyError: If a field is missing.
+            TypeError, ValueError: If a field has the wrong type.
+        """
+        return cls(str(data["gridpoint"]), str(data["kind"]), str(data["generated_at"]), str(data["segment"]),
+                   int(data["first_row"]), int(data["rows"]), int(data["valid_from"]), int(data["valid_to"]))
+
+    def __repr__(self) -> str:
+        return f"ArchiveEntry({self.gridpoint_key!r}, {self.kind!r}, {self.generated_at!r}, rows={self.rows})"
+
+
+class _Timeline:
+    """The archived forecasts of one gridpoint and kind, ordered by the start of their validity."""
+
+    def __init__(self, entries=()) -> None:
+        self.entries = []  # sorted by valid_from
+        self.starts = []  # valid_from of each entry, for bisect
+        self.max_span = 0  # longest valid_to - valid_from of any entry
+        self.latest = None  # the entry generated last
+        for entry in sorted(entries, key=lambda entry: entry.valid_from):
+            self.add(entry)
+
+    def add(self, entry: ArchiveEntry) -> None:
+        position = bisect.bisect_right(self.starts, entry.valid_from)
+        self.starts.insert(position, entry.valid_from)
+        self.entries.insert(position, entry)
+        self.max_span = max(self.max_span, entry.valid_to - entry.valid_from)
+        if self.latest is None or _generation_order(entry) > _generation_order(self.latest):
+            self.latest = entry
+
+    def remove(self, entry: ArchiveEntry) -> None:
+        position = bisect.bisect_left(self.starts, entry.valid_from)
+        while self.entries[position] is not entry:
+            position += 1
+        del self.starts[position]
+        del self.entries[position]
+        # max_span is left as it is; it only has to be an upper bound
+        if self.latest is entry:
+            self.latest = max(self.entries, key=_generation_order, default=None)
+
+    def valid_at(self, when: int) -> list:
+        """Entries whose validity contains when, oldest generation first."""
+        # Only entries starting in (when - max_span, when] can cover when
+        low = bisect.bisect_right(self.starts, when - self.max_span)
+        high = bisect.bisect_right(self.starts, when)
+        matches = [entry for entry in self.entries[low:high] if entry.valid_to > when]
+        matches.sort(key=_generation_order)
+        return matches
+
+
+class ForecastArchive:
+    """Archives forecasts by gridpoint and generation time, and finds them by location and valid time."""
+
+    def __init__(self, root: str = None, max_age_seconds: float = 90 * 24 * 3600,
+                 max_forecasts_per_gridpoint: int = None, compact_after: int = 32,
+                 max_segment_rows: int = 100_000, max_open_segments: int = 64) -> None:
+        """
+        Args:
+            root (str): Directory holding the archive (defaults to 'archive' in the cache directory).
+            max_age_seconds (float): Forecasts generated longer ago than this are removed by apply_retention
+                                     (None keeps them). The newest forecast of each gridpoint is always kept.
+            max_forecasts_per_gridpoint (int): Number of forecasts of each kind kept per gridpoint (None for no limit).
+            compact_after (int): A gridpoint's segments are compacted, and retention applied to it, when an
+                                 append brings its number of segments of one kind to this many.
+            max_segment_rows (int): Rows per segment written by compaction; larger segments are left alone
+                                    unless less than half of their rows are still archived.
+            max_open_segments (int): Segment files kept memory-mapped between calls.
+        """
+        self.root = root or get_cache_dir("archive")
+        os.makedirs(self.root, exist_ok=True)
+        self.max_age_seconds = max_age_seconds
+        self.max_forecasts_per_gridpoint = max_forecasts_per_gridpoint
+        self.compact_after = compact_after
+        self.max_segment_rows = max_segment_rows
+        self.max_open_segments = max_open_segments
+        self._lock = threading.RLock()
+        self._entries = {}  # (gridpoint_key, kind, generated_at) -> ArchiveEntry
+        self._timelines = {}  # (gridpoint_key, kind) -> _Timeline
+        self._segment_rows = {}  # segment -> number of rows in the file
+        self._segment_refs = {}  # segment -> number of archived forecasts in it
+        self._manifest_lines = 0  # lines read from or appended to the manifest
+        self._open_segments = OrderedDict()  # segment -> Snapshot, least recently used first
+        self._manifest_state = None  # (inode, bytes read) of the manifest, None until it is read
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.root, MANIFEST_NAME)
+
+    def append_hourly(self, gridpoint_key: str, series: HourlyForecastSeries, generated_at: str):
+        """
+        Archive an hourly forecast. Gridded layers attached to the series are not archived.
+
+        Returns:
+            ArchiveEntry: The archived forecast, or the existing entry if a forecast with the same
+                          generation time is already archived for the gridpoint; None if the series is empty.
+
+        Raises:
+            OSError: If the archive cannot be written.
+        """
+        if not len(series):
+            return None
+        return self._append(gridpoint_key, HOURLY, generated_at, len(series), series.epochs[0],
+                            series.epochs[-1] + SECONDS_PER_HOUR,
+                            lambda path: write_hourly_snapshot(path, series, generated_at))
+
+    def append_daily(self, gridpoint_key: str, forecasts: list, generated_at: str):
+        """
+        Archive a daily forecast.
+
+        Returns:
+            ArchiveEntry: As for append_hourly; None if there are no periods.
+
+        Raises:
+            OSError: If the archive cannot be written.
+            ValueError: If a period has no valid start_time.
+        """
+        if not forecasts:
+            return None
+        starts = [parse_timestamp(forecast.start_time)[0] for forecast in forecasts]
+        return self._append(gridpoint_key, DAILY, generated_at, len(forecasts), starts[0],
+                            starts[-1] + DAILY_PERIOD_SECONDS,
+                            lambda path: write_daily_snapshot(path, forecasts, generated_at))
+
+    def gridpoints(self) -> list:
+        """Return the keys of all gridpoints with archived forecasts."""
+        with self._lock:
+            self._refresh()
+            return sorted({gridpoint_key for gridpoint_key, _ in self._timelines})
+
+    def entries(self, gridpoint_key: str, kind: str = HOURLY) -> list:
+        """Return the archived forecasts of one kind for a gridpoint, newest first."""
+        with self._lock:
+            self._refresh()
+            timeline = self._timelines.get((gridpoint_key, kind))
+            return sorted(timeline.entries, key=_generation_order, reverse=True) if timeline else []
+
+    def latest(self, gridpoint_key: str, kind: str = HOURLY):
+        """Return the newest archived forecast of one kind for a gridpoint, or None."""
+        with self._lock:
+            self._refresh()
+            timeline = self._timelines.get((gridpoint_key, kind))
+            return timeline.latest if timeline else None
+
+    def latest_per_location(self, kind: str = HOURLY) -> dict:
+        """Return {gridpoint_key: newest ArchiveEntry} for every gridpoint with forecasts of a kind."""
+        with self._lock:
+            self._refresh()
+            return {gridpoint_key: timeline.latest for (gridpoint_key, timeline_kind), timeline
+                    in self._timelines.items() if timeline_kind == kind}
+
+    def entries_valid_at(self, gridpoint_key: str, when, kind: str = HOURLY) -> list:
+        """
+        Return the archived forecasts of a gridpoint that cover a time, oldest generation first.
+
+        Args:
+            when (int or str): POSIX time, or an ISO 8601 timestamp.
+
+        Raises:
+            ValueError: If when is a malformed timestamp.
+        """
+        when = _to_epoch(when)
+        with self._lock:
+            self._refresh()
+            timeline = self._timelines.get((gridpoint_key, kind))
+            return timeline.valid_at(when) if timeline else []
+
+    def forecasts_valid_at(self, gridpoint_key: str, when, kind: str = HOURLY) -> list:
+        """
+        Return what every archived forecast of a gridpoint predicted for a time.
+
+        Args:
+            when (int or str): POSIX time, or an ISO 8601 timestamp.
+
+        Returns:
+            list: (ArchiveEntry, HourlyForecast or DailyForecast) pairs, oldest generation first. The
+                  forecast is the hour (or daily period) containing when.
+
+        Raises:
+            ValueError: If when is malformed or a segment file is not a valid snapshot.
+            OSError: If a segment file cannot be read.
+        """
+        when = _to_epoch(when)
+        with self._lock:
+            results = []
+            for entry in self.entries_valid_at(gridpoint_key, when, kind):
+                snapshot = self._snapshot(entry.segment)
+                row = self._row_at(snapshot, entry, when)
+                if row is None:
+                    continue
+                if kind == HOURLY:
+                    forecast = snapshot.hourly_forecast(row)
+                else:
+                    forecast = snapshot.to_daily_forecasts(row, row + 1)[0]
+                results.append((entry, forecast))
+            return results
+
+    def load(self, entry: ArchiveEntry):
+        """
+        Load an archived forecast.
+
+        Returns:
+            HourlyForecastSeries for an hourly forecast, or a list of DailyForecast objects.
+
+        Raises:
+            ValueError: If the segment file is not a valid snapshot.
+            OSError: If the segment file cannot be read.
+        """
+        with self._lock:
+            snapshot = self._snapshot(entry.segment)
+            if entry.kind == HOURLY:
+                return snapshot.to_hourly_series(entry.first_row, entry.first_row + entry.rows)
+            return snapshot.to_daily_forecasts(entry.first_row, entry.first_row + entry.rows)
+
+    def column(self, entry: ArchiveEntry, name: str):
+        """
+        Read one column of an archived forecast without building forecast objects, e.g.
+        'temperature_f' or 'epochs' of an hourly forecast.
+
+        Returns:
+            array: The column's values, or a list for a text column.
+
+        Raises:
+            KeyError: If there is no such column.
+            ValueError, OSError: As for load.
+        """
+        typecode = dict(HOURLY_COLUMNS if entry.kind == HOURLY else DAILY_COLUMNS)[name]
+        start, stop = entry.first_row, entry.first_row + entry.rows
+        with self._lock:
+            snapshot = self._snapshot(entry.segment)
+            if typecode == "S":
+                return snapshot.strings(name, start, stop)
+            return snapshot.column_values(name, start, stop)
+
+    def apply_retention(self, now: float = None) -> int:
+        """
+        Remove forecasts beyond max_age_seconds and max_forecasts_per_gridpoint.
+
+        Segments left without forecasts are deleted; rows removed from compacted segments are
+        dropped at the next compaction.
+
+        Returns:
+            int: Number of forecasts removed.
+
+        Raises:
+            OSError: If the manifest cannot be rewritten.
+        """
+        with self._lock:
+            self._refresh()
+            expired = []
+            for timeline in self._timelines.values():
+                expired.extend(self._expired(timeline, now))
+            self._remove(expired)
+            return len(expired)
+
+    def compact(self, gridpoint_key: str = None, kind: str = None) -> int:
+        """
+        Merge small segments into segments of up to max_segment_rows rows, leaving out rows of
+        forecasts that are no longer archived, and delete segment files the manifest does not
+        refer to.
+
+        Args:
+            gridpoint_key (str): Only compact this gridpoint (defaults to all).
+            kind (str): Only compact this kind (defaults to both).
+
+        Returns:
+            int: Number of segments written.
+
+        Raises:
+            OSError: If a segment or the manifest cannot be written.
+            ValueError: If a segment file is not a valid snapshot.
+        """
+        with self._lock:
+            self._refresh()
+            written = 0
+            for timeline_key in list(self._timelines):
+                if gridpoint_key in (None, timeline_key[0]) and kind in (None, timeline_key[1]):
+                    written += self._compact_timeline(timeline_key)
+            self._remove_orphan_segments(gridpoint_key)
+            return written
+
+    def close(self) -> None:
+        """Unmap all open segment files."""
+        with self._lock:
+            for snapshot in self._open_segments.values():
+                snapshot.close()
+            self._open_segments.clear()
+
+    def _append(self, gridpoint_key: str, kind: str, generated_at: str, rows: int, valid_from: int, valid_to: int,
+                write_segment):
+        """Write a new forecast's segment and record it in the manifest."""
+        with self._lock:
+            self._refresh()
+            existing = self._entries.get((gridpoint_key, kind, generated_at))
+            if existing is not None:
+                return existing
+
+        # The segment is written without holding the lock; its name is unique
+        segment = self._new_segment_name(gridpoint_key, kind, generated_at)
+        write_segment(self._segment_path(segment))
+        entry = ArchiveEntry(gridpoint_key, kind, generated_at, segment, 0, rows, int(valid_from), int(valid_to))
+
+        with self._lock:
+            self._refresh()
+            existing = self._entries.get(entry.key)
+            if existing is not None:
+                # Archived by another thread or process in the meantime
+                self._delete_segment(segment)
+                return existing
+            self._append_manifest([entry.to_json()])
+            self._put(entry)
+
+            timeline_key = (gridpoint_key, kind)
+            segments = {timeline_entry.segment for timeline_entry in self._timelines[timeline_key].entries}
+            if len(segments) >= self.compact_after:
+                self._remove(self._expired(self._timelines[timeline_key], None))
+                if timeline_key in self._timelines:
+                    self._compact_timeline(timeline_key)
+            return entry
+
+    def _expired(self, timeline: _Timeline, now: float) -> list:
+        """Entries of a timeline that the retention policy removes; the newest is always kept."""
+        cutoff = None if self.max_age_seconds is None else (now or time.time()) - self.max_age_seconds
+        expired = []
+        for index, entry in enumerate(sorted(timeline.entries, key=_generation_order, reverse=True)):
+            if index == 0:
+                continue
+            if (self.max_forecasts_per_gridpoint is not None and index >= self.max_forecasts_per_gridpoint) \
+                    or (cutoff is not None and entry.generated_epoch < cutoff):
+                expired.append(entry)
+        return expired
+
+    def _compact_timeline(self, timeline_key: tuple) -> int:
+        """Compact the segments of one gridpoint and kind. Caller holds the lock."""
+        by_segment = {}
+        for entry in self._timelines[timeline_key].entries:
+            by_segment.setdefault(entry.segment, []).append(entry)
+        candidates = []
+        has_dead_rows = False
+        for segment, entries in by_segment.items():
+            total = self._segment_rows.get(segment, 0)
+            live = sum(entry.rows for entry in entries)
+            if total < self.max_segment_rows or live * 2 < total:
+                candidates.append(segment)
+                has_dead_rows = has_dead_rows or live < total
+        if len(candidates) < 2 and not has_dead_rows:
+            return 0
+
+        # Rewrite the candidates' forecasts, oldest generation first, into segments of up to max_segment_rows
+        moving = sorted((entry for segment in candidates for entry in by_segment[segment]), key=_generation_order)
+        chunks = [[]]
+        rows = 0
+        for entry in moving:
+            if chunks[-1] and rows + entry.rows > self.max_segment_rows:
+                chunks.append([])
+                rows = 0
+            chunks[-1].append(entry)
+            rows += entry.rows
+
+        gridpoint_key, kind = timeline_key
+        moved = []
+        written = []
+        try:
+            for chunk in chunks:
+                segment = self._new_segment_name(gridpoint_key, kind, "compacted")
+                written.append(segment)
+                first_row = 0
+                combined = HourlyForecastSeries() if kind == HOURLY else []
+                for entry in chunk:
+                    moved.append(entry.moved_to(segment, first_row))
+                    first_row += entry.rows
+                    combined.extend(self.load(entry))
+                if kind == HOURLY:
+                    write_hourly_snapshot(self._segment_path(segment), combined)
+                else:
+                    write_daily_snapshot(self._segment_path(segment), combined)
+                self._segment_rows[segment] = first_row
+
+            # A later manifest line for a forecast replaces the earlier one
+            self._append_manifest([entry.to_json() for entry in moved])
+        except BaseException:
+            # Nothing refers to the new segments until the manifest lines are written
+            for segment in written:
+                self._delete_segment(segment)
+            raise
+        for entry in moved:
+            self._put(entry)
+        for segment in candidates:
+            self._delete_segment(segment)
+        self._compact_manifest()
+        self._remove_orphan_segments(gridpoint_key)
+        return len(chunks)
+
+    def _remove(self, entries: list) -> None:
+        """Drop entries from the index and the manifest, and delete segments left unused. Caller holds the lock."""
+        if not entries:
+            return
+        self._append_manifest([{"removed": list(entry.key)} for entry in entries])
+        for entry in entries:
+            self._discard(entry.key)
+        for segment in {entry.segment for entry in entries}:
+            if not self._segment_refs.get(segment):
+                self._delete_segment(segment)
+        self._compact_manifest()
+
+    def _put(self, entry: ArchiveEntry) -> None:
+        """Add an entry to the index, replacing an entry for the same forecast. Caller holds the lock."""
+        self._discard(entry.key)
+        self._entries[entry.key] = entry
+        timeline_key = (entry.gridpoint_key, entry.kind)
+        timeline = self._timelines.get(timeline_key)
+        if timeline is None:
+            timeline = self._timelines[timeline_key] = _Timeline()
+        timeline.add(entry)
+        self._segment_refs[entry.segment] = self._segment_refs.get(entry.segment, 0) + 1
+        end = entry.first_row + entry.rows
+        if self._segment_rows.get(entry.segment, 0) < end:
+            self._segment_rows[entry.segment] = end
+
+    def _discard(self, key: tuple) -> None:
+        """Remove a forecast from the index, if it is there. Caller holds the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        timeline_key = (entry.gridpoint_key, entry.kind)
+        timeline = self._timelines[timeline_key]
+        timeline.remove(entry)
+        if not timeline.entries:
+            del self._timelines[timeline_key]
+        self._segment_refs[entry.segment] -= 1
+
+    def _refresh(self) -> None:
+        """
+        Read the manifest lines not yet in the index: all of them on first use or after the
+        manifest was rewritten, otherwise only those appended since the last call. Caller holds
+        the lock.
+        """
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            if self._manifest_state is None:
+                self._manifest_state = (None, 0)
+            return
+        if self._manifest_state is not None and self._manifest_state == (stat.st_ino, stat.st_size):
+            return
+        if self._manifest_state is None or self._manifest_state[0] != stat.st_ino \
+                or self._manifest_state[1] > stat.st_size:
+            self._entries = {}
+            self._timelines = {}
+            self._segment_rows = {}
+            self._segment_refs = {}
+            self._manifest_lines = 0
+            offset = 0
+        else:
+            offset = self._manifest_state[1]
+
+        with open(self.manifest_path, "rb") as file:
+            inode = os.fstat(file.fileno()).st_ino
+            file.seek(offset)
+            data = file.read()
+        # A line still being appended by another process is read next time
+        complete = data.rfind(b"\n") + 1
+        for line in data[:complete].splitlines():
+            self._manifest_lines += 1
+            try:
+                record = json.loads(line)
+                if "removed" in record:
+                    self._discard(tuple(record["removed"]))
+                else:
+                    self._put(ArchiveEntry.from_json(record))
+            except (KeyError, TypeError, ValueError):
+                continue  # A damaged line loses one forecast, not the archive
+        self._manifest_state = (inode, offset + complete)
+
+    def _append_manifest(self, records: list) -> None:
+        """Append records to the manifest. Caller holds the lock and has just called _refresh."""
+        data = b"".join(json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n" for record in records)
+        with open(self.manifest_path, "ab") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+            stat = os.fstat(file.fileno())
+        # If another process appended in between, leave its lines (and these) to the next _refresh
+        if self._manifest_state == (stat.st_ino, stat.st_size - len(data)):
+            self._manifest_state = (stat.st_ino, stat.st_size)
+            self._manifest_lines += len(records)
+
+    def _compact_manifest(self) -> None:
+        """Rewrite the manifest once most of its lines are replaced or removed forecasts. Caller holds the lock."""
+        if self._manifest_lines <= 2 * len(self._entries) + 64:
+            return
+        entries = sorted(self._entries.values(), key=lambda entry: (entry.gridpoint_key, entry.kind,
+                                                                    _generation_order(entry)))
+        atomic_write_bytes(self.manifest_path, b"".join(
+            json.dumps(entry.to_json(), separators=(",", ":")).encode("utf-8") + b"\n" for entry in entries))
+        stat = os.stat(self.manifest_path)
+        self._manifest_state = (stat.st_ino, stat.st_size)
+        self._manifest_lines = len(entries)
+
+    def _snapshot(self, segment: str) -> Snapshot:
+        """Return the memory-mapped segment file, opening it if needed. Caller holds the lock."""
+        snapshot = self._open_segments.get(segment)
+        if snapshot is not None:
+            self._open_segments.move_to_end(segment)
+            return snapshot
+        snapshot = self._open_segments[segment] = Snapshot(self._segment_path(segment))
+        self._segment_rows[segment] = len(snapshot)
+        while len(self._open_segments) > self.max_open_segments:
+            _, oldest = self._open_segments.popitem(last=False)
+            oldest.close()
+        return snapshot
+
+    def _row_at(self, snapshot: Snapshot, entry: ArchiveEntry, when: int):
+        """Index in the segment of the entry's row containing when, or None."""
+        start, stop = entry.first_row, entry.first_row + entry.rows
+        if entry.kind == HOURLY:
+            epochs = snapshot.column("epochs")
+            row = bisect.bisect_right(epochs, when, start, stop) - 1
+            return row if row >= start and when < epochs[row] + SECONDS_PER_HOUR else None
+        starts = [parse_timestamp(start_time)[0] for start_time in snapshot.strings("start_time", start, stop)]
+        row = bisect.bisect_right(starts, when) - 1
+        return start + row if row >= 0 else None
+
+    def _remove_orphan_segments(self, gridpoint_key: str = None) -> None:
+        """
+        Delete the segment files of a gridpoint (or of all gridpoints) that no archived forecast
+        refers to, such as segments written before a crash or temporary files of an interrupted
+        write. Files younger than ORPHAN_SEGMENT_AGE_SECONDS are left alone. Caller holds the lock
+        and has called _refresh.
+        """
+        segments_root = os.path.join(self.root, "segments")
+        if gridpoint_key is None:
+            try:
+                directories = os.listdir(segments_root)
+            except FileNotFoundError:
+                return
+        else:
+            directories = [quote(gridpoint_key, safe='')]
+        cutoff = time.time() - ORPHAN_SEGMENT_AGE_SECONDS
+        for directory in directories:
+            try:
+                with os.scandir(os.path.join(segments_root, directory)) as scan:
+                    orphans = [f"{directory}/{item.name}" for item in scan
+                               if not self._segment_refs.get(f"{directory}/{item.name}")
+                               and item.is_file() and item.stat().st_mtime < cutoff]
+            except OSError:
+                continue
+            for segment in orphans:
+                self._delete_segment(segment)
+
+    def _new_segment_name(self, gridpoint_key: str, kind: str, label: str) -> str:
+        return f"{quote(gridpoint_key, safe='')}/{kind}--{quote(label, safe='')}--{os.urandom(4).hex()}.snap"
+
+    def _segment_path(self, segment: str) -> str:
+        return os.path.join(self.root, "segments", *segment.split("/"))
+
+    def _delete_segment(self, segment: str) -> None:
+        """Unmap and delete a segment file; a file that cannot be removed is left behind."""
+        snapshot = self._open_segments.pop(segment, None)
+        if snapshot is not None:
+            snapshot.close()
+        self._segment_rows.pop(segment, None)
+        self._segment_refs.pop(segment, None)
+        path = self._segment_path(segment)
+        try:
+            os.remove(path)
+            directory = os.path.dirname(path)
+            if not os.listdir(directory):
+                os.rmdir(directory)
+        except OSError:
+            pass
+
+
+def _generation_order(entry: ArchiveEntry) -> tuple:
+    return entry.generated_epoch, entry.generated_at
+
+
+def _epoch_or_zero(timestamp: str) -> int:
+    try:
+        return parse_timestamp(timestamp)[0]
+    except ValueError:
+        return 0
+
+
+def _to_epoch(when) -> int:
+    """POSIX seconds of a POSIX time or an ISO 8601 timestamp."""
+    if isinstance(when, str):
+        return parse_timestamp(when)[0]
+    return int(when)
+
+
+_shared_archive = None
+_shared_archive_lock = threading.Lock()
+
+
+def get_forecast_archive() -> ForecastArchive:
+    """Return the application-wide forecast archive."""
+    global _shared_archive
+    with _shared_archive_lock:
+        if _shared_archive is None:
+            _shared_archive = ForecastArchive()
+        return _shared_archive
@@ -0,0 +1,338 @@
+import abc
+import argparse
+import csv
+import json
+import os
+import sys
+
+from batch_forecast import BatchForecastEngine, BatchLocation
+from forecast_csv import DAILY_HEADERS, HOURLY_HEADERS, daily_rows, hourly_rows
+
+"""
+Command line batch mode: fetch forecasts for a file of locations without PyQt.
+
+Each input line is either 'latitude,longitude[,label]' or a place name, which is geocoded
+(through the cache and offline gazetteer when possible) before it is fetched. Blank lines
+and lines starting with '#' are skipped. Results are written as they arrive, as JSON
+Lines, CSV or Parquet, to stdout or to files in an output directory.
+
+Usage:
+    python forecast_cli.py locations.txt --format csv --output-dir out/
+    cat locations.txt | python forecast_cli.py - > forecasts.jsonl
+"""
+
+# Columns identifying the location of every CSV/Parquet row
+LOCATION_HEADERS = ["Input Line", "Label", "Latitude", "Longitude", "Gridpoint"]
+
+# Parquet rows are buffered and written as one row group per this many rows
+PARQUET_BATCH_ROWS = 10000
+
+
+# Class for one location read from the input, before and after geocoding
+class InputLocation:
+    def __init__(self, line_number, text, latitude=None, longitude=None, label=""):
+        """
+        Args:
+            line_number (int): Line of the input the location came from (1-based).
+            text (str): The line as written, used in error messages.
+            latitude (float): Latitude, None until the location is resolved.
+            longitude (float): Longitude, None until the location is resolved.
+            label (str): Name written to the output.
+        """
+        self.line_number = line_number
+        self.text = text
+        self.latitude = latitude
+        self.longitude = longitude
+        self.label = label
+
+    @property
+    def resolved(self):
+        return self.latitude is not None and self.longitude is not None
+
+
+def parse_location_line(line_number, line):
+    """
+    Parse one input line.
+
+    Returns:
+        InputLocation: The location (unresolved if the line is a place name), or None for
+                       a blank or comment line.
+    """
+    text = line.strip()
+    if not text or text.startswith("#"):
+        return None
+    parts = [part.strip() for part in text.split(",", 2)]
+    if len(parts) >= 2:
+        try:
+            latitude, longitude = float(parts[0]), float(parts[1])
+        except ValueError:
+            pass
+        else:
+            label = parts[2] if len(parts) == 3 else f"{latitude},{longitude}"
+            return InputLocation(line_number, text, latitude, longitude, label)
+    return InputLocation(line_number, text, label=text)
+
+
+def read_locations(lines):
+    """Yield an InputLocation for every location line of an iterable of text lines."""
+    for line_number, line in enumerate(lines, start=1):
+        location = parse_location_line(line_number, line)
+        if location is not None:
+            yield location
+
+
+# Class that writes each location result as one JSON object per line
+class JsonLinesWriter:
+    def __init__(self, output_dir=None):
+        if output_dir:
+            self.file = open(os.path.join(output_dir, "forecasts.jsonl"), "w", encoding="utf-8")
+        else:
+            self.file = sys.stdout
+        self.paths = [self.file.name] if output_dir else []
+
+    def write(self, location, result):
+        """
+        Args:
+            location (InputLocation): The input the result belongs to.
+            result (LocationResult): The fetched forecasts, or the error if the location failed.
+        """
+        record = {
+            "input_line": location.line_number,
+            "label": location.label,
+            "latitude": location.latitude,
+            "longitude": location.longitude,
+        }
+        record["gridpoint"] = result.gridpoint.key if result.gridpoint else None
+        record["daily_generated_time"] = result.daily_generated_time
+        record["hourly_generated_time"] = result.hourly_generated_time
+        record["daily"] = list(daily_rows(result.daily_forecast)) if result.daily_forecast else []
+        record["hourly"] = list(hourly_rows(result.hourly_forecast)) if result.hourly_forecast else []
+        record["error"] = result.error
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    def close(self):
+        if self.file is not sys.stdout:
+            self.file.close()
+
+
+# Base class for the writers that flatten results into one row per forecast period
+class _TabularWriter(abc.ABC):
+    def __init__(self, include_daily, include_hourly):
+        self.include_daily = include_daily
+        self.include_hourly = include_hourly
+
+    def write(self, location, result):
+        """Write the periods of one result. Failed locations have no rows; run_batch reports them."""
+        prefix = {
+            "Input Line": location.line_number,
+            "Label": location.label,
+            "Latitude": location.latitude,
+            "Longitude": location.longitude,
+            "Gridpoint": result.gridpoint.key if result.gridpoint else "",
+        }
+        if self.include_daily and result.daily_forecast:
+            self.write_rows("daily", ({**prefix, **row} for row in daily_rows(result.daily_forecast)))
+        if self.include_hourly and result.hourly_forecast:
+            self.write_rows("hourly", ({**prefix, **row} for row in hourly_rows(result.hourly_forecast)))
+
+    @abc.abstractmethod
+    def write_rows(self, product, rows):
+        """
+        Write rows of one product.
+
+        Args:
+            product (str): 'daily' or 'hourly'.
+            rows (iterable): Dicts keyed by LOCATION_HEADERS and the product's CSV headers.
+        """
+
+
+# Class that writes daily.csv and hourly.csv, or a single CSV with a Product column to stdout
+class CsvWriter(_TabularWriter):
+    def __init__(self, output_dir=None, include_daily=True, include_hourly=True):
+        super().__init__(include_daily, include_hourly)
+        self.files = {}
+        self.writers = {}
+        self.paths = []
+        if output_dir:
+            for product, headers, enabled in (("daily", DAILY_HEADERS, include_daily),
+                                              ("hourly", HOURLY_HEADERS, include_hourly)):
+                if not enabled:
+                    continue
+                path = os.path.join(output_dir, f"{product}.csv")
+                self.files[product] = open(path, "w", newline="", encoding="utf-8")
+                self.writers[product] = csv.DictWriter(self.files[product], fieldnames=LOCATION_HEADERS + headers)
+                self.writers[product].writeheader()
+                self.paths.append(path)
+        else:
+            # Both products share one stream, so the columns are the union of their headers
+            headers = ["Product"] + LOCATION_HEADERS + list(dict.fromkeys(DAILY_HEADERS + HOURLY_HEADERS))
+            writer = csv.DictWriter(sys.stdout, fieldnames=headers)
+            writer.writeheader()
+            self.writers = {"daily": writer, "hourly": writer}
+        self.to_stdout = not output_dir
+
+    def write_rows(self, product, rows):
+        if self.to_stdout:
+            rows = ({"Product": product, **row} for row in rows)
+        self.writers[product].writerows(rows)
+
+    def close(self):
+        for file in self.files.values():
+            file.close()
+        if self.to_stdout:
+            sys.stdout.flush()
+
+
+# Class that writes daily.parquet and hourly.parquet with pyarrow, one row group per batch of rows
+class ParquetWriter(_TabularWriter):
+    def __init__(self, output_dir, include_daily=True, include_hourly=True):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)")
+        if not output_dir:
+            raise RuntimeError("Parquet output needs --output-dir")
+        super().__init__(include_daily, include_hourly)
+        self.pyarrow = pyarrow
+        self.output_dir = output_dir
+        self.headers = {"daily": LOCATION_HEADERS + DAILY_HEADERS, "hourly": LOCATION_HEADERS + HOURLY_HEADERS}
+        self.buffers = {"daily": [], "hourly": []}
+        self.writers = {}
+        self.paths = []
+
+    def write_rows(self, product, rows):
+        buffer = self.buffers[product]
+        buffer.extend(rows)
+        if len(buffer) >= PARQUET_BATCH_ROWS:
+            self._flush(product)
+
+    def close(self):
+        for product in ("daily", "hourly"):
+            if self.buffers[product]:
+                self._flush(product)
+        for writer in self.writers.values():
+            writer.close()
+
+    def _flush(self, product):
+        columns = {header: [row.get(header) for row in self.buffers[product]]
+                   for header in self.headers[product]}
+        # Forecast values are written as text, like the CSV files; only the coordinates are numeric
+        for header in self.headers[product]:
+            if header not in ("Input Line", "Latitude", "Longitude"):
+                columns[header] = [None if value is None else str(value) for value in columns[header]]
+        table = self.pyarrow.table(columns)
+        if product not in self.writers:
+            path = os.path.join(self.output_dir, f"{product}.parquet")
+            self.writers[product] = self.pyarrow.parquet.ParquetWriter(path, table.schema)
+            self.paths.append(path)
+        self.writers[product].write_table(table)
+        self.buffers[product].clear()
+
+
+def create_writer(output_format, output_dir=None, include_daily=True, include_hourly=True):
+    """Return the writer for an output format ('jsonl', 'csv' or 'parquet')."""
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    if output_format == "jsonl":
+        return JsonLinesWriter(output_dir)
+    if output_format == "csv":
+        return CsvWriter(output_dir, include_daily, include_hourly)
+    if output_format == "parquet":
+        return ParquetWriter(output_dir, include_daily, include_hourly)
+    raise ValueError(f"Unknown output format: {output_format}")
+
+
+def run_batch(locations, writer, engine, geolocator=None, progress=None):
+    """
+    Geocode and fetch every location, passing each result to the writer as soon as it is ready.
+
+    Place names are geocoded on the engine's thread pool, so they are looked up concurrently
+    with each other and with the downloads of other lines.
+
+    Args:
+        locations (iterable): InputLocation objects.
+        writer: Writer with a write(location, result) method.
+        engine (BatchForecastEngine): Engine used to fetch the forecasts.
+        geolocator (GeolocatorService): Service used for place names (created on first use).
+        progress (callable): Called with a message for every location that failed.
+
+    Returns:
+        tuple: (succeeded, failed) location counts.
+    """
+    submitted = []  # engine index -> InputLocation
+    counts = {"succeeded": 0, "failed": 0}
+
+    def batch_locations():
+        nonlocal geolocator
+        for location in locations:
+            submitted.append(location)
+            if location.resolved:
+                yield BatchLocation(location.latitude, location.longitude, location.label)
+                continue
+            if geolocator is None:
+                from geolocator import GeolocatorService
+                geolocator = GeolocatorService()
+            yield location.text
+
+    def geocode(text):
+        return geolocator.get_location(text)
+
+    for result in engine.iter_results(batch_locations(), geocode):
+        location = submitted[result.index]
+        if not location.resolved and result.location is not None:
+            location.latitude, location.longitude = result.location.latitude, result.location.longitude
+        writer.write(location, result)
+        if result.success:
+            counts["succeeded"] += 1
+        else:
+            counts["failed"] += 1
+            if progress:
+                progress(f"Line {location.line_number} ({location.label}): {result.error}")
+    return counts["succeeded"], counts["failed"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch forecasts for a file of locations without the GUI.")
+    parser.add_argument("input", help="file with one 'latitude,longitude[,label]' or place name per line ('-' for stdin)")
+    parser.add_argument("--format", choices=("jsonl", "csv", "parquet"), default="jsonl", help="output format")
+    parser.add_argument("--output-dir", help="write files into this directory instead of stdout")
+    parser.add_argument("--no-daily", action="store_true", help="skip the daily forecast")
+    parser.add_argument("--no-hourly", action="store_true", help="skip the hourly forecast")
+    parser.add_argument("--concurrency", type=int, default=8, help="maximum requests in flight")
+    parser.add_argument("--rate", type=float, default=5.0, help="requests per second to the API")
+    parser.add_argument("--timeout", type=float, default=20, help="timeout of each request in seconds")
+    args = parser.parse_args(argv)
+
+    if args.no_daily and args.no_hourly:
+        parser.error("--no-daily and --no-hourly leave nothing to fetch")
+    include_daily, include_hourly = not args.no_daily, not args.no_hourly
+
+    try:
+        writer = create_writer(args.format, args.output_dir, include_daily, include_hourly)
+    except (RuntimeError, OSError) as e:
+        parser.error(str(e))
+
+    engine = BatchForecastEngine(max_concurrency=args.concurrency, requests_per_second=args.rate,
+                                 include_daily=include_daily, include_hourly=include_hourly, timeout=args.timeout)
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    try:
+        succeeded, failed = run_batch(read_locations(source), writer, engine,
+                                      progress=lambda message: print(message, file=sys.stderr))
+    except KeyboardInterrupt:
+        engine.cancel()
+        return 130
+    finally:
+        writer.close()
+        if source is not sys.stdin:
+            source.close()
+
+    for path in writer.paths:
+        print(f"Wrote {path}", file=sys.stderr)
+    print(f"{succeeded} locations fetched, {failed} failed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+import csv
+
+"""
+Conversion between NWS forecast periods and the application's CSV row format.
+
+The same row dictionaries are written to the CSV files and fed directly to the forecast
+managers, so forecasts parsed in memory are identical to forecasts reloaded from disk.
+"""
+
+# Column order of daily_forecast_data.csv
+DAILY_HEADERS = [
+    "forecast_period", "name", "start_time", "end_time", "isDaytime",
+    "temperature", "temperature_unit", "temperature_trend",
+    "precipitation_probability_unit", "precipitation_probability_value",
+    "wind_speed", "wind_direction", "weather_icon_url",
+    "short_forecast", "detailed_forecast"
+]
+
+# Column order of hourly_forecast_data.csv
+HOURLY_HEADERS = [
+    "forecast_period", "start_time", "temperature", "temperature_unit",
+    "precipitation_probability_unit", "precipitation_probability_value",
+    "dewpoint_unit", "dewpoint_value", "relative_humidity_unit", "relative_humidity_value",
+    "wind_speed", "wind_direction", "weather_icon_url", "short_forecast"
+]
+
+
+def _csv_value(value) -> str:
+    """Render a value the way csv.writer would (None becomes an empty string)."""
+    return "" if value is None else str(value)
+
+
+def daily_period_to_row(period: dict) -> dict:
+    """Convert one period of the daily forecast API response to a CSV row dictionary."""
+    precipitation = period.get("probabilityOfPrecipitation") or {}
+    return {
+        "forecast_period": _csv_value(period.get("number", "")),
+        "name": _csv_value(period.get("name", "")),
+        "start_time": _csv_value(period.get("startTime", "")),
+        "end_time": _csv_value(period.get("endTime", "")),
+        "isDaytime": _csv_value(period.get("isDaytime", "")),
+        "temperature": _csv_value(period.get("temperature", "")),
+        "temperature_unit": _csv_value(period.get("temperatureUnit", "")),
+        "temperature_trend": _csv_value(period.get("temperatureTrend", "")),
+        "precipitation_probability_unit": _csv_value(precipitation.get("unitCode", "")),
+        "precipitation_probability_value": _csv_value(precipitation.get("value", "")),
+        "wind_speed": _csv_value(period.get("windSpeed", "")),
+        "wind_direction": _csv_value(period.get("windDirection", "")),
+        "weather_icon_url": _csv_value(period.get("icon", "")),
+        "short_forecast": _csv_value(period.get("shortForecast", "")),
+        "detailed_forecast": _csv_value(period.get("detailedForecast", ""))
+    }
+
+
+def hourly_period_to_row(period: dict) -> dict:
+    """Convert one period of the hourly forecast API response to a CSV row dictionary."""
+    precipitation = period.get("probabilityOfPrecipitation") or {}
+    dewpoint = period.get("dewpoint") or {}
+    relative_humidity = period.get("relativeHumidity") or {}
+    return {
+        "forecast_period": _csv_value(period.get("number", "")),
+        "start_time": _csv_value(period.get("startTime", "")),
+        "temperature": _csv_value(period.get("temperature", "")),
+        "temperature_unit": _csv_value(period.get("temperatureUnit", "")),
+        "precipitation_probability_unit": _csv_value(precipitation.get("unitCode", "")),
+        "precipitation_probability_value": _csv_value(precipitation.get("value", "")),
+        "dewpoint_unit": _csv_value(dewpoint.get("unitCode", "")),
+        "dewpoint_value": _csv_value(dewpoint.get("value", "")),
+        "relative_humidity_unit": _csv_value(relative_humidity.get("unitCode", "")),
+        "relative_humidity_value": _csv_value(relative_humidity.get("value", "")),
+        "wind_speed": _csv_value(period.get("windSpeed", "")),
+        "wind_direction": _csv_value(period.get("windDirection", "")),
+        "weather_icon_url": _csv_value(period.get("icon", "")),
+        "short_forecast": _csv_value(period.get("shortForecast", ""))
+    }
+
+
+def daily_rows(forecast_data: dict):
+    """Yield a CSV row dictionary for every period of a daily forecast API response."""
+    for period in forecast_data["properties"]["periods"]:
+        yield daily_period_to_row(period)
+
+
+def hourly_rows(forecast_data: dict):
+    """Yield a CSV row dictionary for every period of an hourly forecast API response."""
+    for period in forecast_data["properties"]["periods"]:
+        yield hourly_period_to_row(period)
+
+
+def write_rows(file, headers: list, rows) -> None:
+    """Write a header line and the given row dictionaries to an open text file."""
+    writer = csv.DictWriter(file, fieldnames=headers)
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def write_daily_csv(filename: str, forecast_data: dict) -> None:
+    """Save a daily forecast API response to a CSV file."""
+    with open(filename, 'w', newline='') as daily_file:
+        write_rows(daily_file, DAILY_HEADERS, daily_rows(forecast_data))
+
+
+def write_hourly_csv(filename: str, forecast_data: dict) -> None:
+    """Save an hourly forecast API response to a CSV file."""
+    with open(filename, 'w', newline='') as hourly_file:
+        write_rows(hourly_file, HOURLY_HEADERS, hourly_rows(forecast_data))
@@ -0,0 +1,105 @@
+"""
+Keyed comparison of two forecasts, so a refresh only touches the periods that changed.
+
+Periods are identified by their start time (falling back to the period number when a
+start time is not available) and compared by a signature of the values the UI shows.
+Keying on the start time rather than the period number means that when the first period
+rolls off, the remaining periods still match their previous versions even though the API
+renumbers them from 1.
+"""
+
+
+# Class describing the differences between an old and a new list of keyed periods
+class ForecastDiff:
+    def __init__(self, same_layout, changed, added, removed):
+        """
+        Args:
+            same_layout (bool): True if the new periods have exactly the old keys, in the same order.
+            changed (list): Indexes (into the new periods) of periods whose key existed before but
+                            whose values differ.
+            added (list): Indexes (into the new periods) of periods whose key is new.
+            removed (list): Keys of old periods that no longer exist.
+        """
+        self.same_layout = same_layout
+        self.changed = changed
+        self.added = added
+        self.removed = removed
+
+    @property
+    def stale(self):
+        """Indexes of the new periods whose display has to be (re)populated."""
+        return self.changed + self.added
+
+    def __bool__(self):
+        """True if anything changed."""
+        return not self.same_layout or bool(self.changed)
+
+    def __str__(self):
+        return f"{len(self.changed)} changed, {len(self.added)} added, {len(self.removed)} removed"
+
+
+def diff_keyed(old_keys, old_signatures, new_keys, new_signatures):
+    """
+    Compare two lists of periods given as parallel lists of keys and signatures.
+
+    Args:
+        old_keys (list): Keys of the periods currently displayed.
+        old_signatures (list): Signatures of the periods currently displayed.
+        new_keys (list): Keys of the new periods.
+        new_signatures (list): Signatures of the new periods.
+
+    Returns:
+        ForecastDiff: The differences, with indexes referring to the new periods.
+    """
+    if list(old_keys) == list(new_keys):
+        changed = [index for index, (old, new) in enumerate(zip(old_signatures, new_signatures)) if old != new]
+        return ForecastDiff(True, changed, [], [])
+
+    old = dict(zip(old_keys, old_signatures))
+    changed = []
+    added = []
+    for index, (key, signature) in enumerate(zip(new_keys, new_signatures)):
+        if key not in old:
+            added.append(index)
+        elif old[key] != signature:
+            changed.append(index)
+    new = set(new_keys)
+    removed = [key for key in old_keys if key not in new]
+    return ForecastDiff(False, changed, added, removed)
+
+
+def unique_keys(keys):
+    """
+    Make keys distinct so they can index the displayed periods: the second and later
+    occurrences of a key become (key, occurrence), e.g. ['a', 'a'] -> ['a', ('a', 1)].
+    Periods with the same key then keep a display each instead of sharing one.
+    """
+    seen = {}
+    unique = []
+    for key in keys:
+        occurrence = seen.get(key, 0)
+        seen[key] = occurrence + 1
+        unique.append((key, occurrence) if occurrence else key)
+    return unique
+
+
+def daily_key(forecast):
+    """Key of a DailyForecast: its start time, else its period number, else its name."""
+    return forecast.start_time or forecast.forecast_period or forecast.period_name
+
+
+def daily_signature(forecast):
+    """The values of a DailyForecast that are displayed on its card."""
+    return (forecast.period_name, forecast.temperature_fahrenheit, forecast.chance_of_rain, forecast.icon_url,
+            forecast.detailed_forecast)
+
+
+def hourly_signatures(series):
+    """
+    The displayed values of every hour of an HourlyForecastSeries, read straight from its
+    columns without building forecast objects. Hours are keyed by series.timestamps.
+    Text fields are compared by their codes, which every series shares.
+    """
+    return list(zip(series.temperature_f, series.dewpoint_f, series.probability_of_precipitation,
+                    series.relative_humidity, series.wind_speeds.codes, series.wind_directions.codes,
+                    series.short_forecasts.codes, series.weather_icons.codes))
@@ -0,0 +1,157 @@
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from http_session import JsonResponse, get_http_client
+from gridpoint_cache import Gridpoint, get_gridpoint_cache
+from gridded_forecast import GriddedForecast
+
+"""
+Qt-free building blocks for talking to the National Weather Service API.
+
+ForecastWorker and the batch engine both use these functions, so retry, rate limiting and
+gridpoint caching behave the same whether a forecast is fetched for the window or headless.
+"""
+
+POINTS_URL = "https://api.weather.gov/points/{latitude},{longitude}"
+
+# Responses worth retrying: rate limiting and transient server-side failures
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, honoring Retry-After when the server sends one."""
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 0.5, max_delay: float = 30.0) -> None:
+        """
+        Args:
+            max_retries (int): Number of retries after the first attempt.
+            base_delay (float): Backoff ceiling in seconds for the first retry; doubles every retry.
+            max_delay (float): Upper bound on any single delay.
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, retry_after: float = None) -> float:
+        """
+        Return how long to sleep before retry number attempt (starting at 0).
+        Jitter spreads out clients that failed together so they do not retry in lockstep.
+        """
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        delay = random.uniform(0, ceiling)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+def parse_retry_after(value: str):
+    """
+    Parse a Retry-After header given either as seconds or as an HTTP date.
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or malformed.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def fetch_json(url: str, timeout: float = 10, client=None, rate_limiter=None,
+               retry_policy: RetryPolicy = None) -> JsonResponse:
+    """
+    Fetch a JSON document, optionally rate limited and retried.
+
+    Args:
+        url (str): URL to fetch.
+        timeout (float): Timeout in seconds for each attempt.
+        client (ForecastHttpClient): HTTP client to use (defaults to the shared one).
+        rate_limiter (HostRateLimiter): Limiter consulted before every attempt, if given.
+        retry_policy (RetryPolicy): Retry behaviour on 429/5xx, timeouts and connection errors.
+                                    Without a policy the request is attempted once.
+
+    Raises:
+        requests.exceptions.RequestException: If the last attempt fails.
+    """
+    client = client or get_http_client()
+    attempt = 0
+    while True:
+        if rate_limiter is not None:
+            rate_limiter.acquire(url)
+        try:
+            return client.fetch_json(url, timeout=timeout)
+        except requests.exceptions.HTTPError as e:
+            response = e.response
+            status_code = response.status_code if response is not None else None
+            if retry_policy is None or attempt >= retry_policy.max_retries \
+                    or status_code not in RETRYABLE_STATUS_CODES:
+                raise
+            retry_after = parse_retry_after(response.headers.get("Retry-After", ""))
+            time.sleep(retry_policy.delay(attempt, retry_after))
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if retry_policy is None or attempt >= retry_policy.max_retries:
+                raise
+            time.sleep(retry_policy.delay(attempt))
+        attempt += 1
+
+
+def resolve_gridpoint(latitude: float, longitude: float, timeout: float = 10, client=None, cache=None,
+                      rate_limiter=None, retry_policy: RetryPolicy = None) -> Gridpoint:
+    """
+    Resolve a coordinate to its forecast gridpoint, using the gridpoint cache when possible.
+
+    Args:
+        latitude (float): Latitude, rounded to 4 decimals before the lookup as the API requires.
+        longitude (float): Longitude, rounded to 4 decimals.
+        cache (GridpointCache): Cache to consult and fill (defaults to the shared one).
+
+    Raises:
+        requests.exceptions.RequestException: If the /points lookup fails.
+        KeyError: If the /points response is missing required properties.
+    """
+    latitude = round(latitude, 4)
+    longitude = round(longitude, 4)
+    cache = cache if cache is not None else get_gridpoint_cache()
+    gridpoint = cache.get(latitude, longitude)
+    if gridpoint is None:
+        location_url = POINTS_URL.format(latitude=latitude, longitude=longitude)
+        location_data = fetch_json(location_url, timeout, client, rate_limiter, retry_policy).data
+        gridpoint = cache.put(latitude, longitude, Gridpoint.from_points_response(location_data))
+    return gridpoint
+
+
+def fetch_gridded_forecast(gridpoint: Gridpoint, timeout: float = 20, client=None, rate_limiter=None,
+                           retry_policy: RetryPolicy = None, layer_names=None) -> GriddedForecast:
+    """
+    Fetch the raw gridded forecast of a gridpoint and expand its layers into hourly columns.
+
+    Args:
+        gridpoint (Gridpoint): The gridpoint; its forecast_grid_data_url is fetched.
+        layer_names (iterable): Layers to expand (defaults to every numeric layer).
+
+    Raises:
+        requests.exceptions.RequestException: If the request fails.
+        KeyError: If the gridpoint has no gridded data URL.
+        ValueError: If a validTime in the response is malformed.
+    """
+    if not gridpoint.forecast_grid_data_url:
+        raise KeyError("forecastGridData")
+    data = fetch_json(gridpoint.forecast_grid_data_url, timeout, client, rate_limiter, retry_policy).data
+    return GriddedForecast.from_response(data, layer_names)
+
+
+def forecast_generated_time(forecast_data: dict) -> str:
+    """Return a forecast's generatedAt time, or the current time if the API did not send one."""
+    return forecast_data["properties"].get("generatedAt", datetime.now().isoformat())
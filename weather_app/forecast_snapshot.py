@@ -0,0 +1,353 @@
+import mmap
+import struct
+import sys
+from array import array
+from categorical import CategoricalColumn
+from daily_forecast_class import DailyForecast
+from forecast_time import format_timestamp
+from hourly_forecast_class import HourlyForecast
+from hourly_forecast_series import HourlyForecastSeries
+from local_storage import atomic_write_bytes
+from units import fahrenheit_to_celsius
+
+"""
+A compact binary snapshot format for parsed forecasts.
+
+A snapshot holds one daily or hourly forecast as columns: numbers in fixed-width little-endian
+columns, and text as 32-bit ids into a string table in which every distinct string is stored
+once (an hourly series has only a handful of distinct short forecasts, wind directions and
+icons). Opening a snapshot maps the file into memory and exposes the numeric columns as
+memoryviews over the mapping, so nothing is parsed or copied until a value is read.
+
+Layout (all offsets from the start of the file, every column 8-byte aligned):
+    header            magic, version, kind, row count, column count, generated time string id,
+                      string table offset
+    column directory  name, type code ('q', 'i', 'd', or 'S' for string ids) and offset per column
+    columns           row count values each
+    string table      string count, (count + 1) end offsets, UTF-8 data
+"""
+
+FORMAT_MAGIC = b"WXS1"
+FORMAT_VERSION = 1
+
+DAILY = 0
+HOURLY = 1
+
+# magic, version, kind, row count, column count, generated time string id, string table offset
+_HEADER = struct.Struct("<4sHBxIIIQ")
+# column name, type code, offset of its values
+_COLUMN = struct.Struct("<32s1s7xQ")
+
+# Bytes per value of each column type; 'S' columns hold string table ids
+_ITEM_SIZES = {"q": 8, "i": 4, "d": 8, "S": 4}
+
+# Columns of an hourly snapshot; timestamps are rebuilt from the epoch and UTC offset columns
+HOURLY_COLUMNS = (
+    ("epochs", "q"), ("utc_offsets", "i"), ("temperature_f", "d"), ("dewpoint_f", "d"),
+    ("probability_of_precipitation", "d"), ("relative_humidity", "d"), ("wind_speeds", "S"),
+    ("wind_directions", "S"), ("icon_urls", "S"), ("short_forecasts", "S"), ("weather_icons", "S"),
+)
+
+# Columns of a daily snapshot, in DailyForecast argument order
+DAILY_COLUMNS = tuple((name, "S") for name in DailyForecast.__slots__)
+
+
+class _StringTable:
+    """Assigns each distinct string an id while a snapshot is written."""
+
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+
+    def id(self, text):
+        string_id = self.ids.get(text)
+        if string_id is None:
+            string_id = self.ids[text] = len(self.strings)
+            self.strings.append(text)
+        return string_id
+
+    def encode(self):
+        data = [text.encode("utf-8") for text in self.strings]
+        ends = array("I", [0])
+        for item in data:
+            ends.append(ends[-1] + len(item))
+        if sys.byteorder != "little":
+            ends.byteswap()
+        return struct.pack("<I", len(data)) + ends.tobytes() + b"".join(data)
+
+
+def _encode_column(typecode, values, strings):
+    """Return the little-endian bytes of one column."""
+    if typecode == "S" and isinstance(values, CategoricalColumn):
+        # Look up each distinct value once and translate the column's codes
+        ids = {code: strings.id(values.table.values[code]) for code in set(values.codes)}
+        column = array("I", [ids[code] for code in values.codes])
+    elif typecode == "S":
+        column = array("I", [strings.id(value) for value in values])
+    else:
+        column = array(typecode, values)
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column.tobytes()
+
+
+def _write_snapshot(path, kind, row_count, columns, generated_time):
+    """
+    Write a snapshot atomically.
+
+    Args:
+        columns (list): (name, type code, values) for every column, each with row_count values.
+    """
+    strings = _StringTable()
+    generated_id = strings.id(generated_time or "")
+    encoded = [(name, typecode, _encode_column(typecode, values, strings)) for name, typecode, values in columns]
+
+    offset = _HEADER.size + _COLUMN.size * len(encoded)
+    directory = []
+    body = []
+    for name, typecode, data in encoded:
+        padding = -offset % 8
+        body.append(b"\0" * padding)
+        offset += padding
+        directory.append(_COLUMN.pack(name.encode("ascii"), typecode.encode("ascii"), offset))
+        body.append(data)
+        offset += len(data)
+    padding = -offset % 8
+    body.append(b"\0" * padding)
+    offset += padding
+
+    header = _HEADER.pack(FORMAT_MAGIC, FORMAT_VERSION, kind, row_count, len(encoded), generated_id, offset)
+    atomic_write_bytes(path, header + b"".join(directory) + b"".join(body) + strings.encode())
+
+
+def write_hourly_snapshot(path, series, generated_time=""):
+    """
+    Save an HourlyForecastSeries as a snapshot. Gridded layers attached to the series are not saved.
+
+    Raises:
+        OSError: If the file cannot be written.
+    """
+    columns = [(name, typecode, getattr(series, name)) for name, typecode in HOURLY_COLUMNS]
+    _write_snapshot(path, HOURLY, len(series), columns, generated_time)
+
+
+def write_daily_snapshot(path, forecasts, generated_time=""):
+    """
+    Save a list of DailyForecast objects as a snapshot.
+
+    Raises:
+        OSError: If the file cannot be written.
+    """
+    columns = [(name, typecode, [getattr(forecast, name) for forecast in forecasts])
+               for name, typecode in DAILY_COLUMNS]
+    _write_snapshot(path, DAILY, len(forecasts), columns, generated_time)
+
+
+# Class giving read access to a memory-mapped snapshot file
+class Snapshot:
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Snapshot file written by write_hourly_snapshot or write_daily_snapshot.
+
+        Raises:
+            OSError: If the file cannot be opened.
+            ValueError: If the file is not a snapshot of this version or is truncated.
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            try:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"{path} is empty") from None
+        self._view = memoryview(self._mmap)
+        self._columns = {}  # name -> memoryview (or array on big-endian machines)
+        self._strings = None
+        try:
+            self._read_layout()
+        except (struct.error, KeyError, IndexError, TypeError, ValueError, UnicodeDecodeError) as e:
+            self.close()
+            raise ValueError(f"{path} is not a valid forecast snapshot: {e}") from None
+
+    def _read_layout(self):
+        """Read and check the header, column directory and string table."""
+        size = len(self._view)
+        magic, version, self.kind, self.rows, column_count, generated_id, strings_offset = \
+            _HEADER.unpack_from(self._view)
+        if magic != FORMAT_MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"not a version {FORMAT_VERSION} snapshot")
+        if self.kind not in (DAILY, HOURLY):
+            raise ValueError(f"unknown kind {self.kind}")
+        columns_start = _HEADER.size + column_count * _COLUMN.size
+        if not columns_start <= strings_offset <= size - 8:
+            raise ValueError("string table offset out of range")
+
+        # The string table is small, so it is decoded up front
+        (count,) = struct.unpack_from("<I", self._view, strings_offset)
+        data_start = strings_offset + 8 + 4 * count
+        if data_start > size:
+            raise ValueError("truncated string table")
+        ends = array("I", self._view[strings_offset + 4:data_start].tobytes())
+        if sys.byteorder != "little":
+            ends.byteswap()
+        if ends[0] != 0 or any(ends[index] > ends[index + 1] for index in range(count)) \
+                or data_start + ends[-1] > size:
+            raise ValueError("corrupt string table")
+        data = self._view[data_start:data_start + ends[-1]].tobytes()
+        self._strings = [data[ends[index]:ends[index + 1]].decode("utf-8") for index in range(count)]
+        if generated_id >= count:
+            raise ValueError("generated time is not in the string table")
+        self.generated_time = self._strings[generated_id]
+
+        self._types = {}
+        for index in range(column_count):
+            name, typecode, offset = _COLUMN.unpack_from(self._view, _HEADER.size + index * _COLUMN.size)
+            name = name.rstrip(b"\0").decode("ascii")
+            typecode = typecode.decode("ascii")
+            if typecode not in _ITEM_SIZES:
+                raise ValueError(f"column {name} has unknown type {typecode!r}")
+            end = offset + self.rows * _ITEM_SIZES[typecode]
+            if offset < columns_start or end > strings_offset:
+                raise ValueError(f"column {name} lies outside the column area")
+            values = self._view[offset:end].cast("I" if typecode == "S" else typecode)
+            if sys.byteorder != "little":
+                swapped = array(values.format, values.tobytes())
+                values.release()
+                swapped.byteswap()
+                values = swapped
+            self._columns[name] = values
+            self._types[name] = typecode
+            if typecode == "S" and self.rows and max(values) >= count:
+                raise ValueError(f"column {name} refers to a string that does not exist")
+
+        expected = HOURLY_COLUMNS if self.kind == HOURLY else DAILY_COLUMNS
+        for name, typecode in expected:
+            if self._types.get(name) != typecode:
+                raise ValueError(f"column {name} is missing or has the wrong type")
+
+    def column(self, name):
+        """
+        Return a numeric column without copying it, or a string column's ids. The view is only
+        valid until the snapshot is closed; use column_values for a copy.
+
+        Returns:
+            memoryview: One value per row (an array on big-endian machines).
+
+        Raises:
+            KeyError: If the snapshot has no such column.
+        """
+        return self._columns[name]
+
+    def column_values(self, name, start=0, stop=None):
+        """
+        Copy rows start:stop of a numeric column (or a string column's ids) into an array.
+
+        Raises:
+            KeyError: If the snapshot has no such column.
+        """
+        values = self._columns[name]
+        if isinstance(values, array):
+            return values[start:stop]
+        # Release the slice straight away, so it never keeps close() from unmapping the file
+        view = values[start:stop]
+        try:
+            return array(view.format, view.tobytes())
+        finally:
+            view.release()
+
+    def strings(self, name, start=0, stop=None):
+        """
+        Return the values of a string column, or of rows start:stop of it.
+
+        Raises:
+            KeyError: If the snapshot has no such string column.
+        """
+        if self._types[name] != "S":
+            raise KeyError(f"{name} is not a string column")
+        table = self._strings
+        return [table[string_id] for string_id in self.column_values(name, start, stop)]
+
+    @property
+    def string_table(self):
+        """Every distinct string in the snapshot."""
+        return list(self._strings)
+
+    def to_hourly_series(self, start=0, stop=None):
+        """
+        Copy an hourly snapshot, or rows start:stop of it, into a new HourlyForecastSeries.
+
+        Raises:
+            ValueError: If this is not an hourly snapshot, or it holds an impossible time.
+        """
+        if self.kind != HOURLY:
+            raise ValueError(f"{self.path} is not an hourly forecast snapshot")
+        series = HourlyForecastSeries()
+        for name, typecode in HOURLY_COLUMNS:
+            if typecode == "S":
+                getattr(series, name).extend_indexed(self.column_values(name, start, stop), self._strings)
+            else:
+                setattr(series, name, self.column_values(name, start, stop))
+        series.timestamps = [self._timestamp(epoch, offset) for epoch, offset in zip(series.epochs, series.utc_offsets)]
+        return series
+
+    def hourly_forecast(self, index):
+        """
+        Build the HourlyForecast of one row of an hourly snapshot, reading only that row.
+
+        Raises:
+            ValueError: If this is not an hourly snapshot, or the row holds an impossible time.
+            IndexError: If the row does not exist.
+        """
+        if self.kind != HOURLY:
+            raise ValueError(f"{self.path} is not an hourly forecast snapshot")
+        columns = self._columns
+        strings = self._strings
+        temperature_f = columns["temperature_f"][index]
+        dewpoint_f = columns["dewpoint_f"][index]
+        return HourlyForecast(self._timestamp(columns["epochs"][index], columns["utc_offsets"][index]),
+                              temperature_f, fahrenheit_to_celsius(temperature_f),
+                              dewpoint_f, fahrenheit_to_celsius(dewpoint_f),
+                              columns["probability_of_precipitation"][index], columns["relative_humidity"][index],
+                              strings[columns["wind_speeds"][index]], strings[columns["wind_directions"][index]],
+                              strings[columns["icon_urls"][index]], strings[columns["short_forecasts"][index]],
+                              strings[columns["weather_icons"][index]])
+
+    def _timestamp(self, epoch, utc_offset):
+        """Rebuild a timestamp, reporting values no timestamp can have as an invalid snapshot."""
+        try:
+            return format_timestamp(epoch, utc_offset)
+        except (OverflowError, OSError, ValueError):
+            raise ValueError(f"{self.path} is not a valid forecast snapshot: bad time {epoch} {utc_offset}") from None
+
+    def to_daily_forecasts(self, start=0, stop=None):
+        """
+        Build the DailyForecast objects of a daily snapshot, or of rows start:stop of it.
+
+        Raises:
+            ValueError: If this is not a daily snapshot.
+        """
+        if self.kind != DAILY:
+            raise ValueError(f"{self.path} is not a daily forecast snapshot")
+        return [DailyForecast(*values)
+                for values in zip(*(self.strings(name, start, stop) for name, _ in DAILY_COLUMNS))]
+
+    def __len__(self):
+        return self.rows
+
+    def close(self):
+        """Release the columns and the memory map."""
+        columns, self._columns = self._columns, {}
+        try:
+            for values in columns.values():
+                if isinstance(values, memoryview):
+                    values.release()
+            self._view.release()
+            self._mmap.close()
+        except BufferError:
+            pass  # A view of column() still held by a caller keeps the mapping until it is freed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,286 @@
+import io
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from urllib.parse import quote, unquote
+from local_storage import get_cache_dir, atomic_write_bytes
+from forecast_csv import DAILY_HEADERS, HOURLY_HEADERS, daily_rows, hourly_rows, write_rows
+from daily_forecast_manager_class import DailyForecastManager
+from hourly_forecast_manager_class import HourlyForecastManager
+from forecast_snapshot import write_daily_snapshot, write_hourly_snapshot
+
+"""
+A per-location store of forecast CSV files.
+
+Every forecast is saved under its gridpoint and generatedAt time, e.g.
+    forecasts/OKX_33_35/hourly--2025-04-28T21%3A00%3A00%2B00%3A00.csv
+Files are written to a temporary name and renamed into place, so a reader never sees a
+half-written file, and any number of locations can be cached side by side. The directory
+listing itself is the index, which keeps concurrent writers from different processes safe.
+
+Next to each CSV file a binary snapshot of the parsed forecast (see forecast_snapshot) is
+written with the same name and a .snap suffix; loading prefers it, so stored forecasts are
+not reparsed from text. The CSV stays the file listed and exported.
+
+The store only keeps the last few forecasts of each location. A store given a ForecastArchive
+(the shared store is) also appends every forecast it saves to the archive, which keeps the
+history for comparing forecasts across generation times.
+"""
+
+DAILY = "daily"
+HOURLY = "hourly"
+
+_HEADERS = {DAILY: DAILY_HEADERS, HOURLY: HOURLY_HEADERS}
+_ROWS = {DAILY: daily_rows, HOURLY: hourly_rows}
+
+
+class StoredForecast:
+    """A forecast file in the store."""
+
+    def __init__(self, gridpoint_key: str, kind: str, generated_at: str, path: str) -> None:
+        """
+        Args:
+            gridpoint_key (str): Gridpoint identifier, e.g. 'OKX/33,35'.
+            kind (str): 'daily' or 'hourly'.
+            generated_at (str): The forecast's generatedAt timestamp.
+            path (str): Location of the CSV file.
+        """
+        self.gridpoint_key = gridpoint_key
+        self.kind = kind
+        self.generated_at = generated_at
+        self.path = path
+
+    @property
+    def snapshot_path(self):
+        """Location of the binary snapshot written alongside the CSV file."""
+        return self.path[:-len(".csv")] + ".snap"
+
+    @property
+    def generated_datetime(self):
+        """The generation time as a datetime, or None if it cannot be parsed."""
+        try:
+            return datetime.fromisoformat(self.generated_at)
+        except ValueError:
+            return None
+
+    def __repr__(self) -> str:
+        return f"StoredForecast({self.gridpoint_key!r}, {self.kind!r}, {self.generated_at!r})"
+
+
+class ForecastStore:
+    """Stores, looks up and evicts forecast CSV files keyed by gridpoint and generation time."""
+
+    def __init__(self, root: str = None, keep_per_gridpoint: int = 3, max_age_seconds: float = 7 * 24 * 3600,
+                 max_gridpoints: int = 500, archive=None) -> None:
+        """
+        Args:
+            root (str): Directory holding the store (defaults to 'forecasts' in the cache directory).
+            keep_per_gridpoint (int): Number of forecasts of each kind kept per gridpoint.
+            max_age_seconds (float): Files older than this are removed when the store is pruned.
+            max_gridpoints (int): Maximum number of gridpoints kept; least recently written ones are removed.
+            archive (ForecastArchive): Archive that also receives every saved forecast, if any.
+        """
+        self.root = root or get_cache_dir("forecasts")
+        os.makedirs(self.root, exist_ok=True)
+        self.keep_per_gridpoint = keep_per_gridpoint
+        self.max_age_seconds = max_age_seconds
+        self.max_gridpoints = max_gridpoints
+        self.archive = archive
+        self._lock = threading.Lock()
+
+    def save(self, gridpoint_key: str, kind: str, forecast_data: dict, generated_at: str) -> StoredForecast:
+        """
+        Atomically write a forecast API response as CSV and as a binary snapshot, and prune old
+        files for the gridpoint. The forecast is also added to the archive, if the store has one;
+        a failure there is reported but does not fail the save.
+
+        Raises:
+            OSError: If a file cannot be written.
+            KeyError: If kind is unknown or the response has no periods.
+        """
+        buffer = io.StringIO(newline='')
+        write_rows(buffer, _HEADERS[kind], _ROWS[kind](forecast_data))
+        stored = StoredForecast(gridpoint_key, kind, generated_at, self._path_for(gridpoint_key, kind, generated_at))
+        new_gridpoint = not os.path.isdir(os.path.dirname(stored.path))
+        # The snapshot is written first, so it exists whenever the CSV file is listed
+        forecasts = self._write_snapshot(stored, forecast_data)
+        try:
+            atomic_write_bytes(stored.path, buffer.getvalue().encode("utf-8"))
+        except OSError:
+            # Without its CSV file the snapshot is never listed, so it would never be pruned
+            if not os.path.exists(stored.path):
+                try:
+                    os.remove(stored.snapshot_path)
+                except OSError:
+                    pass
+            raise
+        with self._lock:
+            self._prune_gridpoint(gridpoint_key, kind)
+            # Only a new gridpoint directory can take the store over max_gridpoints
+            if new_gridpoint:
+                self._evict_gridpoints()
+        if self.archive is not None:
+            self._archive(stored, forecasts)
+        return stored
+
+    def list_forecasts(self, gridpoint_key: str, kind: str) -> list:
+        """Return the stored forecasts of one kind for a gridpoint, newest first."""
+        directory = self._directory_for(gridpoint_key)
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+        prefix = f"{kind}--"
+        forecasts = []
+        for name in names:
+            if name.startswith(prefix) and name.endswith(".csv"):
+                generated_at = unquote(name[len(prefix):-len(".csv")])
+                forecasts.append(StoredForecast(gridpoint_key, kind, generated_at, os.path.join(directory, name)))
+        forecasts.sort(key=_sort_key, reverse=True)
+        return forecasts
+
+    def latest(self, gridpoint_key: str, kind: str):
+        """Return the newest stored forecast of one kind for a gridpoint, or None."""
+        forecasts = self.list_forecasts(gridpoint_key, kind)
+        return forecasts[0] if forecasts else None
+
+    def load_daily(self, gridpoint_key: str):
+        """Load the newest daily forecast for a gridpoint into a DailyForecastManager, or return None."""
+        stored = self.latest(gridpoint_key, DAILY)
+        if stored is None:
+            return None
+        manager = DailyForecastManager(stored.path, stored.generated_at)
+        if os.path.exists(stored.snapshot_path) and manager.load_snapshot(stored.snapshot_path):
+            return manager
+        return manager if manager.load_forecasts() else None
+
+    def load_hourly(self, gridpoint_key: str):
+        """Load the newest hourly forecast for a gridpoint into an HourlyForecastManager, or return None."""
+        stored = self.latest(gridpoint_key, HOURLY)
+        if stored is None:
+            return None
+        manager = HourlyForecastManager(stored.path, stored.generated_at)
+        if os.path.exists(stored.snapshot_path) and manager.load_snapshot(stored.snapshot_path):
+            return manager
+        return manager if manager.load_forecasts() else None
+
+    def gridpoints(self) -> list:
+        """Return the keys of all gridpoints that have stored forecasts."""
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+        return [_key_from_directory(name) for name in names
+                if name.count("_") >= 2 and os.path.isdir(os.path.join(self.root, name))]
+
+    def prune(self) -> None:
+        """Apply the retention policy to the whole store."""
+        with self._lock:
+            for gridpoint_key in self.gridpoints():
+                for kind in (DAILY, HOURLY):
+                    self._prune_gridpoint(gridpoint_key, kind)
+            self._evict_gridpoints()
+
+    def _write_snapshot(self, stored: StoredForecast, forecast_data: dict):
+        """
+        Parse a forecast API response and save it as the snapshot of a stored forecast.
+
+        Returns:
+            The parsed forecasts: a list of DailyForecast objects or an HourlyForecastSeries.
+        """
+        if stored.kind == DAILY:
+            manager = DailyForecastManager(None, stored.generated_at)
+            manager.load_rows(daily_rows(forecast_data))
+            write_daily_snapshot(stored.snapshot_path, manager.get_forecasts(), stored.generated_at)
+        else:
+            manager = HourlyForecastManager(None, stored.generated_at)
+            manager.load_rows(hourly_rows(forecast_data), 'start_time')
+            write_hourly_snapshot(stored.snapshot_path, manager.get_forecasts(), stored.generated_at)
+        return manager.get_forecasts()
+
+    def _archive(self, stored: StoredForecast, forecasts) -> None:
+        """Add a saved forecast to the archive, reporting rather than raising failures."""
+        try:
+            if stored.kind == DAILY:
+                self.archive.append_daily(stored.gridpoint_key, forecasts, stored.generated_at)
+            else:
+                self.archive.append_hourly(stored.gridpoint_key, forecasts, stored.generated_at)
+        except (OSError, ValueError) as e:  # The CSV file is saved; a disk or segment error must not fail the save
+            print(f"Forecast archive update failed: {str(e)}")
+
+    def _directory_for(self, gridpoint_key: str) -> str:
+        return os.path.join(self.root, _directory_from_key(gridpoint_key))
+
+    def _path_for(self, gridpoint_key: str, kind: str, generated_at: str) -> str:
+        if kind not in _HEADERS:
+            raise KeyError(f"Unknown forecast kind: {kind}")
+        return os.path.join(self._directory_for(gridpoint_key), f"{kind}--{quote(generated_at, safe='')}.csv")
+
+    def _prune_gridpoint(self, gridpoint_key: str, kind: str) -> None:
+        """Remove old and surplus files of one kind for a gridpoint. Caller holds the lock."""
+        cutoff = time.time() - self.max_age_seconds
+        for index, stored in enumerate(self.list_forecasts(gridpoint_key, kind)):
+            try:
+                # The newest file is always kept, however old, so there is something to show offline
+                if index >= self.keep_per_gridpoint or (index > 0 and os.path.getmtime(stored.path) < cutoff):
+                    os.remove(stored.path)
+                    if os.path.exists(stored.snapshot_path):
+                        os.remove(stored.snapshot_path)
+            except OSError:
+                pass
+        directory = self._directory_for(gridpoint_key)
+        try:
+            if os.path.isdir(directory) and not os.listdir(directory):
+                os.rmdir(directory)
+        except OSError:
+            pass
+
+    def _evict_gridpoints(self) -> None:
+        """Remove the least recently written gridpoints beyond max_gridpoints. Caller holds the lock."""
+        directories = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if os.path.isdir(path):
+                directories.append((os.path.getmtime(path), path))
+        directories.sort()
+        for _, path in directories[:max(0, len(directories) - self.max_gridpoints)]:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _directory_from_key(gridpoint_key: str) -> str:
+    """'OKX/33,35' -> 'OKX_33_35'"""
+    return gridpoint_key.replace("/", "_").replace(",", "_")
+
+
+def _key_from_directory(name: str) -> str:
+    """'OKX_33_35' -> 'OKX/33,35'"""
+    office, grid_x, grid_y = name.rsplit("_", 2)
+    return f"{office}/{grid_x},{grid_y}"
+
+
+def _sort_key(stored: StoredForecast):
+    generated = stored.generated_datetime
+    if generated is not None:
+        # A naive time is local time, as written by forecast_generated_time when generatedAt is missing
+        return generated.timestamp(), stored.generated_at
+    try:
+        return os.path.getmtime(stored.path), stored.generated_at
+    except OSError:
+        return 0.0, stored.generated_at
+
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def get_forecast_store() -> ForecastStore:
+    """Return the application-wide forecast store, which archives to the application-wide archive."""
+    # Imported here because forecast_archive uses this module's DAILY and HOURLY
+    from forecast_archive import get_forecast_archive
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = ForecastStore(archive=get_forecast_archive())
+        return _shared_store
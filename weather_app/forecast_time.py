@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+"""
+Timestamp parsing and formatting shared by the hourly forecast code.
+
+Forecast timestamps are ISO 8601 strings with a UTC offset, e.g. '2025-04-28T16:00:00-04:00'.
+They are parsed once into (epoch seconds, UTC offset seconds); everything displayed is
+derived from the local time epoch + offset with integer arithmetic. The hour and date labels
+only take a few hundred distinct values, so they are formatted once each and memoized.
+"""
+
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 86400
+
+_EPOCH_DATE = datetime(1970, 1, 1).date()
+
+
+@lru_cache(maxsize=8192)
+def parse_timestamp(timestamp):
+    """
+    Parse an ISO 8601 timestamp.
+
+    A timestamp without a UTC offset is taken as UTC, so its local time is the time as written.
+
+    Returns:
+        tuple: (epoch, utc_offset): POSIX seconds and the UTC offset in seconds, both ints.
+
+    Raises:
+        ValueError: If the timestamp is malformed.
+    """
+    parsed = datetime.fromisoformat(timestamp)
+    offset = parsed.utcoffset()
+    if offset is None:
+        return int(parsed.replace(tzinfo=timezone.utc).timestamp()), 0
+    return int(parsed.timestamp()), int(offset.total_seconds())
+
+
+@lru_cache(maxsize=8192)
+def format_timestamp(epoch, utc_offset):
+    """
+    Rebuild an ISO 8601 timestamp from parse_timestamp output, e.g. '2025-04-28T16:00:00-04:00'.
+    A timestamp that had no UTC offset comes back with '+00:00'.
+    """
+    return datetime.fromtimestamp(epoch, timezone(timedelta(seconds=utc_offset))).isoformat()
+
+
+def local_day(epoch, utc_offset):
+    """Return the local calendar day of a time as a day number (days since 1970-01-01)."""
+    return (epoch + utc_offset) // SECONDS_PER_DAY
+
+
+@lru_cache(maxsize=1440)
+def format_time_of_day(seconds_of_day):
+    """Format a local time of day given in seconds since midnight, e.g. '16:00'."""
+    return f"{seconds_of_day // SECONDS_PER_HOUR:02d}:{seconds_of_day // 60 % 60:02d}"
+
+
+@lru_cache(maxsize=1024)
+def format_day(day):
+    """Format a day number (days since 1970-01-01), e.g. '2025-04-28'."""
+    return (_EPOCH_DATE + timedelta(days=day)).isoformat()
+
+
+def format_hour(epoch, utc_offset):
+    """Local hour label of a time, e.g. '16:00'."""
+    return format_time_of_day((epoch + utc_offset) % SECONDS_PER_DAY)
+
+
+def format_date(epoch, utc_offset):
+    """Local date label of a time, e.g. '2025-04-28'."""
+    return format_day(local_day(epoch, utc_offset))
+
+
+def day_boundaries(epochs, utc_offsets):
+    """
+    Split a time-ordered sequence of times into local calendar days.
+
+    For hourly data the start of the next day is computed from the local time of day and
+    checked, so only one or two values are looked at per day; irregular spacing falls back
+    to stepping one value at a time.
+
+    Args:
+        epochs (sequence): POSIX seconds, ascending.
+        utc_offsets (sequence): UTC offset in seconds of each time.
+
+    Returns:
+        list: (start, end, day) for every day, where start:end is the slice of its values and
+              day is the day number for format_day.
+    """
+    count = len(epochs)
+    boundaries = []
+    start = 0
+    while start < count:
+        day = (epochs[start] + utc_offsets[start]) // SECONDS_PER_DAY
+        # Index of the first hour of the next day, if the values are consecutive hours
+        seconds_left = (day + 1) * SECONDS_PER_DAY - (epochs[start] + utc_offsets[start])
+        end = min(count, start + -(-seconds_left // SECONDS_PER_HOUR))
+        if not (end > start
+                and (epochs[end - 1] + utc_offsets[end - 1]) // SECONDS_PER_DAY == day
+                and (end == count or (epochs[end] + utc_offsets[end]) // SECONDS_PER_DAY != day)):
+            end = start + 1
+            while end < count and (epochs[end] + utc_offsets[end]) // SECONDS_PER_DAY == day:
+                end += 1
+        boundaries.append((start, end, day))
+        start = end
+    return boundaries
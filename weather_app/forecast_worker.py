@@ -1,8 +1,17 @@
-import csv
 import requests
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from geopy.location import Location
 from PyQt5.QtCore import QThread, pyqtSignal, QCoreApplication
+from gridpoint_cache import Gridpoint
+from http_session import JsonResponse
+from forecast_service import fetch_json, fetch_gridded_forecast, resolve_gridpoint, forecast_generated_time
+from forecast_csv import daily_rows, hourly_rows
+from forecast_store import DAILY, HOURLY, ForecastStore, get_forecast_store
+from daily_forecast_manager_class import DailyForecastManager
+from hourly_forecast_manager_class import HourlyForecastManager
+
+# A single background thread for optional CSV exports, so writing files never delays the UI
+_export_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="forecast-export")
 
 """
 A worker that fetches weather data in the background.
@@ -14,128 +23,184 @@ class ForecastWorker(QThread):
     """
     worker_finished = pyqtSignal(bool, str, str, str)
 
-    def __init__(self, location: Location) -> None:
+    # In-memory mode only: emitted just before a successful worker_finished.
+    # Emits: daily_manager (DailyForecastManager), hourly_manager (HourlyForecastManager)
+    forecasts_ready = pyqtSignal(object, object)
+
+    # Per-request timeouts in seconds; the hourly payload is several times larger than the daily one
+    POINTS_TIMEOUT = 10
+    DAILY_TIMEOUT = 10
+    HOURLY_TIMEOUT = 20
+    GRIDDED_TIMEOUT = 30
+
+    def __init__(self, location: Location, in_memory: bool = False, export_csv: bool = True,
+                 store: ForecastStore = None, include_gridded: bool = False) -> None:
+        """
+        Args:
+            location (Location): The location to fetch forecasts for.
+            in_memory (bool): Parse the forecasts straight into forecast managers and hand them over
+                              through forecasts_ready instead of making the caller reload CSV files.
+            export_csv (bool): Also save the CSV files to the forecast store. In in-memory mode they
+                               are written asynchronously after the forecasts have been handed over.
+            store (ForecastStore): Store receiving the CSV files (defaults to the shared one).
+            include_gridded (bool): Also fetch the raw gridded forecast (sky cover, wind gust, QPF, ...).
+                                    Its layers are kept in gridded_forecast and, in in-memory mode,
+                                    attached to the hourly series. A failure here does not fail the worker;
+                                    it is kept in gridded_error and added to the finished message.
+        """
         super().__init__()
         self.location = location
+        self.in_memory = in_memory
+        self.export_csv = export_csv
+        self.store = store or get_forecast_store()
+        self.include_gridded = include_gridded
+        # The expanded gridded forecast, if include_gridded was set and the fetch succeeded
+        self.gridded_forecast = None
+        # Why the gridded forecast is missing, if include_gridded was set and the fetch failed
+        self.gridded_error = ""
+        # Set once the points lookup succeeds; the key under which forecasts are stored
+        self.gridpoint = None
+        # (headers, updateTime) of every forecast product fetched, for scheduling the next refresh
+        self.refresh_hints = []
 
     def run(self) -> None:
         try:
             latitude = round(self.location.latitude, 4)
             longitude = round(self.location.longitude, 4)
-            location_url = f"https://api.weather.gov/points/{latitude},{longitude}"
-            location_data = self._get_api_data(location_url)
-
-            daily_forecast_url = location_data["properties"]["forecast"]
-            daily_forecast_data = self._get_api_data(daily_forecast_url)
-            daily_forecast_generated_time = (
-                daily_forecast_data["properties"].get("generatedAt", datetime.now().isoformat())
+            gridpoint = self._get_gridpoint(latitude, longitude)
+            self.gridpoint = gridpoint
+        except requests.exceptions.RequestException as e:
+            self.worker_finished.emit(False, f"Forecast fetch failed: {str(e)}", "", "")
+            return
+        except (KeyError, TypeError, ValueError) as e:
+            self.worker_finished.emit(False, f"Invalid API response format: {str(e)}", "", "")
+            return
+        except (IOError, OSError) as e:
+            # The gridpoint cache is written to disk as part of the lookup
+            self.worker_finished.emit(False, f"Gridpoint cache save failed: {str(e)}", "", "")
+            return
+
+        # Download and process the daily and hourly forecasts (and the gridded data) at the same time
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            daily_future = executor.submit(
+                self._fetch_and_process, gridpoint.forecast_url, self.DAILY_TIMEOUT,
+                self._save_daily_forecast, self._parse_daily_forecast
             )
-            self._save_daily_forecast(daily_forecast_data)
-
-            hourly_forecast_url = location_data["properties"]["forecastHourly"]
-            hourly_forecast_data = self._get_api_data(hourly_forecast_url)
-            hourly_forecast_generated_time = (
-                hourly_forecast_data["properties"].get("generatedAt", datetime.now().isoformat())
+            hourly_future = executor.submit(
+                self._fetch_and_process, gridpoint.forecast_hourly_url, self.HOURLY_TIMEOUT,
+                self._save_hourly_forecast, self._parse_hourly_forecast
             )
-            self._save_hourly_forecast(hourly_forecast_data)
-
+            gridded_future = executor.submit(self._fetch_gridded, gridpoint) if self.include_gridded else None
+            daily_result, daily_error = self._collect_result(daily_future, "Daily")
+            hourly_result, hourly_error = self._collect_result(hourly_future, "Hourly")
+            if gridded_future is not None:
+                self.gridded_forecast, self.gridded_error = self._collect_result(gridded_future, "Gridded", None)
+
+        daily_forecast_generated_time, daily_data, daily_manager = daily_result
+        hourly_forecast_generated_time, hourly_data, hourly_manager = hourly_result
+
+        errors = [error for error in (daily_error, hourly_error) if error]
+        if errors:
+            # Report which part failed; the generated time of a part that succeeded is still passed on
             self.worker_finished.emit(
-                True, "Forecast CSV files written", daily_forecast_generated_time, hourly_forecast_generated_time
+                False, "; ".join(error for error in (daily_error, hourly_error, self.gridded_error) if error),
+                daily_forecast_generated_time, hourly_forecast_generated_time
             )
+            return
+
+        if self.in_memory:
+            if self.gridded_forecast is not None:
+                hourly_manager.get_forecasts().attach_gridded(self.gridded_forecast)
+            self.forecasts_ready.emit(daily_manager, hourly_manager)
+            if self.export_csv:
+                _export_executor.submit(self._export_csv, daily_data, hourly_data)
+            message = "Forecasts loaded"
+        else:
+            message = f"Forecast CSV files written to {self.store.root}" if self.export_csv else "Forecasts fetched"
+        if self.gridded_error:
+            message = f"{message}; {self.gridded_error}"
+        self.worker_finished.emit(True, message, daily_forecast_generated_time, hourly_forecast_generated_time)
+
+    def _fetch_and_process(self, url: str, timeout: float, save_forecast, parse_forecast) -> tuple:
+        """
+        Fetch one forecast product, then save it to CSV or parse it in memory depending on the mode.
+
+        Returns:
+            tuple: (generated_time, forecast_data, manager); manager is None unless in in-memory mode.
+        """
+        response = self._get_api_response(url, timeout)
+        forecast_data = response.data
+        self.refresh_hints.append((response.headers, forecast_data["properties"].get("updateTime")))
+        generated_time = forecast_generated_time(forecast_data)
+        manager = None
+        if self.in_memory:
+            manager = parse_forecast(forecast_data, generated_time)
+        elif self.export_csv:
+            save_forecast(forecast_data)
+        return generated_time, forecast_data, manager
+
+    def _fetch_gridded(self, gridpoint: Gridpoint):
+        """Fetch and expand the gridded forecast; failures are reported through _collect_result."""
+        return fetch_gridded_forecast(gridpoint, self.GRIDDED_TIMEOUT)
+
+    def _collect_result(self, future, name: str, failed_result=("", None, None)) -> tuple:
+        """
+        Wait for one forecast download and translate any failure into an error message.
+
+        Returns:
+            tuple: (result, error_message); result is failed_result when there is an error.
+        """
+        try:
+            return future.result(), ""
         except requests.exceptions.RequestException as e:
-            self.worker_finished.emit(False, f"Forecast fetch failed: {str(e)}", "", "")
-        except (KeyError, TypeError) as e:
-            self.worker_finished.emit(False, f"Invalid API response format: {str(e)}", "", "")
+            return failed_result, f"{name} forecast fetch failed: {str(e)}"
+        except (KeyError, TypeError, ValueError) as e:
+            return failed_result, f"Invalid {name.lower()} API response format: {str(e)}"
         except (IOError, OSError) as e:
-            self.worker_finished.emit(False, f"File save failed: {str(e)}", "", "")
+            return failed_result, f"{name} forecast file save failed: {str(e)}"
+
+    def _get_gridpoint(self, latitude: float, longitude: float) -> Gridpoint:
+        """
+        Resolve a coordinate to its forecast gridpoint, using the on-disk cache when possible.
+        """
+        return resolve_gridpoint(latitude, longitude, timeout=self.POINTS_TIMEOUT)
 
-    def _get_api_data(self, url: str) -> dict:
+    def _get_api_response(self, url: str, timeout: float = 10) -> JsonResponse:
         """
-        Fetch JSON data from the API with no-cache headers.
+        Fetch JSON data from the API through the shared pooled session.
+        Unchanged resources are revalidated with a conditional GET instead of re-downloaded.
+        The response headers are kept because they tell when the data goes stale.
         """
-        response = requests.get(url, headers={"Cache-Control": "no-cache", "Pragma": "no-cache"}, timeout=10)
-        response.raise_for_status()
-        return response.json()
+        return fetch_json(url, timeout)
+
+    def _parse_daily_forecast(self, daily_forecast_data: dict, generated_time: str) -> DailyForecastManager:
+        """Parse daily forecast periods directly into a DailyForecastManager"""
+        manager = DailyForecastManager(None, generated_time)
+        manager.load_rows(daily_rows(daily_forecast_data))
+        return manager
+
+    def _parse_hourly_forecast(self, hourly_forecast_data: dict, generated_time: str) -> HourlyForecastManager:
+        """Parse hourly forecast periods directly into an HourlyForecastManager"""
+        manager = HourlyForecastManager(None, generated_time)
+        manager.load_rows(hourly_rows(hourly_forecast_data), 'start_time')
+        return manager
+
+    def _export_csv(self, daily_forecast_data: dict, hourly_forecast_data: dict) -> None:
+        """Write both CSV files in the background; failures are reported but never reach the UI."""
+        try:
+            self._save_daily_forecast(daily_forecast_data)
+            self._save_hourly_forecast(hourly_forecast_data)
+        except Exception as e:  # Nothing inspects the export's future, so every failure is reported here
+            print(f"CSV export failed: {str(e)}")
 
     def _save_daily_forecast(self, daily_forecast_data: dict) -> None:
-        """Save daily forecast data to CSV"""
-        daily_periods = daily_forecast_data["properties"]["periods"]
-
-        # Open a CSV file named 'daily_forecast_data.csv' in write mode
-        with open('daily_forecast_data.csv', 'w', newline='') as daily_file:
-            # Create a list of headers in this exact order
-            headers = [
-                "forecast_period", "name", "start_time", "end_time", "isDaytime",
-                "temperature", "temperature_unit", "temperature_trend",
-                "precipitation_probability_unit", "precipitation_probability_value",
-                "wind_speed", "wind_direction", "weather_icon_url",
-                "short_forecast", "detailed_forecast"
-            ]
-
-            # Create a csv.DictWriter object using the file and fieldnames
-            writer = csv.DictWriter(daily_file, fieldnames=headers)
-
-            # Write the headers to the file
-            writer.writeheader()
-
-            # Loop through each item in daily_periods and write it to the CSV
-            for period in daily_periods:
-                writer.writerow({
-                    "forecast_period": period.get("number", ""),
-                    "name": period.get("name", ""),
-                    "start_time": period.get("startTime", ""),
-                    "end_time": period.get("endTime", ""),
-                    "isDaytime": period.get("isDaytime", ""),
-                    "temperature": period.get("temperature", ""),
-                    "temperature_unit": period.get("temperatureUnit", ""),
-                    "temperature_trend": period.get("temperatureTrend", ""),
-                    "precipitation_probability_unit": period.get("probabilityOfPrecipitation", {}).get("unitCode", ""),
-                    "precipitation_probability_value": period.get("probabilityOfPrecipitation", {}).get("value", ""),
-                    "wind_speed": period.get("windSpeed", ""),
-                    "wind_direction": period.get("windDirection", ""),
-                    "weather_icon_url": period.get("icon", ""),
-                    "short_forecast": period.get("shortForecast", ""),
-                    "detailed_forecast": period.get("detailedForecast", "")
-                })
+        """Save daily forecast data to CSV in the forecast store"""
+        self.store.save(self.gridpoint.key, DAILY, daily_forecast_data, forecast_generated_time(daily_forecast_data))
 
     def _save_hourly_forecast(self, hourly_forecast_data: dict) -> None:
-        """Save hourly forecast data to CSV"""
-        hourly_periods = hourly_forecast_data["properties"]["periods"]
-
-        # Open a CSV file named 'hourly_forecast_data.csv' in write mode
-        with open('hourly_forecast_data.csv', 'w', newline='') as hourly_file:
-            # Create a list of headers in this exact order
-            headers = [
-                "forecast_period", "start_time", "temperature", "temperature_unit",
-                "precipitation_probability_unit", "precipitation_probability_value",
-                "dewpoint_unit", "dewpoint_value", "relative_humidity_unit", "relative_humidity_value",
-                "wind_speed", "wind_direction", "weather_icon_url", "short_forecast"
-            ]
-
-            # Create a csv.DictWriter object using the file and fieldnames
-            writer = csv.DictWriter(hourly_file, fieldnames=headers)
-
-            # Write the headers to the file
-            writer.writeheader()
-
-            # Loop through each item in hourly_periods and write it to the CSV
-            for period in hourly_periods:
-                writer.writerow({
-                    "forecast_period": period.get("number", ""),
-                    "start_time": period.get("startTime", ""),
-                    "temperature": period.get("temperature", ""),
-                    "temperature_unit": period.get("temperatureUnit", ""),
-                    "precipitation_probability_unit": period.get("probabilityOfPrecipitation", {}).get("unitCode", ""),
-                    "precipitation_probability_value": period.get("probabilityOfPrecipitation", {}).get("value", ""),
-                    "dewpoint_unit": period.get("dewpoint", {}).get("unitCode", ""),
-                    "dewpoint_value": period.get("dewpoint", {}).get("value", ""),
-                    "relative_humidity_unit": period.get("relativeHumidity", {}).get("unitCode", ""),
-                    "relative_humidity_value": period.get("relativeHumidity", {}).get("value", ""),
-                    "wind_speed": period.get("windSpeed", ""),
-                    "wind_direction": period.get("windDirection", ""),
-                    "weather_icon_url": period.get("icon", ""),
-                    "short_forecast": period.get("shortForecast", "")
-                })
+        """Save hourly forecast data to CSV in the forecast store"""
+        self.store.save(self.gridpoint.key, HOURLY, hourly_forecast_data,
+                        forecast_generated_time(hourly_forecast_data))
 
 def main():
     app = QCoreApplication([])
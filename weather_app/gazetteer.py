@@ -0,0 +1,471 @@
+import argparse
+import csv
+import heapq
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import unicodedata
+from array import array
+from geopy.location import Location
+from local_storage import get_cache_dir, atomic_write_bytes
+
+"""
+An offline gazetteer for resolving and completing place names without a network round trip.
+
+A places file (a GeoNames dump such as US.txt or cities1000.txt, a Census Gazetteer
+places file, or any CSV with name/latitude/longitude columns) is compiled once into a
+compact binary index. The index is memory-mapped when loaded, so opening it costs a few
+page faults regardless of its size, and lookups read only the entries they touch:
+
+    header | records | labels | prefix entries | keys | trigram table | postings
+
+Records are sorted by population (largest first), so a lower record number means a higher
+rank. Prefix entries are sorted by normalized name for binary-searched prefix completion;
+the trigram table maps each three-letter sequence to the records containing it, for
+typo-tolerant search when no name starts with the query.
+
+Build an index with:
+    python gazetteer.py PLACES_FILE [INDEX_FILE]
+"""
+
+FORMAT_MAGIC = b"WGZ1"
+FORMAT_VERSION = 1
+
+# magic, version, reserved, record count, trigram count, then the offsets of the six sections
+_HEADER = struct.Struct("<4sHHIIQQQQQQ")
+# latitude, longitude, population, label offset, label length, key length
+_RECORD = struct.Struct("<ddIIII")
+# key offset, key length, record number
+_PREFIX = struct.Struct("<III")
+# trigram, first posting, number of postings
+_TRIGRAM = struct.Struct("<3sII")
+
+# Prefix entries (and records) complete() reads at most, so a short prefix stays cheap to complete
+COMPLETE_SCAN_LIMIT = 2000
+
+# Words the Census appends to place names ('Springfield city')
+_CENSUS_SUFFIXES = {"city", "town", "village", "cdp", "borough", "municipality", "township"}
+
+# Abbreviations expanded during normalization, so 'St Paul' and 'Saint Paul' share a key
+_ABBREVIATIONS = {"st": "saint", "ste": "sainte", "ft": "fort", "mt": "mount", "pt": "point"}
+
+# Accepted column names for delimited files with a header row, in order of preference
+_COLUMN_ALIASES = {
+    "name": ("name", "NAME", "asciiname", "city"),
+    "latitude": ("latitude", "lat", "INTPTLAT"),
+    "longitude": ("longitude", "lon", "lng", "INTPTLONG"),
+    "admin": ("state", "admin1", "admin", "USPS", "state_id"),
+    "country": ("country", "country_code"),
+    "population": ("population", "POPULATION", "pop"),
+}
+
+
+def normalize_name(text: str) -> str:
+    """Fold a place name to lowercase ASCII words, e.g. 'St. Paul-Ville ' -> 'saint paul ville'."""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower()
+    return " ".join(_ABBREVIATIONS.get(word, word) for word in re.sub(r"[^a-z0-9]+", " ", text).split())
+
+
+def trigrams(key: str) -> set:
+    """Return the trigrams of a normalized name, padded so that word starts weigh more."""
+    padded = f"  {key} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+class Place:
+    """One gazetteer entry."""
+
+    __slots__ = ("label", "latitude", "longitude", "population", "rank")
+
+    def __init__(self, label: str, latitude: float, longitude: float, population: int, rank: int) -> None:
+        """
+        Args:
+            label (str): Display name, e.g. 'Springfield, IL, US'.
+            latitude (float): Latitude in degrees.
+            longitude (float): Longitude in degrees.
+            population (int): Population, 0 if unknown.
+            rank (int): Position in the index (0 is the most populous place).
+        """
+        self.label = label
+        self.latitude = latitude
+        self.longitude = longitude
+        self.population = population
+        self.rank = rank
+
+    def to_location(self) -> Location:
+        """Return the place as a geopy Location, like the ones Nominatim returns."""
+        return Location(self.label, (self.latitude, self.longitude),
+                        {"source": "gazetteer", "population": self.population})
+
+    def __repr__(self) -> str:
+        return f"Place({self.label!r}, {self.latitude}, {self.longitude}, population={self.population})"
+
+
+def read_places(path: str):
+    """
+    Yield (name, admin, country, latitude, longitude, population) from a places file.
+
+    GeoNames dumps (tab-separated, no header) are recognized by their column count; only
+    populated places (feature class 'P') are read from them. Other files must have a header
+    row naming at least the name, latitude and longitude columns (see _COLUMN_ALIASES).
+    """
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        first_line = file.readline()
+        delimiter = "\t" if "\t" in first_line else ","
+        header = next(csv.reader([first_line], delimiter=delimiter))
+        file.seek(0)
+        reader = csv.reader(file, delimiter=delimiter, quoting=csv.QUOTE_NONE if delimiter == "\t" else csv.QUOTE_MINIMAL)
+
+        if delimiter == "\t" and len(header) >= 15 and not any(name in header for name in _COLUMN_ALIASES["name"]):
+            for row in reader:
+                if len(row) < 15 or row[6] != "P":
+                    continue
+                try:
+                    yield row[1], row[10], row[8], float(row[4]), float(row[5]), int(row[14] or 0)
+                except ValueError:
+                    continue
+            return
+
+        next(reader)
+        header = [name.strip() for name in header]
+        columns = {}
+        for field, aliases in _COLUMN_ALIASES.items():
+            columns[field] = next((header.index(alias) for alias in aliases if alias in header), None)
+        if columns["name"] is None or columns["latitude"] is None or columns["longitude"] is None:
+            raise ValueError(f"{path}: header needs name, latitude and longitude columns")
+        census = "INTPTLAT" in header
+
+        for row in reader:
+            try:
+                name = row[columns["name"]].strip()
+                latitude = float(row[columns["latitude"]])
+                longitude = float(row[columns["longitude"]])
+                admin = row[columns["admin"]].strip() if columns["admin"] is not None else ""
+                country = row[columns["country"]].strip() if columns["country"] is not None else ("US" if census else "")
+                population = int(float(row[columns["population"]] or 0)) if columns["population"] is not None else 0
+            except (IndexError, ValueError):
+                continue
+            if census and name.rsplit(" ", 1)[-1].lower() in _CENSUS_SUFFIXES:
+                name = name.rsplit(" ", 1)[0]
+            yield name, admin, country, latitude, longitude, population
+
+
+def build_index(source_path: str, index_path: str) -> int:
+    """
+    Compile a places file into a gazetteer index, written atomically.
+
+    Places with the same name, admin area and country are merged, keeping the most populous.
+
+    Returns:
+        int: Number of places in the index.
+    """
+    places = {}
+    for name, admin, country, latitude, longitude, population in read_places(source_path):
+        key = normalize_name(name)
+        if not key:
+            continue
+        identity = (key, admin.upper(), country.upper())
+        existing = places.get(identity)
+        if existing is None or population > existing[4]:
+            label = ", ".join(part for part in (name, admin, country) if part)
+            places[identity] = (key, label, latitude, longitude, population)
+
+    ranked = sorted(places.values(), key=lambda place: (-place[4], place[1]))
+
+    records = bytearray()
+    labels = bytearray()
+    postings_by_trigram = {}
+    for number, (key, label, latitude, longitude, population) in enumerate(ranked):
+        encoded = label.encode("utf-8")
+        records += _RECORD.pack(latitude, longitude, min(population, 0xFFFFFFFF), len(labels), len(encoded), len(key))
+        labels += encoded
+        for trigram in trigrams(key):
+            postings_by_trigram.setdefault(trigram, array("I")).append(number)
+
+    keys = bytearray()
+    prefix = bytearray()
+    for number in sorted(range(len(ranked)), key=lambda number: (ranked[number][0], number)):
+        encoded = ranked[number][0].encode("ascii")
+        prefix += _PREFIX.pack(len(keys), len(encoded), number)
+        keys += encoded
+
+    trigram_table = bytearray()
+    postings = array("I")
+    for trigram in sorted(postings_by_trigram):
+        numbers = postings_by_trigram[trigram]
+        trigram_table += _TRIGRAM.pack(trigram.encode("ascii"), len(postings), len(numbers))
+        postings.extend(numbers)
+    if sys.byteorder != "little":
+        postings.byteswap()
+
+    # Lay the sections out after the header; postings are 4-byte aligned so they can be cast in place
+    records_offset = _HEADER.size
+    labels_offset = records_offset + len(records)
+    prefix_offset = labels_offset + len(labels)
+    keys_offset = prefix_offset + len(prefix)
+    trigrams_offset = keys_offset + len(keys)
+    padding = -(trigrams_offset + len(trigram_table)) % 4
+    postings_offset = trigrams_offset + len(trigram_table) + padding
+
+    header = _HEADER.pack(FORMAT_MAGIC, FORMAT_VERSION, 0, len(ranked), len(postings_by_trigram), records_offset,
+                          labels_offset, prefix_offset, keys_offset, trigrams_offset, postings_offset)
+    atomic_write_bytes(index_path, b"".join((header, records, labels, prefix, keys, trigram_table,
+                                             b"\0" * padding, postings.tobytes())))
+    return len(ranked)
+
+
+class Gazetteer:
+    """Read-only, memory-mapped access to a gazetteer index. Safe to share between threads."""
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path (str): Index file written by build_index.
+
+        Raises:
+            OSError: If the file cannot be opened.
+            ValueError: If the file is not a gazetteer index of this version.
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        self._postings_view = None
+        self._postings = None
+        try:
+            self._open_sections()
+        except (struct.error, TypeError, ValueError) as e:
+            self.close()
+            raise ValueError(f"{path} is not a valid gazetteer index: {e}") from None
+
+    def _open_sections(self) -> None:
+        """
+        Read the header, check that the sections fit the file, and map the postings.
+
+        Raises:
+            ValueError: If the header does not describe this file.
+            struct.error, TypeError: If the file is truncated.
+        """
+        (magic, version, _, self._count, self._trigram_count, self._records, self._labels, self._prefix,
+         self._keys, self._trigrams, self._postings_offset) = _HEADER.unpack_from(self._view)
+        if magic != FORMAT_MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"not a version {FORMAT_VERSION} gazetteer index")
+        if not (_HEADER.size <= self._records <= self._labels <= self._prefix <= self._keys <= self._trigrams
+                <= self._postings_offset <= len(self._view)) \
+                or self._labels - self._records != self._count * _RECORD.size \
+                or self._keys - self._prefix != self._count * _PREFIX.size \
+                or self._postings_offset - self._trigrams < self._trigram_count * _TRIGRAM.size:
+            raise ValueError("sections do not fit the file")
+
+        self._postings_view = self._view[self._postings_offset:]
+        if sys.byteorder == "little":
+            self._postings = self._postings_view.cast("I")
+        else:
+            self._postings = array("I", self._postings_view.tobytes())
+            self._postings.byteswap()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def place(self, number: int) -> Place:
+        """Return the place with the given record number (0 is the most populous)."""
+        latitude, longitude, population, label_offset, label_length, _ = _RECORD.unpack_from(
+            self._view, self._records + number * _RECORD.size)
+        start = self._labels + label_offset
+        label = bytes(self._view[start:start + label_length]).decode("utf-8")
+        return Place(label, latitude, longitude, population, number)
+
+    def lookup(self, query: str):
+        """
+        Resolve a place name such as 'Springfield' or 'Springfield, IL'.
+
+        Text after the first comma must match the place's admin area or country. Among the
+        matching places, the most populous is returned.
+
+        Returns:
+            Place: The best match, or None if no place has exactly this name.
+        """
+        name, _, qualifier = query.partition(",")
+        key = normalize_name(name).encode("ascii")
+        if not key:
+            return None
+        qualifiers = [normalize_name(part) for part in qualifier.split(",") if normalize_name(part)]
+
+        # The entries with exactly this key come first, ordered by record number
+        for entry_key, number in self._entries_from(key):
+            if entry_key != key:
+                break
+            place = self.place(number)
+            parts = {normalize_name(part) for part in place.label.split(",")[1:]}
+            if all(part in parts for part in qualifiers):
+                return place
+        return None
+
+    def complete(self, prefix: str, limit: int = 10) -> list:
+        """
+        Return the most populous places whose name starts with prefix.
+
+        At most COMPLETE_SCAN_LIMIT prefix entries are read. When more names than that start
+        with the prefix, the most populous places are first looked for by walking the records
+        in rank order, which finds them quickly because such a prefix is common. Only if that
+        walk also ends without limit matches is the result approximate, taken from the
+        alphabetically first names.
+
+        Returns:
+            list: Up to limit Place objects, most populous first.
+        """
+        key = normalize_name(prefix).encode("ascii")
+        if not key:
+            return []
+        low, high = self._prefix_range(key)
+        if high - low <= COMPLETE_SCAN_LIMIT:
+            numbers = heapq.nsmallest(limit, (self._entry_number(index) for index in range(low, high)))
+            return [self.place(number) for number in numbers]
+
+        numbers = []
+        for number in range(min(self._count, COMPLETE_SCAN_LIMIT)):
+            if self._record_key(number).startswith(key):
+                numbers.append(number)
+                if len(numbers) == limit:
+                    return [self.place(number) for number in numbers]
+        scanned = (self._entry_number(index) for index in range(low, low + COMPLETE_SCAN_LIMIT))
+        numbers = heapq.nsmallest(limit, set(numbers).union(scanned))
+        return [self.place(number) for number in numbers]
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """
+        Return places for a possibly misspelled query: prefix matches first, then places whose
+        names share the most trigrams with the query, ties going to the more populous place.
+        """
+        results = self.complete(query, limit)
+        if len(results) >= limit:
+            return results
+        seen = {place.rank for place in results}
+        key = normalize_name(query)
+        query_trigrams = trigrams(key) if key else set()
+
+        counts = {}
+        for trigram in query_trigrams:
+            for number in self._postings_for(trigram):
+                counts[number] = counts.get(number, 0) + 1
+
+        def similarity(number):
+            key_length = _RECORD.unpack_from(self._view, self._records + number * _RECORD.size)[5]
+            shared = counts[number]
+            return shared / (len(query_trigrams) + key_length + 1 - shared)
+
+        threshold = len(query_trigrams) / 2
+        candidates = [number for number, shared in counts.items() if shared >= threshold and number not in seen]
+        best = heapq.nsmallest(limit - len(results), candidates, key=lambda number: (-similarity(number), number))
+        return results + [self.place(number) for number in best]
+
+    def close(self) -> None:
+        """Release the memory map."""
+        if isinstance(self._postings, memoryview):
+            self._postings.release()
+        if self._postings_view is not None:
+            self._postings_view.release()
+        self._view.release()
+        self._mmap.close()
+
+    def _key(self, index: int) -> tuple:
+        """Return (key bytes, record number) of prefix entry index."""
+        offset, length, number = _PREFIX.unpack_from(self._view, self._prefix + index * _PREFIX.size)
+        start = self._keys + offset
+        return bytes(self._view[start:start + length]), number
+
+    def _entry_number(self, index: int) -> int:
+        """Return the record number of prefix entry index, without reading its key."""
+        return _PREFIX.unpack_from(self._view, self._prefix + index * _PREFIX.size)[2]
+
+    def _record_key(self, number: int) -> bytes:
+        """Return the normalized name of a record, which starts its normalized label."""
+        key_length = _RECORD.unpack_from(self._view, self._records + number * _RECORD.size)[5]
+        return normalize_name(self.place(number).label).encode("ascii")[:key_length]
+
+    def _lower_bound(self, key: bytes) -> int:
+        """Return the index of the first prefix entry whose key is not less than key."""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _prefix_range(self, prefix: bytes) -> tuple:
+        """Return (low, high): the prefix entries low:high are those whose key starts with prefix."""
+        # Keys are ASCII, so every key starting with prefix sorts before prefix + 0xff
+        return self._lower_bound(prefix), self._lower_bound(prefix + b"\xff")
+
+    def _entries_from(self, prefix: bytes):
+        """Yield (key, record number) for every prefix entry whose key starts with prefix."""
+        for index in range(self._lower_bound(prefix), self._count):
+            key, number = self._key(index)
+            if not key.startswith(prefix):
+                break
+            yield key, number
+
+    def _postings_for(self, trigram: str):
+        """Return the record numbers containing a trigram."""
+        encoded = trigram.encode("ascii")
+        low, high = 0, self._trigram_count
+        while low < high:
+            middle = (low + high) // 2
+            value, start, count = _TRIGRAM.unpack_from(self._view, self._trigrams + middle * _TRIGRAM.size)
+            if value == encoded:
+                return self._postings[start:start + count]
+            if value < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        return ()
+
+
+def default_index_path() -> str:
+    """Return the index location: $WEATHER_APP_GAZETTEER if set, else gazetteer.idx in the cache directory."""
+    return os.environ.get("WEATHER_APP_GAZETTEER") or os.path.join(get_cache_dir(), "gazetteer.idx")
+
+
+_shared_gazetteer = None
+_shared_gazetteer_loaded = False
+_shared_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer():
+    """
+    Return the application-wide gazetteer, opening it on first use.
+
+    Returns:
+        Gazetteer: The loaded index, or None if no index has been built (the gazetteer is optional).
+    """
+    global _shared_gazetteer, _shared_gazetteer_loaded
+    with _shared_gazetteer_lock:
+        if not _shared_gazetteer_loaded:
+            _shared_gazetteer_loaded = True
+            try:
+                _shared_gazetteer = Gazetteer(default_index_path())
+            except FileNotFoundError:
+                _shared_gazetteer = None
+            except (OSError, ValueError) as e:
+                print(f"Gazetteer unavailable: {e}")
+                _shared_gazetteer = None
+        return _shared_gazetteer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the offline gazetteer index from a places file.")
+    parser.add_argument("source", help="GeoNames dump, Census Gazetteer places file or CSV with a header row")
+    parser.add_argument("index", nargs="?", help="index file to write (defaults to the application's index)")
+    args = parser.parse_args()
+    index_path = args.index or default_index_path()
+    count = build_index(args.source, index_path)
+    print(f"Indexed {count} places into {index_path}")
+
+
+if __name__ == "__main__":
+    main()
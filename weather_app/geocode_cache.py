@@ -0,0 +1,181 @@
+import os
+import re
+import threading
+import time
+from geopy.location import Location
+from local_storage import get_cache_dir, atomic_write_json, read_json
+
+"""
+A persistent cache for geocoding lookups.
+
+Place name queries are normalized (case, whitespace and comma spacing) before they are
+used as keys, so 'New York,NY' and '  new york, ny ' share one entry. Reverse lookups are
+keyed by coordinates rounded to about 11 m. Queries that found nothing are remembered too,
+for a shorter time, so a repeated typo does not go back to the geocoder either.
+"""
+
+CACHE_FORMAT_VERSION = 1
+
+# Decimal places kept for reverse lookup keys (0.0001 degrees is about 11 m)
+REVERSE_PRECISION = 4
+
+
+def normalize_query(query: str) -> str:
+    """Return the cache key for a place name query."""
+    query = re.sub(r"\s*,\s*", ", ", query.strip().casefold())
+    return re.sub(r"\s+", " ", query).strip(", ")
+
+
+def reverse_key(latitude: float, longitude: float) -> str:
+    """Return the cache key for a reverse lookup."""
+    return f"{latitude:.{REVERSE_PRECISION}f},{longitude:.{REVERSE_PRECISION}f}"
+
+
+def location_to_dict(location: Location):
+    """Serialize a geopy Location (or None for 'not found') for the cache file."""
+    if location is None:
+        return None
+    return {
+        "address": location.address,
+        "latitude": location.latitude,
+        "longitude": location.longitude,
+        "raw": location.raw,
+    }
+
+
+def location_from_dict(data: dict):
+    """Rebuild a geopy Location from location_to_dict output (None stays None)."""
+    if data is None:
+        return None
+    return Location(data["address"], (float(data["latitude"]), float(data["longitude"])), data.get("raw") or {})
+
+
+class GeocodeCache:
+    """A thread-safe, file-backed cache of forward and reverse geocoding results with TTL and LRU eviction."""
+
+    def __init__(self, path: str = None, ttl_seconds: float = 90 * 24 * 3600,
+                 negative_ttl_seconds: float = 24 * 3600, max_entries: int = 5000, autosave: bool = True) -> None:
+        """
+        Args:
+            path (str): JSON file backing the cache (defaults to geocode.json in the cache directory).
+            ttl_seconds (float): Age after which a found location is looked up again.
+            negative_ttl_seconds (float): Age after which a query that found nothing is tried again.
+            max_entries (int): Maximum number of entries kept in each of the forward and reverse
+                               caches; least recently used ones are evicted.
+            autosave (bool): Write the file after every change.
+        """
+        self.path = path or os.path.join(get_cache_dir(), "geocode.json")
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        self.autosave = autosave
+        self._queries = {}  # normalized query -> entry dict
+        self._reverse = {}  # reverse_key -> entry dict
+        self._lock = threading.Lock()
+        self._load()
+
+    def get_query(self, query: str) -> tuple:
+        """
+        Look up a place name query.
+
+        Returns:
+            tuple: (hit, location). hit is False if there is no fresh entry; location is None
+                   for a cached 'not found' result.
+        """
+        return self._get(self._queries, normalize_query(query))
+
+    def put_query(self, query: str, location) -> None:
+        """Remember the result of a place name query (None if nothing was found)."""
+        self._put(self._queries, normalize_query(query), location)
+
+    def get_reverse(self, latitude: float, longitude: float) -> tuple:
+        """
+        Look up a reverse geocoding result.
+
+        Returns:
+            tuple: (hit, location), as for get_query.
+        """
+        return self._get(self._reverse, reverse_key(latitude, longitude))
+
+    def put_reverse(self, latitude: float, longitude: float, location) -> None:
+        """Remember the result of a reverse lookup (None if nothing was found)."""
+        self._put(self._reverse, reverse_key(latitude, longitude), location)
+
+    def save(self) -> None:
+        """Write the cache to disk atomically."""
+        with self._lock:
+            data = {
+                "version": CACHE_FORMAT_VERSION,
+                "queries": dict(self._queries),
+                "reverse": dict(self._reverse),
+            }
+        atomic_write_json(self.path, data)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._queries.clear()
+            self._reverse.clear()
+        if self.autosave:
+            self.save()
+
+    def __len__(self) -> int:
+        return len(self._queries) + len(self._reverse)
+
+    def _get(self, entries: dict, key: str) -> tuple:
+        now = time.time()
+        with self._lock:
+            entry = entries.get(key)
+            if entry is None:
+                return False, None
+            ttl = self.ttl_seconds if entry["location"] is not None else self.negative_ttl_seconds
+            if now - entry["cached_at"] > ttl:
+                del entries[key]
+                return False, None
+            entry["last_used"] = now
+            return True, location_from_dict(entry["location"])
+
+    def _put(self, entries: dict, key: str, location) -> None:
+        now = time.time()
+        with self._lock:
+            entries[key] = {"location": location_to_dict(location), "cached_at": now, "last_used": now}
+            self._evict(entries)
+        if self.autosave:
+            self.save()
+
+    def _load(self) -> None:
+        """Load entries from disk, ignoring a missing, corrupt or outdated file."""
+        data = read_json(self.path, {})
+        if not isinstance(data, dict) or data.get("version") != CACHE_FORMAT_VERSION:
+            return
+        try:
+            for source, entries in ((data.get("queries", {}), self._queries), (data.get("reverse", {}), self._reverse)):
+                for key, entry in source.items():
+                    location_from_dict(entry["location"])  # Validate before accepting the entry
+                    entries[key] = {"location": entry["location"], "cached_at": float(entry["cached_at"]),
+                                    "last_used": float(entry.get("last_used", entry["cached_at"]))}
+        except (AttributeError, KeyError, TypeError, ValueError):
+            self._queries.clear()
+            self._reverse.clear()
+
+    def _evict(self, entries: dict) -> None:
+        """Drop the least recently used entries beyond max_entries. Caller holds the lock."""
+        overflow = len(entries) - self.max_entries
+        if overflow <= 0:
+            return
+        oldest = sorted(entries, key=lambda key: entries[key]["last_used"])[:overflow]
+        for key in oldest:
+            del entries[key]
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_geocode_cache() -> GeocodeCache:
+    """Return the application-wide geocode cache, loading it on first use."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = GeocodeCache()
+        return _shared_cache
@@ -0,0 +1,25 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+from geolocator import GeolocatorService
+
+"""
+A worker that geocodes a search query in the background.
+"""
+class GeocodeWorker(QThread):
+    """
+    Signal to communicate the result back to the main thread.
+    Emits: query (str), location (geopy Location, or None if nothing was found or the lookup failed)
+    """
+    geocode_finished = pyqtSignal(str, object)
+
+    def __init__(self, query: str, geo_service: GeolocatorService) -> None:
+        """
+        Args:
+            query (str): The place name to look up.
+            geo_service (GeolocatorService): Service performing the (cached, rate limited) lookup.
+        """
+        super().__init__()
+        self.query = query
+        self.geo_service = geo_service
+
+    def run(self) -> None:
+        self.geocode_finished.emit(self.query, self.geo_service.get_location(self.query))
@@ -1,16 +1,126 @@
+import threading
+from concurrent.futures import Future
 from geopy import Nominatim
+from gazetteer import Gazetteer, get_gazetteer
+from geocode_cache import GeocodeCache, get_geocode_cache, normalize_query, reverse_key
+from rate_limiter import RateLimiter
+
+# Nominatim's usage policy allows at most one request per second, shared by every service instance
+_nominatim_rate_limiter = RateLimiter(rate=1.0, burst=1)
 
 
 class GeolocatorService:
-    """Handles geolocation queries using geopy."""
+    """
+    Handles geolocation queries using geopy.
+
+    Place names found in the offline gazetteer (if an index has been built) are resolved
+    locally without a request. Other results are kept in a persistent cache, concurrent
+    lookups of the same query share one request, and requests are queued to respect
+    Nominatim's rate limit. The lookup methods block, so the UI calls them from a
+    GeocodeWorker thread.
+    """
 
-    def __init__(self):
-        self.geolocator = Nominatim(user_agent="weather_app")
+    def __init__(self, geolocator=None, cache: GeocodeCache = None, rate_limiter: RateLimiter = None,
+                 gazetteer: Gazetteer = None):
+        """
+        Args:
+            geolocator: geopy geocoder to use (defaults to Nominatim).
+            cache (GeocodeCache): Cache of results (defaults to the shared one).
+            rate_limiter (RateLimiter): Limiter applied to every request (defaults to one request per second).
+            gazetteer (Gazetteer): Offline index consulted before the geocoder (defaults to the shared
+                                   one, which is None if no index has been built).
+        """
+        self.geolocator = geolocator or Nominatim(user_agent="weather_app")
+        self.gazetteer = gazetteer if gazetteer is not None else get_gazetteer()
+        self.cache = cache if cache is not None else get_geocode_cache()
+        self.rate_limiter = rate_limiter or _nominatim_rate_limiter
+        self._in_flight = {}  # lookup key -> Future shared by all callers waiting for it
+        self._lock = threading.Lock()
 
     def get_location(self, query):
-        """Returns a location object from a search query."""
+        """Returns a location object from a search query, or None if nothing was found or the lookup failed."""
+        hit, location = self.get_cached_location(query)
+        if hit:
+            return location
+        return self._coalesced(("query", normalize_query(query)), lambda: self._geocode(query))
+
+    def get_cached_location(self, query):
+        """
+        Looks a query up in the gazetteer and the cache only, without blocking.
+
+        Returns:
+            tuple: (hit, location); location is None for a cached 'not found' result.
+        """
+        if self.gazetteer is not None:
+            place = self.gazetteer.lookup(query)
+            if place is not None:
+                return True, place.to_location()
+        return self.cache.get_query(query)
+
+    def suggest(self, text, limit=8):
+        """
+        Returns completions for partially typed text from the offline gazetteer, most populous
+        first (e.g. ['Springfield, MO, US', 'Springfield, MA, US']); empty without a gazetteer.
+        """
+        if self.gazetteer is None:
+            return []
+        return [place.label for place in self.gazetteer.search(text, limit)]
+
+    def reverse(self, latitude, longitude):
+        """Returns the location (address) at a coordinate, or None if nothing was found or the lookup failed."""
+        hit, location = self.cache.get_reverse(latitude, longitude)
+        if hit:
+            return location
+        return self._coalesced(("reverse", reverse_key(latitude, longitude)),
+                               lambda: self._reverse(latitude, longitude))
+
+    def _coalesced(self, key, lookup):
+        """Runs lookup once for all concurrent callers asking for the same key."""
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+        if not owner:
+            return future.result()
+
         try:
-            return self.geolocator.geocode(query)
+            result = lookup()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def _geocode(self, query):
+        """Queries the geocoder, waiting for the rate limiter first; failures are not cached."""
+        self.rate_limiter.acquire()
+        try:
+            location = self.geolocator.geocode(query)
+        except Exception as e:
+            print(f"Geocoder error: {e}")
+            return None
+        try:
+            self.cache.put_query(query, location)
+        except OSError as e:
+            # The lookup succeeded; only remembering it failed
+            print(f"Geocode cache save failed: {e}")
+        return location
+
+    def _reverse(self, latitude, longitude):
+        """Queries the geocoder for an address, waiting for the rate limiter first; failures are not cached."""
+        self.rate_limiter.acquire()
+        try:
+            location = self.geolocator.reverse((latitude, longitude))
         except Exception as e:
             print(f"Geocoder error: {e}")
             return None
+        try:
+            self.cache.put_reverse(latitude, longitude, location)
+        except OSError as e:
+            # The lookup succeeded; only remembering it failed
+            print(f"Geocode cache save failed: {e}")
+        return location
@@ -0,0 +1,215 @@
+import math
+import re
+from array import array
+from datetime import datetime
+from functools import lru_cache
+
+"""
+Ingestion of the raw gridded forecast (/gridpoints/{office}/{x},{y}).
+
+Each layer of the gridded forecast (temperature, skyCover, windGust, quantitativePrecipitation
+and so on) is a list of values with ISO 8601 validTime intervals such as
+'2025-04-28T16:00:00+00:00/PT3H'. GriddedForecast expands every numeric layer into an
+array('d') with one value per hour on a shared, hour-aligned time axis, so layers line up
+with each other and with an hourly forecast series by index.
+
+An interval is expanded with a single slice assignment rather than a Python loop over its
+hours, and interval start times and durations are parsed once per distinct string; the
+same few strings repeat across all layers of a response.
+"""
+
+SECONDS_PER_HOUR = 3600
+
+# Layers whose values are totals over their interval; they are spread evenly over its hours
+ACCUMULATED_LAYERS = frozenset(("quantitativePrecipitation", "snowfallAmount", "iceAccumulation"))
+
+# Matches an ISO 8601 duration such as 'PT3H', 'P1D' or 'P1DT12H'
+_DURATION_PATTERN = re.compile(
+    r"^P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?"
+    r"(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+(?:\.\d+)?)S)?)?$"
+)
+
+
+@lru_cache(maxsize=256)
+def parse_iso_duration(duration):
+    """
+    Parse an ISO 8601 duration of weeks, days, hours, minutes and seconds (years and months
+    are not used by the API and are rejected).
+
+    Returns:
+        float: Length in seconds.
+
+    Raises:
+        ValueError: If the duration is malformed.
+    """
+    match = _DURATION_PATTERN.match(duration)
+    if match is None or duration in ("P", "PT") or duration.endswith("T"):
+        raise ValueError(f"Invalid ISO 8601 duration: {duration}")
+    parts = {name: float(value) if value else 0.0 for name, value in match.groupdict().items()}
+    return (parts["weeks"] * 7 * 86400 + parts["days"] * 86400 + parts["hours"] * 3600 + parts["minutes"] * 60
+            + parts["seconds"])
+
+
+@lru_cache(maxsize=1024)
+def parse_valid_time(valid_time):
+    """
+    Parse a validTime interval 'start/duration' into whole hours.
+
+    Returns:
+        tuple: (start, hours): the start as POSIX seconds, rounded down to the hour, and the
+               number of hours covered (at least 1).
+
+    Raises:
+        ValueError: If the interval is malformed or its start has no UTC offset.
+    """
+    start_text, _, duration_text = valid_time.partition("/")
+    start = datetime.fromisoformat(start_text)
+    if start.tzinfo is None:
+        raise ValueError(f"validTime has no UTC offset: {valid_time}")
+    start_seconds = int(start.timestamp())
+    if duration_text:
+        end_seconds = start_seconds + parse_iso_duration(duration_text)
+    else:
+        end_seconds = start_seconds + SECONDS_PER_HOUR
+    first_hour = start_seconds // SECONDS_PER_HOUR
+    last_hour = math.ceil(end_seconds / SECONDS_PER_HOUR)
+    return first_hour * SECONDS_PER_HOUR, max(1, last_hour - first_hour)
+
+
+@lru_cache(maxsize=4096)
+def hour_of(timestamp):
+    """Return an ISO 8601 timestamp with UTC offset as POSIX seconds rounded down to the hour."""
+    parsed = datetime.fromisoformat(timestamp)
+    if parsed.tzinfo is None:
+        raise ValueError(f"Timestamp has no UTC offset: {timestamp}")
+    return int(parsed.timestamp()) // SECONDS_PER_HOUR * SECONDS_PER_HOUR
+
+
+def _is_numeric_layer(layer):
+    """True if a layer's values are numbers (or null), as opposed to e.g. the weather and hazards layers."""
+    if not isinstance(layer, dict) or not isinstance(layer.get("values"), list):
+        return False
+    for entry in layer["values"]:
+        value = entry.get("value") if isinstance(entry, dict) else None
+        if value is not None:
+            return isinstance(value, (int, float)) and not isinstance(value, bool)
+    return "uom" in layer
+
+
+# Class holding every numeric layer of a gridded forecast as aligned hourly columns
+class GriddedForecast:
+    def __init__(self, start, hours, layers=None, units=None, update_time=""):
+        """
+        Args:
+            start (int): POSIX time of the first hour (a multiple of 3600).
+            hours (int): Number of hours on the time axis.
+            layers (dict): Layer name -> array('d') of length hours; hours without a value are NaN.
+            units (dict): Layer name -> unit code as sent by the API, e.g. 'wmoUnit:degC'.
+            update_time (str): The gridded forecast's updateTime.
+        """
+        self.start = start
+        self.hours = hours
+        self.layers = layers if layers is not None else {}
+        self.units = units if units is not None else {}
+        self.update_time = update_time
+
+    @classmethod
+    def from_response(cls, gridpoint_data, layer_names=None, start=None, hours=None):
+        """
+        Expand the numeric layers of a /gridpoints response.
+
+        Args:
+            gridpoint_data (dict): The API response (with or without the GeoJSON 'properties' wrapper).
+            layer_names (iterable): Layers to expand (defaults to every numeric layer).
+            start (int): First hour of the time axis as POSIX seconds (defaults to the earliest value).
+            hours (int): Length of the time axis (defaults to reaching the last value).
+
+        Returns:
+            GriddedForecast: The expanded layers.
+
+        Raises:
+            ValueError: If a validTime is malformed.
+        """
+        properties = gridpoint_data.get("properties", gridpoint_data)
+        if layer_names is None:
+            names = [name for name, layer in properties.items() if _is_numeric_layer(layer)]
+        else:
+            names = [name for name in layer_names if _is_numeric_layer(properties.get(name))]
+
+        # Parse each layer's intervals once, and find the extent of the time axis from them
+        parsed = {}
+        first = last = None
+        for name in names:
+            intervals = [(parse_valid_time(entry["validTime"]), entry.get("value"))
+                         for entry in properties[name]["values"]]
+            parsed[name] = intervals
+            for (interval_start, interval_hours), _ in intervals:
+                interval_end = interval_start + interval_hours * SECONDS_PER_HOUR
+                first = interval_start if first is None or interval_start < first else first
+                last = interval_end if last is None or interval_end > last else last
+
+        if start is None:
+            start = first if first is not None else 0
+        else:
+            start = start // SECONDS_PER_HOUR * SECONDS_PER_HOUR
+        if hours is None:
+            hours = max(0, (last - start) // SECONDS_PER_HOUR) if last is not None else 0
+
+        forecast = cls(start, hours, update_time=properties.get("updateTime", ""))
+        empty = array('d', [math.nan]) * hours
+        for name, intervals in parsed.items():
+            column = array('d', empty)
+            accumulated = name in ACCUMULATED_LAYERS
+            for (interval_start, interval_hours), value in intervals:
+                if value is None:
+                    continue
+                begin = (interval_start - start) // SECONDS_PER_HOUR
+                end = begin + interval_hours
+                if accumulated:
+                    value = value / interval_hours
+                # Clip the interval to the time axis, then fill it with one slice assignment
+                begin, end = max(0, begin), min(hours, end)
+                if begin < end:
+                    column[begin:end] = array('d', [value]) * (end - begin)
+            forecast.layers[name] = column
+            forecast.units[name] = properties[name].get("uom", "")
+        return forecast
+
+    def hour_times(self):
+        """Return the POSIX time of every hour on the time axis."""
+        return range(self.start, self.start + self.hours * SECONDS_PER_HOUR, SECONDS_PER_HOUR)
+
+    def aligned_to(self, timestamps, layer_names=None):
+        """
+        Return layers re-indexed onto another sequence of hours, e.g. an hourly forecast series.
+
+        Args:
+            timestamps (iterable): ISO 8601 timestamps with UTC offsets, one per target hour.
+            layer_names (iterable): Layers to return (defaults to all).
+
+        Returns:
+            dict: Layer name -> array('d') with one value per timestamp (NaN outside the time axis).
+        """
+        indexes = [(hour_of(timestamp) - self.start) // SECONDS_PER_HOUR for timestamp in timestamps]
+        names = self.layers if layer_names is None else [name for name in layer_names if name in self.layers]
+
+        # Hourly forecasts are consecutive hours, which map to one contiguous slice of every layer
+        first = indexes[0] if indexes else 0
+        if indexes == list(range(first, first + len(indexes))) and 0 <= first and first + len(indexes) <= self.hours:
+            return {name: self.layers[name][first:first + len(indexes)] for name in names}
+
+        aligned = {}
+        for name in names:
+            column = self.layers[name]
+            aligned[name] = array('d', [column[index] if 0 <= index < self.hours else math.nan
+                                        for index in indexes])
+        return aligned
+
+    def __len__(self):
+        return self.hours
+
+    def __contains__(self, name):
+        return name in self.layers
+
+    def __getitem__(self, name):
+        return self.layers[name]
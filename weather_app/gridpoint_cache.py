@@ -0,0 +1,221 @@
+import os
+import threading
+import time
+from local_storage import get_cache_dir, atomic_write_json, read_json
+
+"""
+A persistent cache for the api.weather.gov /points lookup.
+
+The /points/{lat},{lon} endpoint maps a coordinate to a forecast office and grid cell,
+and that mapping practically never changes. Entries are stored once per gridpoint and
+referenced from an index of the coordinates looked up, rounded to 4 decimals as the API
+requires, so repeated lookups of a coordinate reuse the entry. Index cells are never
+shared by coordinates that round differently, since two such coordinates can lie on
+different sides of a grid cell boundary.
+"""
+
+CACHE_FORMAT_VERSION = 2
+
+
+class Gridpoint:
+    """The forecast office, grid coordinates and product URLs for one NWS grid cell."""
+
+    def __init__(self, office: str, grid_x: int, grid_y: int, forecast_url: str, forecast_hourly_url: str,
+                 forecast_grid_data_url: str = "", cached_at: float = 0.0) -> None:
+        """
+        Args:
+            office (str): Forecast office identifier (e.g., 'OKX').
+            grid_x (int): X coordinate of the grid cell.
+            grid_y (int): Y coordinate of the grid cell.
+            forecast_url (str): URL of the daily (12-hour period) forecast.
+            forecast_hourly_url (str): URL of the hourly forecast.
+            forecast_grid_data_url (str): URL of the raw gridded forecast data.
+            cached_at (float): Epoch seconds when the lookup was made.
+        """
+        self.office = office
+        self.grid_x = grid_x
+        self.grid_y = grid_y
+        self.forecast_url = forecast_url
+        self.forecast_hourly_url = forecast_hourly_url
+        self.forecast_grid_data_url = forecast_grid_data_url
+        self.cached_at = cached_at
+        self.last_used = cached_at
+
+    @property
+    def key(self) -> str:
+        """A unique identifier for the grid cell, e.g. 'OKX/33,35'."""
+        return f"{self.office}/{self.grid_x},{self.grid_y}"
+
+    @classmethod
+    def from_points_response(cls, points_data: dict) -> "Gridpoint":
+        """
+        Build a Gridpoint from a /points API response.
+
+        Raises:
+            KeyError: If the response does not contain the expected properties.
+        """
+        properties = points_data["properties"]
+        return cls(
+            properties["gridId"],
+            int(properties["gridX"]),
+            int(properties["gridY"]),
+            properties["forecast"],
+            properties["forecastHourly"],
+            properties.get("forecastGridData", ""),
+            time.time()
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "office": self.office,
+            "grid_x": self.grid_x,
+            "grid_y": self.grid_y,
+            "forecast_url": self.forecast_url,
+            "forecast_hourly_url": self.forecast_hourly_url,
+            "forecast_grid_data_url": self.forecast_grid_data_url,
+            "cached_at": self.cached_at,
+            "last_used": self.last_used,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Gridpoint":
+        gridpoint = cls(data["office"], int(data["grid_x"]), int(data["grid_y"]), data["forecast_url"],
+                        data["forecast_hourly_url"], data.get("forecast_grid_data_url", ""),
+                        float(data.get("cached_at", 0.0)))
+        gridpoint.last_used = float(data.get("last_used", gridpoint.cached_at))
+        return gridpoint
+
+
+class GridpointCache:
+    """A thread-safe, file-backed cache from coordinates to Gridpoint entries with TTL and LRU eviction."""
+
+    def __init__(self, path: str = None, ttl_seconds: float = 30 * 24 * 3600, max_entries: int = 10000,
+                 autosave: bool = True) -> None:
+        """
+        Args:
+            path (str): JSON file backing the cache (defaults to gridpoints.json in the cache directory).
+            ttl_seconds (float): Age after which an entry is looked up again.
+            max_entries (int): Maximum number of gridpoints kept; least recently used ones are evicted.
+            autosave (bool): Write the file after every change. Batch callers can disable this and call save().
+        """
+        self.path = path or os.path.join(get_cache_dir(), "gridpoints.json")
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.autosave = autosave
+        self._entries = {}  # gridpoint key -> Gridpoint
+        self._cells = {}  # index cell -> gridpoint key
+        self._lock = threading.Lock()
+        self._load()
+
+    def cell_for(self, latitude: float, longitude: float) -> str:
+        """Return the index cell of a coordinate: the coordinate rounded to 4 decimals, as it is looked up."""
+        return f"{round(latitude, 4)},{round(longitude, 4)}"
+
+    def get(self, latitude: float, longitude: float):
+        """
+        Look up the gridpoint for a coordinate.
+
+        Returns:
+            Gridpoint: The cached entry, or None if there is no fresh entry for the coordinate's cell.
+        """
+        cell = self.cell_for(latitude, longitude)
+        now = time.time()
+        with self._lock:
+            key = self._cells.get(cell)
+            gridpoint = self._entries.get(key) if key else None
+            if gridpoint is None:
+                return None
+            if now - gridpoint.cached_at > self.ttl_seconds:
+                self._remove_entry(key)
+                return None
+            gridpoint.last_used = now
+            return gridpoint
+
+    def put(self, latitude: float, longitude: float, gridpoint: Gridpoint) -> Gridpoint:
+        """
+        Store the gridpoint for a coordinate. If the grid cell is already cached, the existing
+        entry is reused and the coordinate's index cell is pointed at it.
+
+        Returns:
+            Gridpoint: The entry now stored for the coordinate.
+        """
+        cell = self.cell_for(latitude, longitude)
+        with self._lock:
+            existing = self._entries.get(gridpoint.key)
+            if existing is not None and existing.forecast_url == gridpoint.forecast_url:
+                existing.cached_at = max(existing.cached_at, gridpoint.cached_at)
+                gridpoint = existing
+            else:
+                self._entries[gridpoint.key] = gridpoint
+            gridpoint.last_used = time.time()
+            self._cells[cell] = gridpoint.key
+            self._evict()
+        if self.autosave:
+            self.save()
+        return gridpoint
+
+    def save(self) -> None:
+        """Write the cache to disk atomically."""
+        with self._lock:
+            data = {
+                "version": CACHE_FORMAT_VERSION,
+                "entries": {key: gridpoint.to_dict() for key, gridpoint in self._entries.items()},
+                "cells": dict(self._cells),
+            }
+        atomic_write_json(self.path, data)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._cells.clear()
+        if self.autosave:
+            self.save()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self) -> None:
+        """Load entries from disk, ignoring a missing, corrupt or outdated file."""
+        data = read_json(self.path, {})
+        if not isinstance(data, dict) or data.get("version") != CACHE_FORMAT_VERSION:
+            return
+        try:
+            for key, entry in data.get("entries", {}).items():
+                self._entries[key] = Gridpoint.from_dict(entry)
+            for cell, key in data.get("cells", {}).items():
+                if key in self._entries:
+                    self._cells[cell] = key
+        except (KeyError, TypeError, ValueError):
+            self._entries.clear()
+            self._cells.clear()
+
+    def _remove_entry(self, key: str) -> None:
+        """Remove one gridpoint and every index cell pointing at it. Caller holds the lock."""
+        self._entries.pop(key, None)
+        for cell in [cell for cell, cell_key in self._cells.items() if cell_key == key]:
+            del self._cells[cell]
+
+    def _evict(self) -> None:
+        """Drop the least recently used gridpoints beyond max_entries. Caller holds the lock."""
+        overflow = len(self._entries) - self.max_entries
+        if overflow <= 0:
+            return
+        oldest = sorted(self._entries.values(), key=lambda gridpoint: gridpoint.last_used)[:overflow]
+        stale_keys = {gridpoint.key for gridpoint in oldest}
+        for key in stale_keys:
+            del self._entries[key]
+        self._cells = {cell: key for cell, key in self._cells.items() if key not in stale_keys}
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_gridpoint_cache() -> GridpointCache:
+    """Return the application-wide gridpoint cache, loading it on first use."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = GridpointCache()
+        return _shared_cache
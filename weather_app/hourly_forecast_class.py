@@ -1,30 +1,6 @@
-from datetime import datetime
-
-# Helper function to convert temperature from Fahrenheit to Celsius
-def fahrenheit_to_celsius(f):
-    """
-    Convert a temperature from Fahrenheit to Celsius.
-
-    Args:
-        f (float): Temperature in Fahrenheit.
-
-    Returns:
-        float: Temperature in Celsius, rounded to preserve precision.
-    """
-    return (f - 32) * 5 / 9
-
-# Helper function to convert temperature from Celsius to Fahrenheit
-def celsius_to_fahrenheit(c):
-    """
-    Convert a temperature from Celsius to Fahrenheit.
-
-    Args:
-        c (float): Temperature in Celsius.
-
-    Returns:
-        float: Temperature in Fahrenheit, rounded to preserve precision.
-    """
-    return c * 9 / 5 + 32
+from functools import lru_cache
+from forecast_time import parse_timestamp, format_hour, format_date
+from units import convert_temperature, normalize_unit
 
 # Dictionary mapping weather icon codes to emojis for visual representation
 icon_to_emoji = {
@@ -45,12 +21,22 @@ icon_to_emoji = {
 
 # Class representing an hourly weather forecast
 class HourlyForecast:
+    # Fixed attribute layout instead of a per-instance __dict__; the underscored slots cache display strings
+    __slots__ = ('timestamp', 'temperature_f', 'temperature_c', 'dewpoint_f', 'dewpoint_c',
+                 'probability_of_precipitation', 'relative_humidity_value', 'wind_speed', 'wind_direction',
+                 'icon_url', 'short_forecast', 'weather_icon',
+                 '_forecast_hour', '_formatted_date', '_chance_of_rain', '_temperature_fahrenheit',
+                 '_dewpoint_fahrenheit', '_relative_humidity', '_wind')
+
     def __init__(self, timestamp, temperature_f, temperature_c, dewpoint_f, dewpoint_c, 
                  probability_of_precipitation, relative_humidity, wind_speed, wind_direction, 
                  icon_url, short_forecast, weather_icon):
         """
         Initialize an HourlyForecast object with weather data.
 
+        Display strings (forecast_hour, formatted_date, chance_of_rain, temperature_fahrenheit,
+        dewpoint_fahrenheit, relative_humidity, wind) are formatted the first time they are read.
+
         Args:
             timestamp (str): ISO format timestamp of the forecast (e.g., '2025-04-28T16:00:00-05:00').
             temperature_f (float): Temperature in Fahrenheit.
@@ -58,7 +44,7 @@ class HourlyForecast:
             dewpoint_f (float): Dewpoint temperature in Fahrenheit.
             dewpoint_c (float): Dewpoint temperature in Celsius.
             probability_of_precipitation (float): Chance of precipitation as a percentage.
-            relative_humidity (float): Relative humidity as a percentage.
+            relative_humidity (float): Relative humidity as a percentage (kept as relative_humidity_value).
             wind_speed (str): Wind speed (e.g., '10 mph').
             wind_direction (str): Wind direction (e.g., 'S' for South).
             icon_url (str): URL to the weather icon from the API.
@@ -71,24 +57,75 @@ class HourlyForecast:
         self.dewpoint_f = dewpoint_f
         self.dewpoint_c = dewpoint_c
         self.probability_of_precipitation = probability_of_precipitation
-        self.relative_humidity = relative_humidity
+        self.relative_humidity_value = relative_humidity
         self.wind_speed = wind_speed
         self.wind_direction = wind_direction
         self.icon_url = icon_url
         self.short_forecast = short_forecast
         self.weather_icon = weather_icon
 
-        # Format timestamp for display
-        dt = datetime.fromisoformat(timestamp)
-        self.forecast_hour = dt.strftime("%H:%M")  # e.g., '16:00'
-        self.formatted_date = dt.strftime("%Y-%m-%d")  # e.g., '2025-04-28'
+        self._forecast_hour = None
+        self._formatted_date = None
+        self._chance_of_rain = None
+        self._temperature_fahrenheit = None
+        self._dewpoint_fahrenheit = None
+        self._relative_humidity = None
+        self._wind = None
+
+    def _format_timestamp(self):
+        """Format the timestamp for display, filling both the hour and date caches."""
+        epoch, utc_offset = parse_timestamp(self.timestamp)
+        self._forecast_hour = format_hour(epoch, utc_offset)  # e.g., '16:00'
+        self._formatted_date = format_date(epoch, utc_offset)  # e.g., '2025-04-28'
 
-        # Format weather data for UI display
-        self.chance_of_rain = f"{probability_of_precipitation}%"
-        self.temperature_fahrenheit = f"{temperature_f:.0f} F"
-        self.dewpoint_fahrenheit = f"{dewpoint_f:.0f} F"
-        self.relative_humidity = f"{relative_humidity}%"
-        self.wind = f"{wind_speed} {wind_direction}".strip()
+    @property
+    def forecast_hour(self):
+        """Hour of the forecast for display (e.g., '16:00')."""
+        if self._forecast_hour is None:
+            self._format_timestamp()
+        return self._forecast_hour
+
+    @property
+    def formatted_date(self):
+        """Date of the forecast for display (e.g., '2025-04-28')."""
+        if self._formatted_date is None:
+            self._format_timestamp()
+        return self._formatted_date
+
+    @property
+    def chance_of_rain(self):
+        """Chance of precipitation for display (e.g., '20.0%')."""
+        if self._chance_of_rain is None:
+            self._chance_of_rain = f"{self.probability_of_precipitation}%"
+        return self._chance_of_rain
+
+    @property
+    def temperature_fahrenheit(self):
+        """Temperature for display (e.g., '81 F')."""
+        if self._temperature_fahrenheit is None:
+            self._temperature_fahrenheit = f"{self.temperature_f:.0f} F"
+        return self._temperature_fahrenheit
+
+    @property
+    def dewpoint_fahrenheit(self):
+        """Dewpoint for display (e.g., '60 F')."""
+        if self._dewpoint_fahrenheit is None:
+            self._dewpoint_fahrenheit = f"{self.dewpoint_f:.0f} F"
+        return self._dewpoint_fahrenheit
+
+    @property
+    def relative_humidity(self):
+        """Relative humidity for display (e.g., '49.0%')."""
+        if self._relative_humidity is None:
+            self._relative_humidity = f"{self.relative_humidity_value}%"
+        return self._relative_humidity
+
+    @property
+    def wind(self):
+        """Wind speed and direction for display (e.g., '10 mph S')."""
+        if self._wind is None:
+            self._wind = f"{self.wind_speed} {self.wind_direction}".strip()
+        return self._wind
 
     @classmethod
     def from_dict(cls, data, timestamp_key='timestamp'):
@@ -107,45 +144,145 @@ class HourlyForecast:
             KeyError: If required fields are missing.
             ValueError: If data cannot be converted or units are unrecognized.
         """
-        # Extract timestamp using the provided key
-        timestamp = data[timestamp_key]
-
-        # Extract and convert temperature
-        temperature_value = float(data['temperature'])
-        temperature_unit = data['temperature_unit'].strip()
-        if temperature_unit == 'F':
-            temperature_f = temperature_value
-            temperature_c = fahrenheit_to_celsius(temperature_value)
-        elif temperature_unit == 'C':
-            temperature_c = temperature_value
-            temperature_f = celsius_to_fahrenheit(temperature_value)
-        else:
-            raise ValueError(f"Unknown temperature unit: {temperature_unit}")
-
-        # Extract and convert dewpoint
-        dewpoint_value = float(data['dewpoint_value'])
-        dewpoint_unit = data['dewpoint_unit'].strip()
-        if dewpoint_unit == 'wmoUnit:degC':
-            dewpoint_c = dewpoint_value
-            dewpoint_f = celsius_to_fahrenheit(dewpoint_value)
-        elif dewpoint_unit == 'wmoUnit:degF':
-            dewpoint_f = dewpoint_value
-            dewpoint_c = fahrenheit_to_celsius(dewpoint_value)
-        else:
-            raise ValueError(f"Unknown dewpoint unit: {dewpoint_unit}")
-
-        # Extract other weather metrics
-        probability_of_precipitation = float(data['precipitation_probability_value'])
-        relative_humidity = float(data['relative_humidity_value'])
-        wind_speed = data['wind_speed']
-        wind_direction = data['wind_direction']
-        icon_url = data['weather_icon_url']
-        short_forecast = data['short_forecast']
-
-        # Map weather icon code to emoji
-        code = icon_url.split('/')[-1].split('?')[0].split(',')[0]
-        weather_icon = icon_to_emoji.get(code, '❓')  # Default to '?' if code is unknown
-
-        return cls(timestamp, temperature_f, temperature_c, dewpoint_f, dewpoint_c,
-                   probability_of_precipitation, relative_humidity, wind_speed, wind_direction,
-                   icon_url, short_forecast, weather_icon)
\ No newline at end of file
+        return cls(*parse_hourly_values(data, timestamp_key))
+
+
+# Function to parse and convert one row of hourly weather data
+def parse_hourly_values(data, timestamp_key='timestamp'):
+    """
+    Parse a dictionary of hourly weather data into the values HourlyForecast is built from.
+
+    Args:
+        data (dict): Dictionary containing weather data from CSV.
+        timestamp_key (str): Key for the timestamp field in the dictionary.
+
+    Returns:
+        tuple: (timestamp, temperature_f, temperature_c, dewpoint_f, dewpoint_c,
+                probability_of_precipitation, relative_humidity, wind_speed, wind_direction,
+                icon_url, short_forecast, weather_icon), in HourlyForecast argument order.
+
+    Raises:
+        KeyError: If required fields are missing.
+        ValueError: If data cannot be converted or units are unrecognized.
+    """
+    # Extract timestamp using the provided key and make sure it can be formatted later
+    timestamp = data[timestamp_key]
+    parse_timestamp(timestamp)
+
+    # Extract and convert temperature
+    temperature_value = float(data['temperature'])
+    temperature_unit = _temperature_unit(data['temperature_unit'], "temperature")
+    temperature_f = convert_temperature(temperature_value, temperature_unit, 'F')
+    temperature_c = convert_temperature(temperature_value, temperature_unit, 'C')
+
+    # Extract and convert dewpoint
+    dewpoint_value = float(data['dewpoint_value'])
+    dewpoint_unit = _temperature_unit(data['dewpoint_unit'], "dewpoint")
+    dewpoint_f = convert_temperature(dewpoint_value, dewpoint_unit, 'F')
+    dewpoint_c = convert_temperature(dewpoint_value, dewpoint_unit, 'C')
+
+    # Extract other weather metrics
+    probability_of_precipitation = float(data['precipitation_probability_value'])
+    relative_humidity = float(data['relative_humidity_value'])
+    wind_speed = data['wind_speed']
+    wind_direction = data['wind_direction']
+    icon_url = data['weather_icon_url']
+    short_forecast = data['short_forecast']
+
+    weather_icon = weather_icon_for(icon_url)
+
+    return (timestamp, temperature_f, temperature_c, dewpoint_f, dewpoint_c,
+            probability_of_precipitation, relative_humidity, wind_speed, wind_direction,
+            icon_url, short_forecast, weather_icon)
+
+
+# Class to parse rows of an hourly CSV file by column position
+class HourlyRowParser:
+    """
+    Parses positional CSV rows (lists of strings) into the values HourlyForecast is built from.
+
+    Column positions are looked up once from the header; unit codes and icon URLs are resolved
+    through the memoized _temperature_unit and weather_icon_for.
+    """
+
+    # Columns every row must provide, besides the timestamp column
+    REQUIRED_COLUMNS = ('temperature', 'temperature_unit', 'dewpoint_value', 'dewpoint_unit',
+                        'precipitation_probability_value', 'relative_humidity_value', 'wind_speed',
+                        'wind_direction', 'weather_icon_url', 'short_forecast')
+
+    def __init__(self, header, timestamp_key='start_time'):
+        """
+        Args:
+            header (list): Column names from the first line of the CSV file.
+            timestamp_key (str): Name of the timestamp column ('timestamp' or 'start_time').
+
+        Raises:
+            KeyError: If a required column is missing from the header.
+        """
+        positions = {name.strip(): index for index, name in enumerate(header)}
+        missing = [name for name in (timestamp_key,) + self.REQUIRED_COLUMNS if name not in positions]
+        if missing:
+            raise KeyError(f"Missing columns: {', '.join(missing)}")
+
+        self.timestamp_index = positions[timestamp_key]
+        (self.temperature_index, self.temperature_unit_index, self.dewpoint_index, self.dewpoint_unit_index,
+         self.precipitation_index, self.humidity_index, self.wind_speed_index, self.wind_direction_index,
+         self.icon_url_index, self.short_forecast_index) = [positions[name] for name in self.REQUIRED_COLUMNS]
+        self.width = max(positions.values()) + 1
+
+    def parse(self, row):
+        """
+        Parse one row.
+
+        Returns:
+            tuple: Same layout as parse_hourly_values.
+
+        Raises:
+            IndexError: If the row has fewer columns than the header.
+            ValueError: If data cannot be converted or units are unrecognized.
+        """
+        timestamp = row[self.timestamp_index]
+        parse_timestamp(timestamp)  # Validates the timestamp; the parse is cached for the series' epoch column
+
+        temperature_value = float(row[self.temperature_index])
+        temperature_unit = _temperature_unit(row[self.temperature_unit_index], "temperature")
+        dewpoint_value = float(row[self.dewpoint_index])
+        dewpoint_unit = _temperature_unit(row[self.dewpoint_unit_index], "dewpoint")
+        icon_url = row[self.icon_url_index]
+        weather_icon = weather_icon_for(icon_url)
+
+        return (timestamp,
+                convert_temperature(temperature_value, temperature_unit, 'F'),
+                convert_temperature(temperature_value, temperature_unit, 'C'),
+                convert_temperature(dewpoint_value, dewpoint_unit, 'F'),
+                convert_temperature(dewpoint_value, dewpoint_unit, 'C'),
+                float(row[self.precipitation_index]), float(row[self.humidity_index]),
+                row[self.wind_speed_index], row[self.wind_direction_index], icon_url,
+                row[self.short_forecast_index], weather_icon)
+
+
+# Function to map a weather icon URL to its emoji; a forecast uses only a handful of distinct icons
+@lru_cache(maxsize=1024)
+def weather_icon_for(icon_url):
+    """
+    Return the emoji for an icon URL such as 'https://api.weather.gov/icons/land/day/rain,40?size=medium',
+    or '❓' if its icon code is unknown.
+    """
+    code = icon_url.split('/')[-1].split('?')[0].split(',')[0]
+    return icon_to_emoji.get(code, '❓')
+
+
+# Helper function to normalize a temperature unit code ('F', 'wmoUnit:degC', ...) to 'F' or 'C'
+@lru_cache(maxsize=64)
+def _temperature_unit(code, field_name):
+    """
+    Raises:
+        ValueError: If the code is not a Fahrenheit or Celsius unit.
+    """
+    try:
+        unit = normalize_unit(code)
+    except ValueError:
+        unit = None
+    if unit not in ('F', 'C'):
+        raise ValueError(f"Unknown {field_name} unit: {code.strip()}")
+    return unit
@@ -1,5 +1,93 @@
 import csv
-from hourly_forecast_class import HourlyForecast
+from hourly_forecast_class import HourlyRowParser
+from hourly_forecast_series import HourlyForecastSeries
+from forecast_snapshot import Snapshot
+
+# Number of rows parsed into each chunk when streaming a CSV file
+DEFAULT_CHUNK_SIZE = 4096
+
+# Class to count and sample the rows skipped while loading
+class LoadStats:
+    def __init__(self, max_samples=5):
+        """
+        Initialize empty load statistics.
+
+        Args:
+            max_samples (int): Number of skipped rows whose errors are kept for diagnostics.
+        """
+        self.rows_read = 0
+        self.rows_skipped = 0
+        self.max_samples = max_samples
+        self.samples = []  # (line number, error message) for the first few skipped rows
+
+    def record_skip(self, line_number, error):
+        """Count a skipped row and keep its error if there is room for another sample."""
+        self.rows_skipped += 1
+        if len(self.samples) < self.max_samples:
+            self.samples.append((line_number, f"{type(error).__name__}: {error}"))
+
+    def __str__(self):
+        """
+        Returns:
+            str: One-line summary, e.g. 'Skipped 2 of 156 rows (line 4: ValueError: ...)'.
+        """
+        summary = f"Skipped {self.rows_skipped} of {self.rows_read} rows"
+        if self.samples:
+            summary += " (" + "; ".join(f"line {line}: {error}" for line, error in self.samples) + ")"
+        return summary
+
+
+# Function to stream an hourly forecast CSV file in chunks
+def stream_hourly_csv(file, chunk_size=DEFAULT_CHUNK_SIZE, stats=None):
+    """
+    Parse an open hourly forecast CSV file into HourlyForecastSeries chunks.
+
+    Rows are parsed positionally using column indexes resolved once from the header, and
+    only chunk_size rows are held at a time, so arbitrarily large archives can be processed.
+    Invalid rows are counted in stats instead of aborting the load.
+
+    Args:
+        file: An open text file positioned at the header line.
+        chunk_size (int): Maximum number of rows per yielded chunk.
+        stats (LoadStats): Receives row counts and samples of skipped rows.
+
+    Yields:
+        HourlyForecastSeries: Consecutive chunks of parsed rows.
+
+    Raises:
+        KeyError: If the header has no timestamp column or lacks required columns.
+    """
+    stats = stats if stats is not None else LoadStats()
+    reader = csv.reader(file)
+    header = next(reader, None)
+    if header is None:
+        return
+    # Determine the timestamp field name ('timestamp' or 'start_time')
+    timestamp_key = 'timestamp' if 'timestamp' in header else 'start_time'
+    parser = HourlyRowParser(header, timestamp_key)
+
+    chunk = HourlyForecastSeries()
+    parse = parser.parse
+    append = chunk.append_values
+    for row in reader:
+        if not row:
+            continue
+        stats.rows_read += 1
+        try:
+            (timestamp, temperature_f, _, dewpoint_f, _, probability_of_precipitation, relative_humidity,
+             wind_speed, wind_direction, icon_url, short_forecast, weather_icon) = parse(row)
+        except (IndexError, ValueError) as e:
+            stats.record_skip(reader.line_num, e)
+            continue
+        append(timestamp, temperature_f, dewpoint_f, probability_of_precipitation, relative_humidity,
+               wind_speed, wind_direction, icon_url, short_forecast, weather_icon)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = HourlyForecastSeries()
+            append = chunk.append_values
+    if len(chunk):
+        yield chunk
+
 
 # Class to manage hourly forecast data, including loading from CSV and storing forecasts
 class HourlyForecastManager:
@@ -13,51 +101,81 @@ class HourlyForecastManager:
         """
         self.csv_filename = csv_filename
         self.forecast_generated_time = forecast_generated_time
-        self.forecasts = []  # List to store HourlyForecast objects
+        self.forecasts = HourlyForecastSeries()  # Columnar storage; HourlyForecast objects are built on access
+        self.load_stats = LoadStats()  # Counts of rows read and skipped by the last load
 
-    def load_forecasts(self):
+    def load_forecasts(self, chunk_size=DEFAULT_CHUNK_SIZE):
         """
-        Load hourly forecast data from the CSV file into HourlyForecast objects.
+        Load hourly forecast data from the CSV file into the columnar forecast series.
 
-        This method reads the CSV file, validates its structure, and creates HourlyForecast objects
-        for each row. It adapts to different timestamp field names ('timestamp' or 'start_time'),
-        handles missing files, and skips invalid rows, logging errors to the console.
+        The file is streamed in chunks and parsed positionally. It adapts to different timestamp
+        field names ('timestamp' or 'start_time'), handles missing files, and skips invalid rows,
+        printing a single summary line when any were skipped.
 
         Returns:
             bool: True if forecasts were loaded successfully, False otherwise.
         """
+        self.load_stats = LoadStats()
         try:
-            with open(self.csv_filename, mode='r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                # Determine the timestamp field name ('timestamp' or 'start_time')
-                timestamp_key = 'timestamp' if 'timestamp' in reader.fieldnames else 'start_time'
-                if timestamp_key not in reader.fieldnames:
-                    print(f"Error: No valid timestamp field ('timestamp' or 'start_time') in {self.csv_filename}")
-                    return False
-
-                # Process each row in the CSV
-                for row in reader:
-                    try:
-                        # Create an HourlyForecast object using the dynamic timestamp key
-                        forecast = HourlyForecast.from_dict(row, timestamp_key)
-                        self.forecasts.append(forecast)
-                    except KeyError as e:
-                        print(f"Skipping invalid row due to missing key {e} in {row}")
-                    except ValueError as e:
-                        print(f"Skipping invalid row due to value error {e} in {row}")
+            with open(self.csv_filename, mode='r', encoding='utf-8', newline='') as file:
+                for chunk in stream_hourly_csv(file, chunk_size, self.load_stats):
+                    self.forecasts.extend(chunk)
+            self._report_skipped_rows()
             return True  # Successfully loaded forecasts
         except FileNotFoundError:
             print(f"Error: CSV file {self.csv_filename} not found.")
             return False  # Failed due to missing file
+        except KeyError as e:
+            print(f"Error: Invalid header in {self.csv_filename}: {e}")
+            return False  # Failed due to missing columns
         except Exception as e:
             print(f"Error loading hourly forecasts: {e}")
             return False  # Failed due to unexpected error
 
+    def load_snapshot(self, path):
+        """
+        Load the hourly forecast from a binary snapshot written by forecast_snapshot.write_hourly_snapshot.
+        The snapshot's columns are copied as a whole, without parsing any rows.
+
+        Returns:
+            bool: True if forecasts were loaded successfully, False otherwise.
+        """
+        try:
+            with Snapshot(path) as snapshot:
+                self.forecasts.extend(snapshot.to_hourly_series())
+            return True
+        except (OSError, ValueError) as e:
+            print(f"Error loading forecast snapshot {path}: {e}")
+            return False
+
+    def load_rows(self, rows, timestamp_key='start_time'):
+        """
+        Parse CSV-style row dictionaries into the forecast series, skipping invalid rows.
+
+        Args:
+            rows (iterable): Row dictionaries with the same keys as the CSV columns, either read
+                             from a file or built in memory by the forecast worker.
+            timestamp_key (str): Key holding the timestamp ('timestamp' or 'start_time').
+        """
+        for line_number, row in enumerate(rows, start=1):
+            self.load_stats.rows_read += 1
+            try:
+                # Append the row to the columns using the dynamic timestamp key
+                self.forecasts.append_dict(row, timestamp_key)
+            except (KeyError, ValueError) as e:
+                self.load_stats.record_skip(line_number, e)
+        self._report_skipped_rows()
+
     def get_forecasts(self):
         """
-        Retrieve the list of loaded hourly forecasts.
+        Retrieve the loaded hourly forecasts.
 
         Returns:
-            list: List of HourlyForecast objects.
+            HourlyForecastSeries: Sequence of HourlyForecast objects, created as they are accessed.
         """
-        return self.forecasts
\ No newline at end of file
+        return self.forecasts
+
+    def _report_skipped_rows(self):
+        """Print one summary line if any rows were skipped."""
+        if self.load_stats.rows_skipped:
+            print(f"{self.csv_filename or 'Hourly forecast'}: {self.load_stats}")
@@ -0,0 +1,185 @@
+import math
+from array import array
+from categorical import CategoricalColumn, shared_table
+from forecast_time import parse_timestamp, day_boundaries, format_day, format_hour, format_date
+from hourly_forecast_class import HourlyForecast, parse_hourly_values
+from units import fahrenheit_to_celsius, convert_temperatures, wind_speed_to
+
+# Text columns of a series; each is dictionary-encoded against a code table shared by every series
+CATEGORICAL_COLUMNS = ('wind_speeds', 'wind_directions', 'icon_urls', 'short_forecasts', 'weather_icons')
+
+# Column-oriented container for an hourly forecast series
+class HourlyForecastSeries:
+    """
+    Stores an hourly forecast series as columns instead of one object per hour.
+
+    Numeric fields live in compact array('d') columns (8 bytes per value instead of a float
+    object per attribute per row). The text fields take only a handful of distinct values, so
+    they are CategoricalColumns: one 32-bit code per row into a code table shared by every
+    series, in which each distinct string is stored once. HourlyForecast objects are
+    only created when a row is indexed or iterated, e.g. when the UI renders it, and are not
+    kept afterwards. The series supports len(), indexing and iteration, so it can be used
+    wherever a list of HourlyForecast objects was used before.
+
+    Timestamps are parsed once, when a row is appended, into an epoch column and a UTC offset
+    column; day grouping and hour/date labels are computed from those with integer arithmetic.
+    """
+
+    def __init__(self):
+        """Create an empty series."""
+        self.timestamps = []  # ISO format timestamps
+        self.epochs = array('q')  # POSIX seconds of each timestamp
+        self.utc_offsets = array('i')  # UTC offset of each timestamp in seconds
+        self.temperature_f = array('d')
+        self.dewpoint_f = array('d')
+        self.probability_of_precipitation = array('d')
+        self.relative_humidity = array('d')
+        for name in CATEGORICAL_COLUMNS:
+            setattr(self, name, CategoricalColumn(shared_table(name)))
+        # Layers of the gridded forecast aligned to the hours above (see attach_gridded)
+        self.grid_layers = {}  # layer name -> array('d')
+        self.grid_units = {}  # layer name -> unit code
+
+    def attach_gridded(self, gridded, layer_names=None):
+        """
+        Add layers of a GriddedForecast (e.g. skyCover, windGust, quantitativePrecipitation) as
+        extra columns, aligned to this series' hours. Hours the gridded forecast does not cover
+        are NaN.
+        """
+        for name, column in gridded.aligned_to(self.timestamps, layer_names).items():
+            self.grid_layers[name] = column
+            self.grid_units[name] = gridded.units.get(name, "")
+
+    def append_dict(self, data, timestamp_key='timestamp'):
+        """
+        Parse one row of hourly weather data and append it to the columns.
+
+        Raises:
+            KeyError: If required fields are missing.
+            ValueError: If data cannot be converted or units are unrecognized.
+        """
+        (timestamp, temperature_f, _, dewpoint_f, _, probability_of_precipitation, relative_humidity,
+         wind_speed, wind_direction, icon_url, short_forecast, weather_icon) = parse_hourly_values(data, timestamp_key)
+        self.append_values(timestamp, temperature_f, dewpoint_f, probability_of_precipitation, relative_humidity,
+                           wind_speed, wind_direction, icon_url, short_forecast, weather_icon)
+
+    def append_values(self, timestamp, temperature_f, dewpoint_f, probability_of_precipitation, relative_humidity,
+                      wind_speed, wind_direction, icon_url, short_forecast, weather_icon):
+        """
+        Append one already-parsed hour to the columns.
+
+        Raises:
+            ValueError: If the timestamp is malformed.
+        """
+        epoch, utc_offset = parse_timestamp(timestamp)
+        self.timestamps.append(timestamp)
+        self.epochs.append(epoch)
+        self.utc_offsets.append(utc_offset)
+        self.temperature_f.append(temperature_f)
+        self.dewpoint_f.append(dewpoint_f)
+        self.probability_of_precipitation.append(probability_of_precipitation)
+        self.relative_humidity.append(relative_humidity)
+        self.wind_speeds.append(wind_speed)
+        self.wind_directions.append(wind_direction)
+        self.icon_urls.append(icon_url)
+        self.short_forecasts.append(short_forecast)
+        self.weather_icons.append(weather_icon)
+        for column in self.grid_layers.values():
+            column.append(math.nan)
+
+    def extend(self, other):
+        """
+        Append all rows of another series, column by column. Gridded layers missing from either
+        series are NaN for its hours.
+        """
+        for name in other.grid_layers.keys() - self.grid_layers.keys():
+            self.grid_layers[name] = array('d', [math.nan]) * len(self)
+            self.grid_units[name] = other.grid_units.get(name, "")
+        for name, column in self.grid_layers.items():
+            column.extend(other.grid_layers.get(name) or array('d', [math.nan]) * len(other))
+        self.timestamps.extend(other.timestamps)
+        self.epochs.extend(other.epochs)
+        self.utc_offsets.extend(other.utc_offsets)
+        self.temperature_f.extend(other.temperature_f)
+        self.dewpoint_f.extend(other.dewpoint_f)
+        self.probability_of_precipitation.extend(other.probability_of_precipitation)
+        self.relative_humidity.extend(other.relative_humidity)
+        self.wind_speeds.extend(other.wind_speeds)
+        self.wind_directions.extend(other.wind_directions)
+        self.icon_urls.extend(other.icon_urls)
+        self.short_forecasts.extend(other.short_forecasts)
+        self.weather_icons.extend(other.weather_icons)
+
+    def temperature_c(self):
+        """Return all temperatures converted to Celsius in one pass."""
+        return convert_temperatures(self.temperature_f, 'F', 'C')
+
+    def dewpoint_c(self):
+        """Return all dewpoints converted to Celsius in one pass."""
+        return convert_temperatures(self.dewpoint_f, 'F', 'C')
+
+    def temperatures(self, unit='F'):
+        """Return all temperatures in the given unit ('F', 'C', 'K' or a WMO unit code)."""
+        return convert_temperatures(self.temperature_f, 'F', unit)
+
+    def dewpoints(self, unit='F'):
+        """Return all dewpoints in the given unit ('F', 'C', 'K' or a WMO unit code)."""
+        return convert_temperatures(self.dewpoint_f, 'F', unit)
+
+    def wind_speed_values(self, unit='km/h', statistic='high'):
+        """
+        Return all wind speeds as numbers in the given unit ('mph', 'km/h', 'm/s' or 'kt').
+        For ranges such as '10 to 15 mph', statistic selects 'low', 'high' or 'mean'.
+        """
+        # Convert each distinct string once, then index the results by code
+        column = self.wind_speeds
+        converted = {code: wind_speed_to(column.table.values[code], unit, statistic) for code in set(column.codes)}
+        return array('d', map(converted.__getitem__, column.codes))
+
+    def days(self):
+        """
+        Group the hours by local calendar day without building the forecast objects.
+
+        Returns:
+            list: (start, end, date) for every day, where start:end is the slice of its hours and
+                  date is its display date (e.g. '2025-04-28', as HourlyForecast.formatted_date).
+        """
+        return [(start, end, format_day(day)) for start, end, day in day_boundaries(self.epochs, self.utc_offsets)]
+
+    def dates(self):
+        """Return the display date of every hour (e.g. '2025-04-28')."""
+        return [format_date(epoch, offset) for epoch, offset in zip(self.epochs, self.utc_offsets)]
+
+    def hours(self):
+        """Return the display hour of every hour (e.g. '16:00')."""
+        return [format_hour(epoch, offset) for epoch, offset in zip(self.epochs, self.utc_offsets)]
+
+    def row(self, index):
+        """
+        Build the HourlyForecast object for one hour.
+
+        Args:
+            index (int): Row index (negative indexes count from the end).
+
+        Returns:
+            HourlyForecast: A new object; it is not cached by the series.
+        """
+        temperature_f = self.temperature_f[index]
+        dewpoint_f = self.dewpoint_f[index]
+        return HourlyForecast(self.timestamps[index], temperature_f, fahrenheit_to_celsius(temperature_f),
+                              dewpoint_f, fahrenheit_to_celsius(dewpoint_f),
+                              self.probability_of_precipitation[index], self.relative_humidity[index],
+                              self.wind_speeds[index], self.wind_directions[index], self.icon_urls[index],
+                              self.short_forecasts[index], self.weather_icons[index])
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.row(i) for i in range(*index.indices(len(self)))]
+        return self.row(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.row(index)
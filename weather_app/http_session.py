@@ -0,0 +1,149 @@
+import threading
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+"""
+A shared, pooled HTTP transport for the National Weather Service API.
+
+Every request goes through one keep-alive requests.Session, so repeated fetches reuse
+TLS connections instead of reconnecting. Responses that carry an ETag or Last-Modified
+header are remembered, and the next request for the same URL is sent as a conditional
+GET; a 304 reply is answered from the remembered payload without re-downloading it.
+"""
+
+# Headers sent with every request. api.weather.gov asks clients to identify themselves.
+DEFAULT_HEADERS = {
+    "User-Agent": "weather_app (course-project-weather-forecasting-application)",
+    "Accept": "application/geo+json",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+
+class JsonResponse:
+    """The decoded body of a JSON response plus the metadata callers need for caching."""
+
+    def __init__(self, url: str, data: dict, headers: dict, status_code: int, revalidated: bool) -> None:
+        """
+        Args:
+            url (str): The requested URL.
+            data (dict): Decoded JSON payload.
+            headers (dict): Response headers (merged with the cached ones on a 304).
+            status_code (int): HTTP status of the response actually received.
+            revalidated (bool): True if the server answered 304 and the cached payload was reused.
+        """
+        self.url = url
+        self.data = data
+        self.headers = headers
+        self.status_code = status_code
+        self.revalidated = revalidated
+
+
+class _CachedResponse:
+    """Validators and payload remembered for one URL."""
+
+    def __init__(self, etag: str, last_modified: str, data: dict, headers: dict) -> None:
+        self.etag = etag
+        self.last_modified = last_modified
+        self.data = data
+        self.headers = headers
+
+
+class ForecastHttpClient:
+    """A thread-safe HTTP client with connection pooling and conditional GET revalidation."""
+
+    def __init__(self, max_hosts: int = 10, max_connections_per_host: int = 4,
+                 max_cached_responses: int = 512) -> None:
+        """
+        Args:
+            max_hosts (int): Number of per-host connection pools kept alive.
+            max_connections_per_host (int): Upper bound on simultaneous connections to one host;
+                                            extra requests wait for a free connection.
+            max_cached_responses (int): Number of URLs whose validators and payloads are remembered.
+        """
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+
+        # pool_block makes the per-host limit a hard cap instead of opening throwaway connections
+        adapter = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=max_connections_per_host, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.max_cached_responses = max_cached_responses
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def fetch_json(self, url: str, timeout: float = 10) -> JsonResponse:
+        """
+        Fetch JSON data from a URL, revalidating a previously seen response when possible.
+
+        Raises:
+            requests.exceptions.RequestException: On connection errors, timeouts and HTTP error statuses.
+        """
+        with self._lock:
+            cached = self._cache.get(url)
+            if cached is not None:
+                self._cache.move_to_end(url)
+
+        # Ask the server to answer 304 if the resource has not changed
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        response = self.session.get(url, headers=headers, timeout=timeout)
+
+        if response.status_code == 304 and cached is not None:
+            # A 304 can carry fresh Expires/Cache-Control values, so they override the cached ones
+            merged_headers = dict(cached.headers)
+            merged_headers.update(response.headers)
+            cached.headers = merged_headers
+            return JsonResponse(url, cached.data, merged_headers, response.status_code, True)
+
+        response.raise_for_status()
+        data = response.json()
+        response_headers = dict(response.headers)
+
+        etag = response.headers.get("ETag", "")
+        last_modified = response.headers.get("Last-Modified", "")
+        if etag or last_modified:
+            self._remember(url, _CachedResponse(etag, last_modified, data, response_headers))
+
+        return JsonResponse(url, data, response_headers, response.status_code, False)
+
+    def get_json(self, url: str, timeout: float = 10) -> dict:
+        """Fetch a URL and return only its decoded JSON payload."""
+        return self.fetch_json(url, timeout).data
+
+    def clear_cache(self) -> None:
+        """Forget all remembered validators and payloads."""
+        with self._lock:
+            self._cache.clear()
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
+
+    def _remember(self, url: str, entry: _CachedResponse) -> None:
+        """Store a response for later revalidation, evicting the least recently used entries."""
+        with self._lock:
+            self._cache[url] = entry
+            self._cache.move_to_end(url)
+            while len(self._cache) > self.max_cached_responses:
+                self._cache.popitem(last=False)
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_http_client() -> ForecastHttpClient:
+    """Return the application-wide HTTP client, creating it on first use."""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = ForecastHttpClient()
+        return _shared_client
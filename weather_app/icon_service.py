@@ -0,0 +1,138 @@
+import hashlib
+import os
+from collections import OrderedDict
+from PyQt5.QtCore import QObject, pyqtSignal, QUrl, Qt, QBuffer, QByteArray, QIODevice
+from PyQt5.QtGui import QPixmap
+from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest
+from local_storage import get_cache_dir, atomic_write_bytes
+
+# Size (in pixels) at which forecast icons are displayed and cached
+ICON_SIZE = 100
+
+
+class IconService(QObject):
+    """
+    Application-wide loader for weather icon images.
+
+    Icons are looked up in an in-memory LRU cache, then in an on-disk cache that survives
+    restarts, and only then downloaded through a single QNetworkAccessManager. Concurrent
+    requests for the same URL share one download. Images are scaled to the display size
+    once, before they are cached.
+    """
+
+    # Emitted when an icon finishes loading: url (str), pixmap (QPixmap)
+    iconReady = pyqtSignal(str, QPixmap)
+
+    # Emitted when an icon could not be downloaded: url (str)
+    iconFailed = pyqtSignal(str)
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        """Return the shared IconService, creating it on first use."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, cache_dir=None, max_memory_icons=128, max_disk_icons=1000, size=ICON_SIZE, parent=None):
+        """
+        Args:
+            cache_dir (str): Directory for cached PNG files (defaults to 'icons' in the cache directory).
+            max_memory_icons (int): Number of pixmaps kept in memory.
+            max_disk_icons (int): Number of files kept on disk; the oldest are removed at startup.
+            size (int): Width and height the icons are scaled to.
+        """
+        super().__init__(parent)
+        self.cache_dir = cache_dir or get_cache_dir("icons")
+        self.max_memory_icons = max_memory_icons
+        self.size = size
+
+        self._pixmaps = OrderedDict()  # url -> scaled QPixmap, most recently used last
+        self._in_flight = {}  # url -> QNetworkReply
+
+        self.manager = QNetworkAccessManager(self)
+        self.manager.finished.connect(self._on_reply_finished)
+
+        self._prune_disk_cache(max_disk_icons)
+
+    def request_icon(self, url):
+        """
+        Get the icon for a URL.
+
+        Returns:
+            QPixmap: The icon if it is cached in memory or on disk. Otherwise None is returned, a
+                     download is started (or joined, if one is already running) and iconReady or
+                     iconFailed is emitted when it completes.
+        """
+        if not url:
+            return None
+
+        pixmap = self._pixmaps.get(url)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(url)
+            return pixmap
+
+        pixmap = QPixmap(self._disk_path(url))
+        if not pixmap.isNull():
+            self._remember(url, pixmap)
+            return pixmap
+
+        if url not in self._in_flight:
+            reply = self.manager.get(QNetworkRequest(QUrl(url)))
+            reply.setProperty("icon_url", url)
+            self._in_flight[url] = reply
+        return None
+
+    def _on_reply_finished(self, reply):
+        """Handles the completion of an icon download."""
+        url = reply.property("icon_url")
+        self._in_flight.pop(url, None)
+
+        pixmap = QPixmap()
+        if reply.error() or not pixmap.loadFromData(reply.readAll()):
+            reply.deleteLater()
+            self.iconFailed.emit(url)
+            return
+        reply.deleteLater()
+
+        # Scale once, then cache the scaled image in memory and on disk
+        pixmap = pixmap.scaled(self.size, self.size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        self._remember(url, pixmap)
+        self._save_to_disk(url, pixmap)
+        self.iconReady.emit(url, pixmap)
+
+    def _remember(self, url, pixmap):
+        """Add a pixmap to the memory cache, evicting the least recently used ones."""
+        self._pixmaps[url] = pixmap
+        self._pixmaps.move_to_end(url)
+        while len(self._pixmaps) > self.max_memory_icons:
+            self._pixmaps.popitem(last=False)
+
+    def _disk_path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".png")
+
+    def _save_to_disk(self, url, pixmap):
+        """Write the scaled icon as PNG; the disk cache is best effort."""
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.WriteOnly)
+        pixmap.save(buffer, "PNG")
+        buffer.close()
+        try:
+            atomic_write_bytes(self._disk_path(url), bytes(data))
+        except OSError:
+            pass
+
+    def _prune_disk_cache(self, max_disk_icons):
+        """Remove the least recently written icons beyond max_disk_icons."""
+        try:
+            paths = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                     if name.endswith(".png")]
+            if len(paths) <= max_disk_icons:
+                return
+            paths.sort(key=os.path.getmtime)
+            for path in paths[:len(paths) - max_disk_icons]:
+                os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,62 @@
+import os
+from local_storage import get_cache_dir, atomic_write_json, read_json
+
+"""
+Remembers the location whose forecast was last displayed, so the next start can show its
+stored forecast straight away.
+
+Only the address, coordinates and gridpoint key are saved. The location is read back as a
+SavedLocation rather than a geopy Location, so restoring it does not import geopy.
+"""
+
+LAST_LOCATION_FORMAT_VERSION = 1
+
+
+class SavedLocation:
+    """A location read back from the last-location file, with the attributes the UI and ForecastWorker use."""
+
+    def __init__(self, address: str, latitude: float, longitude: float, gridpoint_key: str) -> None:
+        """
+        Args:
+            address (str): The address shown in the heading.
+            latitude (float): Latitude of the location.
+            longitude (float): Longitude of the location.
+            gridpoint_key (str): Key of the location's gridpoint in the forecast store, e.g. 'OKX/33,35'.
+        """
+        self.address = address
+        self.latitude = latitude
+        self.longitude = longitude
+        self.gridpoint_key = gridpoint_key
+
+
+def last_location_path() -> str:
+    """Path of the file holding the last displayed location."""
+    return os.path.join(get_cache_dir(), "last_location.json")
+
+
+def save_last_location(location, gridpoint_key: str) -> None:
+    """
+    Remember a location (anything with address, latitude and longitude) and its gridpoint.
+
+    Raises:
+        OSError: If the file cannot be written.
+    """
+    atomic_write_json(last_location_path(), {
+        "version": LAST_LOCATION_FORMAT_VERSION,
+        "address": location.address,
+        "latitude": location.latitude,
+        "longitude": location.longitude,
+        "gridpoint": gridpoint_key,
+    })
+
+
+def load_last_location():
+    """Return the saved location as a SavedLocation, or None if there is none or the file is unreadable."""
+    data = read_json(last_location_path(), None)
+    if not isinstance(data, dict) or data.get("version") != LAST_LOCATION_FORMAT_VERSION:
+        return None
+    try:
+        return SavedLocation(str(data["address"]), float(data["latitude"]), float(data["longitude"]),
+                             str(data["gridpoint"]))
+    except (KeyError, TypeError, ValueError):
+        return None
@@ -0,0 +1,70 @@
+import json
+import os
+import tempfile
+
+"""
+Helpers for the application's on-disk caches.
+"""
+
+
+def get_cache_dir(*parts: str) -> str:
+    """
+    Return (and create) a directory under the application cache root.
+
+    The root is $WEATHER_APP_CACHE_DIR if set, otherwise $XDG_CACHE_HOME/weather_app
+    (falling back to ~/.cache/weather_app).
+
+    Args:
+        *parts (str): Optional sub-directory names below the cache root.
+
+    Returns:
+        str: Absolute path to the directory.
+    """
+    base = os.environ.get("WEATHER_APP_CACHE_DIR")
+    if not base:
+        xdg_cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        base = os.path.join(xdg_cache, "weather_app")
+    path = os.path.abspath(os.path.join(base, *parts))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def atomic_write_bytes(path: str, data: bytes) -> None:
+    """
+    Write a file so that readers only ever see the old or the new contents.
+
+    The data is written to a temporary file in the same directory, flushed to disk,
+    and then renamed over the destination.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, "wb") as temp_file:
+            temp_file.write(data)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_json(path: str, data) -> None:
+    """Serialize data as JSON and write it atomically."""
+    atomic_write_bytes(path, json.dumps(data, separators=(",", ":")).encode("utf-8"))
+
+
+def read_json(path: str, default=None):
+    """
+    Read a JSON file, returning default if it is missing or unreadable.
+    A corrupt cache file is treated like an empty one rather than an error.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return default
@@ -1,4 +1,5 @@
 import sys
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QApplication
 from ui import WeatherMainWindow
 
@@ -7,4 +8,7 @@ if __name__ == "__main__":
     window = WeatherMainWindow()
     window.setWindowTitle("Weather App")
     window.show()
+    # Paint the last displayed forecast from the local store as soon as the window is up;
+    # the network and geocoding modules are only loaded once a fetch or search starts
+    QTimer.singleShot(0, window.restore_last_location)
     sys.exit(app.exec_())
@@ -0,0 +1,80 @@
+import threading
+import time
+from urllib.parse import urlsplit
+
+"""
+Blocking rate limiters used to stay within the request limits of external services.
+"""
+
+
+class RateLimiter:
+    """
+    A thread-safe token bucket. Callers that exceed the rate are queued (they sleep
+    until a token is available) rather than rejected.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        """
+        Args:
+            rate (float): Sustained number of acquisitions allowed per second.
+            burst (int): Number of acquisitions that may happen back to back after an idle period.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Block until a request may be made.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class HostRateLimiter:
+    """Keeps a separate RateLimiter for every host a URL points at."""
+
+    def __init__(self, rate: float, burst: int = 1, overrides: dict = None) -> None:
+        """
+        Args:
+            rate (float): Default requests per second for each host.
+            burst (int): Default burst size for each host.
+            overrides (dict): Optional mapping of host name to (rate, burst) for hosts with different limits.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.overrides = overrides or {}
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def limiter_for(self, url: str) -> RateLimiter:
+        """Return the limiter responsible for the host of the given URL."""
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                rate, burst = self.overrides.get(host, (self.rate, self.burst))
+                limiter = RateLimiter(rate, burst)
+                self._limiters[host] = limiter
+            return limiter
+
+    def acquire(self, url: str) -> float:
+        """Block until a request to the URL's host may be made."""
+        return self.limiter_for(url).acquire()
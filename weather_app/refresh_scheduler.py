@@ -0,0 +1,237 @@
+import random
+import re
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+"""
+Decides when each displayed location's forecast should be fetched again.
+
+Instead of polling on a fixed interval, the next refresh is derived from the freshness
+the API advertises (Cache-Control max-age or Expires) and from the forecast's updateTime:
+NWS forecasts are regenerated roughly hourly, so re-fetching long before the next expected
+update would only return the same forecast. Refresh times are jittered and spaced apart
+so that many locations never refresh at the same moment.
+"""
+
+# How often NWS normally issues a new forecast for a gridpoint
+EXPECTED_UPDATE_INTERVAL = 60 * 60
+
+# Matches the max-age directive of a Cache-Control header
+_MAX_AGE_PATTERN = re.compile(r"(?:^|,)\s*max-age\s*=\s*\"?(\d+)\"?", re.IGNORECASE)
+
+
+def parse_http_date(value: str):
+    """
+    Parse an HTTP date such as 'Mon, 28 Apr 2025 21:15:00 GMT'.
+
+    Returns:
+        float: POSIX timestamp, or None if the value is missing or malformed.
+    """
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def parse_iso_time(value: str):
+    """
+    Parse an ISO 8601 time such as the forecast's updateTime ('2025-04-28T19:47:31+00:00').
+
+    Returns:
+        float: POSIX timestamp, or None if the value is missing, malformed or has no UTC offset.
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        return None
+    return parsed.timestamp()
+
+
+def freshness_lifetime(headers: dict, now: float = None):
+    """
+    Return how many more seconds a response may be considered fresh.
+
+    Cache-Control takes precedence over Expires, as in HTTP caching. The Date header is used
+    as the reference for Expires when present, so a skewed local clock does not matter.
+
+    Args:
+        headers (dict): Response headers (names are matched case-insensitively).
+        now (float): Current POSIX time (defaults to time.time()).
+
+    Returns:
+        float: Remaining freshness in seconds (0 if the response must be revalidated
+               immediately), or None if the headers say nothing about freshness.
+    """
+    now = time.time() if now is None else now
+    headers = {name.lower(): value for name, value in (headers or {}).items()}
+
+    cache_control = headers.get("cache-control", "")
+    if "no-cache" in cache_control.lower() or "no-store" in cache_control.lower():
+        return 0.0
+    match = _MAX_AGE_PATTERN.search(cache_control)
+    if match:
+        try:
+            age = max(0.0, float(headers.get("age", 0)))
+        except ValueError:
+            age = 0.0
+        return max(0.0, int(match.group(1)) - age)
+
+    expires = parse_http_date(headers.get("expires"))
+    if expires is None:
+        return None
+    date = parse_http_date(headers.get("date"))
+    return max(0.0, expires - (date if date is not None else now))
+
+
+def refresh_delay(headers: dict, update_time: str = None, now: float = None,
+                  min_interval: float = 300, max_interval: float = 2 * 60 * 60,
+                  default_interval: float = 15 * 60) -> float:
+    """
+    Return how long to wait before fetching one forecast product again.
+
+    The response stays fresh for the lifetime given by its headers. If the forecast's
+    updateTime shows that the next issuance is still further away, the refresh is pushed
+    back to then, since fetching earlier would return an unchanged forecast. Once that
+    expected update has passed, the header lifetime alone decides.
+
+    Args:
+        headers (dict): Response headers of the last fetch.
+        update_time (str): The forecast's properties.updateTime, if any.
+        now (float): Current POSIX time (defaults to time.time()).
+        min_interval (float): Lower bound on the delay, so a 'no-cache' response cannot cause a busy loop.
+        max_interval (float): Upper bound on the delay.
+        default_interval (float): Delay used when neither the headers nor updateTime give a hint.
+
+    Returns:
+        float: Seconds until the product should be fetched again.
+    """
+    now = time.time() if now is None else now
+    delay = freshness_lifetime(headers, now)
+
+    updated = parse_iso_time(update_time)
+    if updated is not None:
+        until_next_update = updated + EXPECTED_UPDATE_INTERVAL - now
+        if until_next_update > 0 and (delay is None or until_next_update > delay):
+            delay = until_next_update
+
+    if delay is None:
+        delay = default_interval
+    return min(max_interval, max(min_interval, delay))
+
+
+# Class tracking when each location is due for a refresh
+class RefreshScheduler:
+    """
+    Keeps one refresh time per location key. The caller reports each finished fetch with
+    the response headers and updateTime of its products, asks which locations are due and
+    how long to sleep until the next one. The scheduler itself never fetches anything.
+    """
+
+    def __init__(self, min_interval: float = 300, max_interval: float = 2 * 60 * 60,
+                 default_interval: float = 15 * 60, jitter: float = 0.1, min_spacing: float = 5.0,
+                 clock=time.time) -> None:
+        """
+        Args:
+            min_interval (float): Shortest time between refreshes of one location, in seconds.
+            max_interval (float): Longest time between refreshes of one location, in seconds.
+            default_interval (float): Refresh interval when the responses give no hint.
+            jitter (float): Each delay is lengthened by a random fraction of up to this much.
+            min_spacing (float): Minimum number of seconds between the refreshes of two locations.
+            clock (callable): Returns the current POSIX time.
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.default_interval = default_interval
+        self.jitter = jitter
+        self.min_spacing = min_spacing
+        self.clock = clock
+        self._due = {}  # location key -> POSIX time of its next refresh
+
+    def schedule(self, key, responses=(), now: float = None) -> float:
+        """
+        Schedule the next refresh of a location after a successful fetch.
+
+        Args:
+            key: Hashable location identifier.
+            responses (iterable): (headers, update_time) for each product fetched; the location is
+                                  refreshed when the first of them goes stale.
+            now (float): Current POSIX time (defaults to the scheduler's clock).
+
+        Returns:
+            float: POSIX time of the next refresh.
+        """
+        now = self.clock() if now is None else now
+        delays = [refresh_delay(headers, update_time, now, self.min_interval, self.max_interval,
+                                self.default_interval)
+                  for headers, update_time in responses]
+        delay = min(delays) if delays else self.default_interval
+        return self._set_due(key, now + delay * (1 + random.uniform(0, self.jitter)))
+
+    def schedule_retry(self, key, failures: int, now: float = None) -> float:
+        """
+        Schedule a location again after a failed fetch, backing off exponentially.
+
+        Args:
+            key: Hashable location identifier.
+            failures (int): Number of consecutive failed refreshes (1 for the first failure).
+            now (float): Current POSIX time (defaults to the scheduler's clock).
+
+        Returns:
+            float: POSIX time of the next attempt.
+        """
+        now = self.clock() if now is None else now
+        delay = min(self.max_interval, self.min_interval * (2 ** max(0, failures - 1)))
+        return self._set_due(key, now + delay * (1 + random.uniform(0, self.jitter)))
+
+    def remove(self, key) -> None:
+        """Stop refreshing a location."""
+        self._due.pop(key, None)
+
+    def clear(self) -> None:
+        """Stop refreshing all locations."""
+        self._due.clear()
+
+    def due(self, now: float = None) -> list:
+        """
+        Return the keys of the locations whose refresh time has come, earliest first. They are
+        removed from the schedule until they are scheduled again after their fetch completes.
+        """
+        now = self.clock() if now is None else now
+        keys = sorted(((when, key) for key, when in self._due.items() if when <= now), key=lambda item: item[0])
+        for _, key in keys:
+            del self._due[key]
+        return [key for _, key in keys]
+
+    def seconds_until_next(self, now: float = None):
+        """
+        Returns:
+            float: Seconds until the earliest scheduled refresh (0 if one is overdue),
+                   or None if nothing is scheduled.
+        """
+        if not self._due:
+            return None
+        now = self.clock() if now is None else now
+        return max(0.0, min(self._due.values()) - now)
+
+    def __contains__(self, key) -> bool:
+        return key in self._due
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def _set_due(self, key, when: float) -> float:
+        """Record a refresh time, moving it later until it is min_spacing away from every other one."""
+        self._due.pop(key, None)
+        others = sorted(self._due.values())
+        for other in others:
+            if abs(other - when) < self.min_spacing:
+                when = other + self.min_spacing
+        self._due[key] = when
+        return when
@@ -1,13 +1,68 @@
-import os
-from PyQt5.QtCore import Qt, pyqtSignal, QUrl
-from PyQt5.QtGui import QFont, QPixmap
-from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest
+import time
+from functools import lru_cache
+from PyQt5.QtCore import Qt, QTimer, QStringListModel, pyqtSignal
+from PyQt5.QtGui import QFont
 from PyQt5.QtWidgets import QFrame, QSizePolicy, QLabel, QHBoxLayout, QWidget, QVBoxLayout, QScrollArea, QTextEdit, \
-    QPushButton, QTabWidget, QLineEdit, QMessageBox
-from daily_forecast_manager_class import DailyForecastManager
-from hourly_forecast_manager_class import HourlyForecastManager
-from forecast_worker import ForecastWorker
-from geolocator import GeolocatorService
+    QPushButton, QTabWidget, QLineEdit, QMessageBox, QCompleter
+from forecast_diff import diff_keyed, unique_keys, daily_key, daily_signature, hourly_signatures
+from gridpoint_cache import get_gridpoint_cache
+from last_location import load_last_location, save_last_location
+from refresh_scheduler import RefreshScheduler, parse_iso_time
+
+# The network, geocoding and forecast parsing modules (requests, geopy, QtNetwork) are imported
+# where they are first used rather than here, so the window can be shown before they are loaded.
+
+# Number of hourly forecast entries populated at a time; further batches are populated on scroll
+HOURLY_ROW_BATCH = 48
+
+# Style for hourly forecast rows, set once on the container rather than on each row
+HOURLY_ROW_STYLESHEET = """
+    HourlyForecastRow {
+        background-color: white;
+        border-radius: 4px;
+    }
+    HourlyForecastRow QLabel {
+        padding: 4px;
+    }
+"""
+
+
+@lru_cache(maxsize=None)
+def shared_font(pixel_size, family=None):
+    """Return a QFont shared by every widget that uses this size and family."""
+    font = QFont(family) if family else QFont()
+    font.setPixelSize(pixel_size)
+    return font
+
+
+def describe_age(seconds):
+    """Describe the age of a forecast in words, e.g. '2 h 5 min old'."""
+    minutes = int(seconds // 60)
+    if minutes < 1:
+        return "less than a minute old"
+    if minutes < 60:
+        return f"{minutes} min old"
+    if minutes < 48 * 60:
+        return f"{minutes // 60} h {minutes % 60} min old"
+    return f"{minutes // (24 * 60)} days old"
+
+
+def generated_at_text(product, generated_time, cached=False):
+    """
+    Text of a forecast tab's 'generated at' label. A forecast shown from the local store
+    while a fresh one is fetched also shows how old it is.
+    """
+    text = f"{product} forecast generated at {generated_time}"
+    generated = parse_iso_time(generated_time) if cached else None
+    if generated is not None:
+        text += f" (cached, {describe_age(max(0.0, time.time() - generated))})"
+    return text
+
+
+def set_text_if_changed(text_edit, text):
+    """Set a text area's text only if it differs, so unchanged text is not laid out again."""
+    if text_edit.toPlainText() != text:
+        text_edit.setPlainText(text)
 
 
 class CurrentWeatherWidget(QFrame):
@@ -100,42 +155,76 @@ class DailyForecastTab(QWidget):
         self.daily_layout.addWidget(self.detailed_forecast_label)
         self.daily_layout.addWidget(self.daily_generated_time)
 
-    def update_data(self, daily_forecast_generated_time, daily_forecasts):
-        """
-        Loads and updates the daily forecast data.
-        This will update the scroll area with new forecast cards and show the detailed forecast for the first item.
-        """
-        # Clear existing forecast cards in the scroll area
-        self._clear_forecast_cards()
+        # Cards currently displayed, with the key and signature of the period each one shows
+        self._cards = []
+        self._keys = []
+        self._signatures = []
 
-        # Add new forecast cards to the scroll layout
-        for forecast in daily_forecasts:
-            card = DailyForecastCard()
-            card.update_data(forecast)
-            # Connect signal to show detailed forecast
-            card.showMoreClicked.connect(self.update_detailed_forecast_label)
-            card.setFixedWidth(150)
-            self.scroll_layout.addWidget(card)
+    def update_data(self, daily_forecast_generated_time, daily_forecasts, cached=False, new_location=False):
+        """
+        Loads and updates the daily forecast data. cached marks a forecast shown from the local
+        store, whose age is then shown next to its generated time. new_location scrolls the cards
+        back to the first period.
 
-        self.scroll_layout.addStretch()  # Stretch the layout to fill remaining space
+        Cards are matched to the new periods by key (see forecast_diff), so on a refresh only the
+        cards whose period changed are repopulated, and the layout is only rebuilt when periods
+        were added, removed or reordered. The detailed forecast shows the first period.
+        """
+        keys = unique_keys([daily_key(forecast) for forecast in daily_forecasts])
+        signatures = [daily_signature(forecast) for forecast in daily_forecasts]
+        diff = diff_keyed(self._keys, self._signatures, keys, signatures)
+
+        if not diff.same_layout:
+            # Reuse the cards of periods that are still present, in the new order
+            cards_by_key = dict(zip(self._keys, self._cards))
+            self._detach_forecast_cards()
+            self._cards = [cards_by_key.pop(key, None) or self._new_card() for key in keys]
+            for card in cards_by_key.values():
+                card.deleteLater()
+            for card in self._cards:
+                self.scroll_layout.addWidget(card)
+            self.scroll_layout.addStretch()  # Stretch the layout to fill remaining space
+
+        for index in diff.stale:
+            self._cards[index].update_data(daily_forecasts[index])
+        self._keys = keys
+        self._signatures = signatures
+        if new_location:
+            self.scroll_area.horizontalScrollBar().setValue(0)
 
         # Display the detailed forecast of the first forecast card
-        self.update_detailed_forecast_label(daily_forecasts[0].period_name, daily_forecasts[0].detailed_forecast)
+        if daily_forecasts:
+            self.update_detailed_forecast_label(daily_forecasts[0].period_name, daily_forecasts[0].detailed_forecast)
 
         # Update the generated time label
-        self.daily_generated_time.setPlainText(f"Daily forecast generated at {daily_forecast_generated_time}")
+        set_text_if_changed(self.daily_generated_time, generated_at_text("Daily", daily_forecast_generated_time, cached))
+
+    def _new_card(self):
+        """Creates a forecast card connected to the detailed forecast display."""
+        card = DailyForecastCard()
+        # Connect signal to show detailed forecast
+        card.showMoreClicked.connect(self.update_detailed_forecast_label)
+        card.setFixedWidth(150)
+        return card
+
+    def _detach_forecast_cards(self):
+        """Removes the cards and the stretch from the scroll layout without deleting the cards."""
+        while self.scroll_layout.count():
+            self.scroll_layout.takeAt(0)
 
     def _clear_forecast_cards(self):
         """Clears all the forecast cards currently in the scroll layout."""
-        while self.scroll_layout.count():
-            child = self.scroll_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
+        self._detach_forecast_cards()
+        for card in self._cards:
+            card.deleteLater()
+        self._cards = []
+        self._keys = []
+        self._signatures = []
 
     def update_detailed_forecast_label(self, period_name, detailed_forecast):
         """Updates the detailed forecast text area with the provided period name and detailed forecast."""
         text = f"{period_name}: {detailed_forecast}"
-        self.detailed_forecast_label.setPlainText(text)
+        set_text_if_changed(self.detailed_forecast_label, text)
 
     def clear_data(self):
         """Clears the forecast cards, detailed forecast, and generated time."""
@@ -196,38 +285,42 @@ class DailyForecastCard(QFrame):
 
         self.setLayout(self.layout)
 
-        # Set up the network manager for fetching weather icon images
-        self.manager = QNetworkAccessManager(self)
-        self.manager.finished.connect(self.on_image_loaded)
+        # Weather icon images come from the shared, cached icon service
+        from icon_service import IconService
+        self.icon_service = IconService.instance()
+        self.icon_service.iconReady.connect(self.on_icon_ready)
+        self.icon_service.iconFailed.connect(self.on_icon_failed)
 
-        # Initialize period_name and detailed_forecast to None (to prevent crashes before it's set)
+        # Initialize period_name, detailed_forecast and icon_url to None (to prevent crashes before it's set)
         self.period_name = None
         self.detailed_forecast = None
+        self.icon_url = None
 
     def update_data(self, forecast):
         """Populate the card with forecast data and trigger the image fetch."""
         self.period_label.setText(forecast.period_name)
         self.temp_label.setText(forecast.temperature_fahrenheit)
         self.rain_label.setText(forecast.chance_of_rain)
-        self.icon_label.setText(f"Icon: {forecast.icon_url}")
         self.period_name = forecast.period_name
         self.detailed_forecast = forecast.detailed_forecast
+        self.icon_url = forecast.icon_url
 
-        # Request the weather icon image using the URL from forecast data
-        request = QNetworkRequest(QUrl(forecast.icon_url))
-        self.manager.get(request)
-
-    def on_image_loaded(self, reply):
-        """Handles the completion of the image fetch and sets it on the icon label."""
-        if reply.error():
-            self.icon_label.setText("Failed to load image")
+        # Show the cached icon right away, or a placeholder until the icon service delivers it
+        pixmap = self.icon_service.request_icon(forecast.icon_url)
+        if pixmap is not None:
+            self.icon_label.setPixmap(pixmap)
         else:
-            data = reply.readAll()
-            pixmap = QPixmap()
-            pixmap.loadFromData(data)
-            self.icon_label.setPixmap(pixmap.scaled(100, 100, Qt.KeepAspectRatio))
+            self.icon_label.setText(f"Icon: {forecast.icon_url}")
 
-        reply.deleteLater()
+    def on_icon_ready(self, url, pixmap):
+        """Sets the icon once the icon service has loaded it, if it belongs to this card."""
+        if url == self.icon_url:
+            self.icon_label.setPixmap(pixmap)
+
+    def on_icon_failed(self, url):
+        """Shows an error if this card's icon could not be loaded."""
+        if url == self.icon_url:
+            self.icon_label.setText("Failed to load image")
 
     def on_show_more_clicked(self):
         """Emits a signal with period name and detailed forecast when the button is clicked."""
@@ -272,10 +365,14 @@ class ForecastTabsWidget(QTabWidget):
         self.addTab(self.daily_tab, "Daily")
         self.addTab(self.hourly_tab, "Hourly")
 
-    def update_data(self, daily_generated_time, hourly_generated_time, daily_forecasts, hourly_forecasts):
-        """Updates both the Daily and Hourly forecast tabs with new forecast data."""
-        self.daily_tab.update_data(daily_generated_time, daily_forecasts)
-        self.hourly_tab.update_data(hourly_generated_time, hourly_forecasts)
+    def update_data(self, daily_generated_time, hourly_generated_time, daily_forecasts, hourly_forecasts,
+                    cached=False, new_location=False):
+        """
+        Updates both the Daily and Hourly forecast tabs with new forecast data. new_location
+        scrolls both tabs back to the start.
+        """
+        self.daily_tab.update_data(daily_generated_time, daily_forecasts, cached, new_location)
+        self.hourly_tab.update_data(hourly_generated_time, hourly_forecasts, cached, new_location)
 
     def clear_data(self):
         """Clears all forecast data from both tabs."""
@@ -284,7 +381,13 @@ class ForecastTabsWidget(QTabWidget):
 
 
 class HourlyForecastTab(QWidget):
-    """A widget to display hourly forecast information."""
+    """
+    A widget to display hourly forecast information.
+
+    Row and date header widgets are reused across updates instead of being deleted and rebuilt,
+    and only the first HOURLY_ROW_BATCH entries are populated up front; further rows are
+    populated as the list is scrolled towards its end.
+    """
 
     def __init__(self, parent=None):
         """Initializes the UI components and layout for displaying hourly forecasts."""
@@ -301,6 +404,7 @@ class HourlyForecastTab(QWidget):
 
         # Create a container widget for the scroll area with a vertical layout
         self.scroll_content = QWidget()
+        self.scroll_content.setStyleSheet(HOURLY_ROW_STYLESHEET)  # Applied once, inherited by every row
         self.scroll_layout = QVBoxLayout(self.scroll_content)
         self.scroll_layout.setContentsMargins(5, 5, 5, 5)
         self.scroll_layout.setSpacing(5)
@@ -309,6 +413,11 @@ class HourlyForecastTab(QWidget):
         # Set the scroll content widget to the scroll area
         self.scroll_area.setWidget(self.scroll_content)
 
+        # Populate more rows when the list is scrolled near its end or does not fill the viewport
+        scroll_bar = self.scroll_area.verticalScrollBar()
+        scroll_bar.valueChanged.connect(self._on_scrolled)
+        scroll_bar.rangeChanged.connect(self._on_scroll_range_changed)
+
         # Create and configure the bottom section (text area for generated time)
         self.hourly_generated_time = QTextEdit()
         self.hourly_generated_time.setReadOnly(True)
@@ -319,49 +428,149 @@ class HourlyForecastTab(QWidget):
         self.hourly_layout.addWidget(self.scroll_area)
         self.hourly_layout.addWidget(self.hourly_generated_time)
 
-    def update_data(self, hourly_forecast_generated_time, hourly_forecasts):
-        # Clear existing rows in the scroll area
-        self._clear_forecast_rows()
-
-        forecast_date = ""
-
-        # Add new forecast row to the scroll layout
-        for forecast in hourly_forecasts:
-            row = HourlyForecastRow()
-            row.update_data(forecast)
+        # Row widgets in use, keyed by the start time of the hour they show, and spare ones
+        self._active_rows = {}
+        self._free_rows = []
+        self._reusable_rows = {}  # Rows kept from the previous forecast while a new one is laid out
+        self._header_pool = []
+        self._headers_used = 0
+
+        # The forecast being displayed
+        self._forecasts = None
+        self._keys = []
+        self._signatures = []
+        self._stale = set()  # Indexes of hours whose kept rows still show outdated values
+        self._entries = []  # (True, date) for a date header, (False, index) for an hourly row
+        self._materialized = 0  # Number of entries currently populated in the layout
+
+    def update_data(self, hourly_forecast_generated_time, hourly_forecasts, cached=False, new_location=False):
+        """
+        Shows a new hourly forecast. cached marks a forecast shown from the local store, and
+        new_location scrolls the list back to the first hour.
 
-            if forecast.formatted_date != forecast_date:
-                forecast_date = forecast.formatted_date
-                header_row = HourlyForecastHeaderRow()
-                header_row.update_data(forecast_date)
-                self.scroll_layout.addWidget(header_row)
-            # Connect signal to show extra details
-            # row.showMoreClicked.connect(self.update_detailed_forecast_label)
-            self.scroll_layout.addWidget(row)
+        Hours are matched to the displayed rows by start time (see forecast_diff). If the hours are
+        the same as before, only the rows whose values changed are repopulated and the layout is
+        left alone; otherwise the layout is rebuilt, reusing the rows of hours that are still present.
+        """
+        keys = unique_keys(hourly_forecasts.timestamps)
+        signatures = hourly_signatures(hourly_forecasts)
+        diff = diff_keyed(self._keys, self._signatures, keys, signatures)
+        self._forecasts = hourly_forecasts
+        self._keys = keys
+        self._signatures = signatures
+
+        if diff.same_layout:
+            for index in diff.changed:
+                row = self._active_rows.get(keys[index])
+                if row is not None:
+                    row.update_data(hourly_forecasts[index])
+        else:
+            self._rebuild(diff, hourly_forecasts.days())
+        if new_location:
+            self.scroll_area.verticalScrollBar().setValue(0)
 
         # Update the generated time label
-        self.hourly_generated_time.setPlainText(f"Hourly forecast generated at {hourly_forecast_generated_time}")
+        set_text_if_changed(self.hourly_generated_time,
+                            generated_at_text("Hourly", hourly_forecast_generated_time, cached))
 
     def clear_data(self):
-        self._clear_forecast_rows()
+        self._detach_widgets()
+        for row in self._active_rows.values():
+            self._free_rows.append(row)
+        self._active_rows = {}
+        self._forecasts = None
+        self._keys = []
+        self._signatures = []
+        self._entries = []
         self.hourly_generated_time.setPlainText("")
 
-    def _clear_forecast_rows(self):
-        """Clears all the rows currently in the scroll layout."""
+    def _rebuild(self, diff, days):
+        """
+        Lays out the entries of a forecast whose hours differ from the displayed ones.
+        days are the series' (start, end, date) day groups, which give where the date headers go.
+        """
+        count = max(HOURLY_ROW_BATCH, self._materialized)
+        self._detach_widgets()
+
+        self._entries = []
+        for start, end, date in days:
+            self._entries.append((True, date))
+            self._entries.extend((False, index) for index in range(start, end))
+
+        # Keep the rows of hours that are populated right away; the others become spare rows
+        keep = {self._keys[value] for is_header, value in self._entries[:count] if not is_header}
+        for key, row in self._active_rows.items():
+            if key in keep:
+                self._reusable_rows[key] = row
+            else:
+                self._free_rows.append(row)
+        self._active_rows = {}
+        self._stale = set(diff.stale)
+
+        self._materialize(count)
+        self._reusable_rows = {}
+        self._stale = set()
+
+    def _materialize(self, count):
+        """Populates the next count entries, reusing kept or spare widgets."""
+        end = min(len(self._entries), self._materialized + count)
+        for is_header, value in self._entries[self._materialized:end]:
+            if is_header:
+                widget = self._next_header()
+                widget.update_data(value)
+            else:
+                key = self._keys[value]
+                widget = self._reusable_rows.pop(key, None)
+                if widget is None:
+                    widget = self._next_row()
+                    widget.update_data(self._forecasts[value])
+                elif value in self._stale:
+                    widget.update_data(self._forecasts[value])
+                self._active_rows[key] = widget
+            self.scroll_layout.addWidget(widget)
+            widget.show()
+        self._materialized = end
+
+    def _next_row(self):
+        """Returns a spare row widget, creating one only when there is none."""
+        row = self._free_rows.pop() if self._free_rows else HourlyForecastRow(self.scroll_content)
+        row.set_expanded(False)
+        return row
+
+    def _next_header(self):
+        """Returns the next unused date header widget, creating one only when the pool is exhausted."""
+        if self._headers_used == len(self._header_pool):
+            self._header_pool.append(HourlyForecastHeaderRow(self.scroll_content))
+        header = self._header_pool[self._headers_used]
+        self._headers_used += 1
+        return header
+
+    def _detach_widgets(self):
+        """Removes all rows from the layout and hides them, keeping them for reuse."""
         while self.scroll_layout.count():
             child = self.scroll_layout.takeAt(0)
             if child.widget():
-                child.widget().deleteLater()
+                child.widget().hide()
+        self._materialized = 0
+        self._headers_used = 0
+
+    def _on_scrolled(self, value):
+        """Populates another batch when the list is scrolled close to its end."""
+        scroll_bar = self.scroll_area.verticalScrollBar()
+        if self._materialized < len(self._entries) and value >= scroll_bar.maximum() - scroll_bar.pageStep():
+            self._materialize(HOURLY_ROW_BATCH)
+
+    def _on_scroll_range_changed(self, minimum, maximum):
+        """Keeps populating rows while the populated ones do not fill the viewport."""
+        if self._materialized < len(self._entries) and maximum == 0:
+            self._materialize(HOURLY_ROW_BATCH)
 
 
 class HourlyForecastHeaderRow(QLabel):
     def __init__(self, parent=None):
         super().__init__(parent)
 
-        heading_font = QFont()
-        heading_font.setPixelSize(20)
-
-        self.setFont(heading_font)
+        self.setFont(shared_font(20))
         self.setText("")
         self.setContentsMargins(5, 5, 5, 5)
 
@@ -370,27 +579,14 @@ class HourlyForecastHeaderRow(QLabel):
 
 
 class HourlyForecastRow(QFrame):
-    """A row widget to display hourly forecast data."""
+    """A row widget to display hourly forecast data (styled by HOURLY_ROW_STYLESHEET on its container)."""
 
     def __init__(self, parent=None):
         super().__init__(parent)
 
         # Initialize the UI components and set up the layout
-        self.setStyleSheet("""
-            HourlyForecastRow {
-                background-color: white;
-                border-radius: 4px;
-            }
-            QLabel {
-                padding: 4px;
-            }
-        """)
-
-        self.uniform_font = QFont()
-        self.uniform_font.setPixelSize(20)
-
-        self.icon_font = QFont('Segoe UI Emoji')
-        self.icon_font.setPixelSize(20)
+        self.uniform_font = shared_font(20)
+        self.icon_font = shared_font(20, 'Segoe UI Emoji')
 
         self.is_expanded = False
 
@@ -455,9 +651,15 @@ class HourlyForecastRow(QFrame):
 
     def toggle_details(self):
         """Toggle the visibility of the details section."""
-        self.is_expanded = not self.is_expanded
-        self.details_widget.setVisible(self.is_expanded)
-        self.show_more_button.setText("-" if self.is_expanded else "+")
+        self.set_expanded(not self.is_expanded)
+
+    def set_expanded(self, expanded):
+        """Show or hide the details section."""
+        if expanded == self.is_expanded:
+            return
+        self.is_expanded = expanded
+        self.details_widget.setVisible(expanded)
+        self.show_more_button.setText("-" if expanded else "+")
 
     def update_data(self, forecast):
         """Populate the row with forecast data"""
@@ -478,7 +680,8 @@ class LocationSearchWidget(QWidget):
     def __init__(self, parent=None):
         """Set up the UI components."""
         super().__init__(parent)
-        self.geo_service = GeolocatorService()
+        self._geo_service = None
+        self.geocode_worker = None
 
         # Configure Font
         font = QFont()
@@ -492,6 +695,14 @@ class LocationSearchWidget(QWidget):
         self.search_bar.setStyleSheet("padding-left: 5px; padding-right: 5px")
         self.search_bar.returnPressed.connect(self.search_location)
 
+        # Suggest place names from the offline gazetteer while typing
+        self.suggestions = QStringListModel(self)
+        self.completer = QCompleter(self.suggestions, self)
+        self.completer.setCaseSensitivity(Qt.CaseInsensitive)
+        self.completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.search_bar.setCompleter(self.completer)
+        self.search_bar.textEdited.connect(self.update_suggestions)
+
         # Create and Configure Search Button
         self.search_button = QPushButton("Search", self)
         self.search_button.setFont(font)
@@ -506,37 +717,61 @@ class LocationSearchWidget(QWidget):
 
         self.setLayout(layout)
 
+    @property
+    def geo_service(self):
+        """The geolocation service, created on first use so geopy is not loaded at startup."""
+        if self._geo_service is None:
+            from geolocator import GeolocatorService
+            self._geo_service = GeolocatorService()
+        return self._geo_service
+
+    def update_suggestions(self, text):
+        """Refreshes the completion list for the text typed so far."""
+        text = text.strip()
+        self.suggestions.setStringList(self.geo_service.suggest(text) if len(text) >= 2 else [])
+
     def search_location(self):
-        """Handles location search and emits a signal if confirmed."""
+        """Handles location search; the lookup runs in a background thread unless it is cached."""
         location_text = self.search_bar.text().strip()
         if not location_text:
             QMessageBox.warning(self, "Input Error", "Please enter a location.")
             return
+        if self.geocode_worker is not None and self.geocode_worker.isRunning():
+            return  # A search is already in progress
 
-        location = self.geo_service.get_location(location_text)
+        hit, location = self.geo_service.get_cached_location(location_text)
+        if hit:
+            self.handle_geocode_result(location_text, location)
+            return
+
+        from geocode_worker import GeocodeWorker
+        self._set_searching(True)
+        self.geocode_worker = GeocodeWorker(location_text, self.geo_service)
+        self.geocode_worker.geocode_finished.connect(self.handle_geocode_result)
+        self.geocode_worker.start()
+
+    def handle_geocode_result(self, query, location):
+        """Asks the user to confirm the found location and emits a signal if confirmed."""
+        self._set_searching(False)
         if location:
             if self._confirm_location(location.address):
-                self._clear_previous_forecast()
                 self.locationConfirmed.emit(location)
                 self.search_bar.clear()
         else:
             QMessageBox.warning(self, "Location Not Found",
                                 "Could not find the location. Please try a different query.")
 
+    def _set_searching(self, searching):
+        """Disables the search controls while a lookup is running."""
+        self.search_bar.setEnabled(not searching)
+        self.search_button.setEnabled(not searching)
+        self.search_button.setText("..." if searching else "Search")
+
     def _confirm_location(self, address):
         """Prompt the user to confirm the found location."""
         return QMessageBox.question(self, "Confirm Location", f"Is this the correct location?\n\n{address}",
                                     QMessageBox.Yes | QMessageBox.No) == QMessageBox.Yes
 
-    def _clear_previous_forecast(self):
-        """Remove old forecast data files if they exist."""
-        for filename in ['daily_forecast_data.csv', 'hourly_forecast_data.csv']:
-            try:
-                if os.path.exists(filename):
-                    os.remove(filename)
-            except OSError:
-                pass
-
 
 class WeatherMainWindow(QWidget):
     def __init__(self, parent=None):
@@ -560,35 +795,172 @@ class WeatherMainWindow(QWidget):
 
         self.setLayout(layout)
 
+        # Locations kept up to date, keyed by rounded coordinates, and the workers fetching them
+        self.active_locations = {}
+        self.workers = {}
+        self.worker = None
+        self._refresh_failures = {}
+        self._displayed_key = None
+
+        # Re-fetch each active location when its forecast goes stale, as advertised by the API
+        self.refresh_scheduler = RefreshScheduler()
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.timeout.connect(self._refresh_due_locations)
+
     def handle_location_confirmed(self, location):
         """Handles the location confirmation event."""
         self.heading_widget.update_data(location.address)
 
-        # Start forecast worker thread
-        self.worker = ForecastWorker(location)
+        # The confirmed location replaces the previous one as the location kept up to date
+        key = self._location_key(location)
+        self.active_locations = {key: location}
+        self._refresh_failures = {}
+        self.refresh_scheduler.clear()
+        self.refresh_timer.stop()
+        self.workers = {running_key: worker for running_key, worker in self.workers.items() if worker.isRunning()}
+
+        # Stale-while-revalidate: show the forecast stored for the location's gridpoint, if any,
+        # while the fresh one is fetched in the background
+        gridpoint = get_gridpoint_cache().get(*key)
+        if gridpoint is not None:
+            self._show_stored_forecast(key, gridpoint.key)
+        self._start_worker(key, location)
+
+    def _start_worker(self, key, location):
+        """Starts a forecast worker for a location unless one is already running for it."""
+        running = self.workers.get(key)
+        if running is not None and running.isRunning():
+            return
+
+        # Start forecast worker thread; forecasts are handed over in memory and CSVs are exported on the side
+        from forecast_worker import ForecastWorker
+        self.worker = ForecastWorker(location, in_memory=True)
+        self.worker.forecasts_ready.connect(self.handle_forecasts_ready)
         self.worker.worker_finished.connect(self.handle_forecast_result)
+        self.workers[key] = self.worker
         self.worker.start()
 
+    def handle_forecasts_ready(self, daily_manager, hourly_manager):
+        """Displays the forecasts parsed by the worker."""
+        worker = self.sender()
+        key = self._displayed_key
+        if worker is not None:
+            key = self._location_key(worker.location)
+            if key not in self.active_locations:
+                return  # A location that was replaced while its forecast was being fetched
+        self._display_forecasts(key, daily_manager, hourly_manager)
+
+    def restore_last_location(self):
+        """
+        Shows the forecast last displayed, as saved in the forecast store, and then refreshes it
+        in the background. Does nothing if there is no saved location or stored forecast.
+        """
+        location = load_last_location()
+        if location is None or self.active_locations:
+            return
+        key = self._location_key(location)
+        if not self._show_stored_forecast(key, location.gridpoint_key):
+            return
+
+        self.active_locations = {key: location}
+        self.heading_widget.update_data(location.address)
+        # Load the network stack and fetch only after the stored forecast has been painted
+        QTimer.singleShot(0, lambda: self._refresh_location(key))
+
+    def _show_stored_forecast(self, key, gridpoint_key):
+        """
+        Shows the newest forecast in the forecast store for a gridpoint, marked with its age.
+
+        Returns:
+            bool: True if a stored daily and hourly forecast were found and shown.
+        """
+        from forecast_store import get_forecast_store
+        store = get_forecast_store()
+        daily_manager = store.load_daily(gridpoint_key)
+        hourly_manager = store.load_hourly(gridpoint_key)
+        if daily_manager is None or hourly_manager is None:
+            return False
+        if not daily_manager.get_forecasts() or not hourly_manager.get_forecasts():
+            return False
+        self._display_forecasts(key, daily_manager, hourly_manager, cached=True)
+        return True
+
+    def _display_forecasts(self, key, daily_manager, hourly_manager, cached=False):
+        """
+        Shows the current weather and both forecast tabs from a pair of forecast managers for the
+        location with the given key. cached marks a forecast read from the local store rather than
+        just fetched. The tabs scroll back to the start when the location differs from the one shown.
+        """
+        new_location = key != self._displayed_key
+        self._displayed_key = key
+        daily_forecasts = daily_manager.get_forecasts()
+        hourly_forecasts = hourly_manager.get_forecasts()
+        if daily_forecasts and hourly_forecasts:
+            self.current_weather_widget.update_data(hourly_forecasts[0].temperature_fahrenheit,
+                                                    hourly_forecasts[0].short_forecast)
+            self.forecast_tabs_widget.update_data(daily_manager.generated_time,
+                                                  hourly_manager.forecast_generated_time,
+                                                  daily_forecasts, hourly_forecasts, cached, new_location)
+        else:
+            self._clear_forecast()
+
     def handle_forecast_result(self, success, message, daily_generated_time, hourly_generated_time):
-        """Handles the forecast result update."""
+        """Handles the forecast result update and schedules the location's next refresh."""
         print(message)
+        worker = self.sender()
+        if worker is None:
+            if not success:
+                self._clear_forecast()
+            return
+        key = self._location_key(worker.location)
+        if key not in self.active_locations:
+            return  # A location that was replaced while its forecast was being fetched
+
         if success:
-            daily_manager = DailyForecastManager("daily_forecast_data.csv", daily_generated_time)
-            hourly_manager = HourlyForecastManager("hourly_forecast_data.csv", hourly_generated_time)
-
-            if daily_manager.load_forecasts() and hourly_manager.load_forecasts():
-                daily_forecasts = daily_manager.get_forecasts()
-                hourly_forecasts = hourly_manager.get_forecasts()
-                self.current_weather_widget.update_data(hourly_forecasts[0].temperature_fahrenheit,
-                                                        hourly_forecasts[0].short_forecast)
-                self.forecast_tabs_widget.update_data(daily_generated_time, hourly_generated_time, daily_forecasts,
-                                                      hourly_forecasts)
-            else:
-                self.heading_widget.clear_data()
-                self.current_weather_widget.clear_data()
-                self.forecast_tabs_widget.clear_data()
+            self._refresh_failures.pop(key, None)
+            self.refresh_scheduler.schedule(key, worker.refresh_hints)
+            try:
+                save_last_location(worker.location, worker.gridpoint.key)
+            except OSError as e:
+                print(f"Could not save the last location: {str(e)}")
+        else:
+            self._refresh_failures[key] = self._refresh_failures.get(key, 0) + 1
+            self.refresh_scheduler.schedule_retry(key, self._refresh_failures[key])
+        self._arm_refresh_timer()
+
+        if not success and key != self._displayed_key:
+            # Nothing is shown for this location yet, so show no data; a failed refresh keeps the forecast shown
+            self._clear_forecast()
+
+    def _refresh_due_locations(self):
+        """Starts a worker for every active location whose forecast is due for a refresh."""
+        for key in self.refresh_scheduler.due():
+            self._refresh_location(key)
+        self._arm_refresh_timer()
+
+    def _refresh_location(self, key):
+        """Starts a worker for a location if it is still active."""
+        location = self.active_locations.get(key)
+        if location is not None:
+            self._start_worker(key, location)
+
+    def _arm_refresh_timer(self):
+        """Sets the timer to fire at the next scheduled refresh."""
+        seconds = self.refresh_scheduler.seconds_until_next()
+        if seconds is None:
+            self.refresh_timer.stop()
         else:
-            # Data retrieval failed, update UI to show no data
-            self.heading_widget.clear_data()
-            self.current_weather_widget.clear_data()
-            self.forecast_tabs_widget.clear_data()
+            self.refresh_timer.start(int(seconds * 1000))
+
+    @staticmethod
+    def _location_key(location):
+        """Identifies a location by its coordinates, rounded as the worker rounds them."""
+        return round(location.latitude, 4), round(location.longitude, 4)
+
+    def _clear_forecast(self):
+        """Clears the heading, current weather and both forecast tabs."""
+        self._displayed_key = None
+        self.heading_widget.clear_data()
+        self.current_weather_widget.clear_data()
+        self.forecast_tabs_widget.clear_data()
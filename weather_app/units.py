@@ -0,0 +1,213 @@
+import math
+import re
+from array import array
+from functools import lru_cache
+
+"""
+Unit conversions shared by the daily and hourly forecast code.
+
+Every conversion is available for a single value and for a whole sequence. The sequence
+versions convert a column in one call and return an array('d'), so re-rendering a series
+in another unit does not go through a Python function call per value.
+"""
+
+# Canonical unit names, keyed by every spelling the NWS API and our CSV files use
+_UNIT_ALIASES = {
+    "F": "F", "degF": "F", "wmoUnit:degF": "F",
+    "C": "C", "degC": "C", "wmoUnit:degC": "C",
+    "K": "K", "wmoUnit:K": "K",
+    "mph": "mph", "wmoUnit:mi_h-1": "mph",
+    "km/h": "km/h", "km_h-1": "km/h", "wmoUnit:km_h-1": "km/h",
+    "m/s": "m/s", "m_s-1": "m/s", "wmoUnit:m_s-1": "m/s",
+    "kt": "kt", "knots": "kt", "wmoUnit:kt": "kt",
+    "%": "%", "percent": "%", "wmoUnit:percent": "%",
+    "mm": "mm", "wmoUnit:mm": "mm",
+    "m": "m", "wmoUnit:m": "m",
+    "degree_(angle)": "deg", "wmoUnit:degree_(angle)": "deg",
+}
+
+TEMPERATURE_UNITS = ("F", "C", "K")
+SPEED_UNITS = ("mph", "km/h", "m/s", "kt")
+
+# Temperature conversions as (scale, offset): value_in_celsius = value * scale + offset
+_TO_CELSIUS = {"C": (1.0, 0.0), "F": (5 / 9, -32 * 5 / 9), "K": (1.0, -273.15)}
+
+# Speed conversions to metres per second
+_TO_METRES_PER_SECOND = {"m/s": 1.0, "km/h": 1 / 3.6, "mph": 0.44704, "kt": 0.514444}
+
+# Matches wind speed strings such as "10 mph", "10 to 15 mph", "5 km/h" or "3 wmoUnit:m_s-1"
+_WIND_SPEED_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(?:to\s*(\d+(?:\.\d+)?))?\s*([A-Za-z0-9:/_-]*)\s*$")
+
+
+def normalize_unit(code):
+    """
+    Map a unit code such as 'wmoUnit:degC', 'F' or 'km_h-1' to its canonical name.
+
+    Raises:
+        ValueError: If the unit is not recognized.
+    """
+    try:
+        return _UNIT_ALIASES[code.strip()]
+    except KeyError:
+        raise ValueError(f"Unknown unit: {code}") from None
+
+
+def fahrenheit_to_celsius(f):
+    """Convert a temperature from Fahrenheit to Celsius."""
+    return (f - 32) * 5 / 9
+
+
+def celsius_to_fahrenheit(c):
+    """Convert a temperature from Celsius to Fahrenheit."""
+    return c * 9 / 5 + 32
+
+
+def _temperature_factors(from_unit, to_unit):
+    """Return (scale, offset) such that converted = value * scale + offset."""
+    from_unit = normalize_unit(from_unit)
+    to_unit = normalize_unit(to_unit)
+    if from_unit not in _TO_CELSIUS or to_unit not in _TO_CELSIUS:
+        raise ValueError(f"Cannot convert temperature from {from_unit} to {to_unit}")
+    scale_in, offset_in = _TO_CELSIUS[from_unit]
+    scale_out, offset_out = _TO_CELSIUS[to_unit]
+    # Invert the target's to-Celsius mapping and compose it with the source's
+    return scale_in / scale_out, (offset_in - offset_out) / scale_out
+
+
+def convert_temperature(value, from_unit, to_unit):
+    """
+    Convert one temperature between any of F, C and K (WMO codes such as 'wmoUnit:degC' are accepted).
+
+    Raises:
+        ValueError: If either unit is not a temperature unit.
+    """
+    if from_unit == to_unit:
+        return value
+    if from_unit == "F" and to_unit == "C":
+        return fahrenheit_to_celsius(value)
+    if from_unit == "C" and to_unit == "F":
+        return celsius_to_fahrenheit(value)
+    scale, offset = _temperature_factors(from_unit, to_unit)
+    return value * scale + offset
+
+
+def convert_temperatures(values, from_unit, to_unit):
+    """
+    Convert a whole sequence of temperatures in one call.
+
+    Args:
+        values (iterable): Temperatures in from_unit (an array, list or any iterable of numbers).
+        from_unit (str): Source unit, e.g. 'F' or 'wmoUnit:degC'.
+        to_unit (str): Target unit.
+
+    Returns:
+        array: array('d') of converted temperatures.
+    """
+    scale, offset = _temperature_factors(from_unit, to_unit)
+    if scale == 1.0 and offset == 0.0:
+        return array('d', values)
+    return array('d', [value * scale + offset for value in values])
+
+
+def fahrenheit_to_celsius_array(values):
+    """Convert a sequence of Fahrenheit temperatures to an array('d') of Celsius temperatures."""
+    return convert_temperatures(values, "F", "C")
+
+
+def celsius_to_fahrenheit_array(values):
+    """Convert a sequence of Celsius temperatures to an array('d') of Fahrenheit temperatures."""
+    return convert_temperatures(values, "C", "F")
+
+
+def speed_factor(from_unit, to_unit):
+    """
+    Return the multiplier converting speeds from one unit to another.
+
+    Raises:
+        ValueError: If either unit is not a speed unit.
+    """
+    from_unit = normalize_unit(from_unit)
+    to_unit = normalize_unit(to_unit)
+    if from_unit not in _TO_METRES_PER_SECOND or to_unit not in _TO_METRES_PER_SECOND:
+        raise ValueError(f"Cannot convert speed from {from_unit} to {to_unit}")
+    return _TO_METRES_PER_SECOND[from_unit] / _TO_METRES_PER_SECOND[to_unit]
+
+
+def convert_speeds(values, from_unit, to_unit):
+    """Convert a whole sequence of numeric speeds in one call, returning an array('d')."""
+    factor = speed_factor(from_unit, to_unit)
+    return array('d', [value * factor for value in values])
+
+
+@lru_cache(maxsize=1024)
+def parse_wind_speed(text, default_unit="mph"):
+    """
+    Parse an NWS wind speed string.
+
+    Forecasts repeat a handful of distinct strings, so results are memoized.
+
+    Args:
+        text (str): e.g. '10 mph', '10 to 15 mph', '5 km/h' or '3 wmoUnit:m_s-1'.
+        default_unit (str): Unit assumed when the string does not name one.
+
+    Returns:
+        tuple: (low, high, unit) with unit in canonical form (one of SPEED_UNITS), or None if
+               the string is empty, cannot be parsed or names a unit that is not a speed unit.
+    """
+    match = _WIND_SPEED_PATTERN.match(text or "")
+    if not match:
+        return None
+    try:
+        unit = normalize_unit(match.group(3) or default_unit)
+    except ValueError:
+        return None
+    if unit not in SPEED_UNITS:
+        return None
+    low = float(match.group(1))
+    high = float(match.group(2)) if match.group(2) else low
+    return low, high, unit
+
+
+def wind_speed_to(text, to_unit="km/h", statistic="high"):
+    """
+    Convert one wind speed string to a number in the requested unit.
+
+    Args:
+        text (str): e.g. '10 to 15 mph'.
+        to_unit (str): Target unit ('mph', 'km/h', 'm/s' or 'kt').
+        statistic (str): Which end of a range to use: 'low', 'high' or 'mean'.
+
+    Returns:
+        float: The converted speed, or nan if the string cannot be parsed.
+    """
+    parsed = parse_wind_speed(text)
+    if parsed is None:
+        return math.nan
+    low, high, unit = parsed
+    if statistic == "low":
+        value = low
+    elif statistic == "mean":
+        value = (low + high) / 2
+    else:
+        value = high
+    return value * speed_factor(unit, to_unit)
+
+
+def wind_speeds_to(texts, to_unit="km/h", statistic="high"):
+    """
+    Convert a whole sequence of wind speed strings in one call.
+
+    Each distinct string is parsed once, so a 156-hour series with a dozen distinct values
+    costs a dozen parses.
+
+    Returns:
+        array: array('d') of converted speeds (nan where a string cannot be parsed).
+    """
+    converted = {}
+    result = array('d')
+    for text in texts:
+        value = converted.get(text)
+        if value is None:
+            value = converted[text] = wind_speed_to(text, to_unit, statistic)
+        result.append(value)
+    return result